@@ -110,6 +110,8 @@ class Config(object):
 
         self._level = []
         self._dict_cache = {}
+        # see vyos.configdict.get_interface_index()
+        self._interface_index = None
         (self._running_config,
          self._session_config) = self._config_source.get_configtree_tuple()
 
@@ -240,7 +242,9 @@ class Config(object):
             config = self._session_config
 
         if config:
-            config_dict = json.loads(config.to_json())
+            config_dict = self._config_source.get_root_dict(effective)
+            if config_dict is None:
+                config_dict = json.loads(config.to_json())
         else:
             config_dict = {}
 
@@ -347,7 +351,7 @@ class Config(object):
         Note:
             It also returns False if node doesn't exist.
         """
-        self._config_source.set_level(self.get_level)
+        self._config_source.set_level(self.get_level())
         return self._config_source.is_multi(path)
 
     def is_tag(self, path):
@@ -361,7 +365,7 @@ class Config(object):
         Note:
             It also returns False if node doesn't exist.
         """
-        self._config_source.set_level(self.get_level)
+        self._config_source.set_level(self.get_level())
         return self._config_source.is_tag(path)
 
     def is_leaf(self, path):
@@ -375,7 +379,7 @@ class Config(object):
         Note:
             It also returns False if node doesn't exist.
         """
-        self._config_source.set_level(self.get_level)
+        self._config_source.set_level(self.get_level())
         return self._config_source.is_leaf(path)
 
     def return_value(self, path, default=None):
@@ -0,0 +1,174 @@
+# Copyright 2023 VyOS maintainers and contributors <maintainers@vyos.io>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+A warm cache of parsed config trees for long-running config readers.
+
+vyos-configd receives the full running and proposed config text on every
+commit. In the common case, the running config of a commit is identical to
+the proposed config of the previous commit, and most top-level nodes of the
+proposed config are unchanged, so the text is hashed and only text that was
+not seen before is handed to libvyosconfig.
+
+The cache keeps:
+
+- complete ConfigTree objects, keyed by a digest of the whole config text
+- the JSON rendering of every top-level node, keyed by a digest of the
+  text of that node; the root dict of a config is assembled from those,
+  so only changed top-level nodes are re-parsed and re-serialized
+
+The root dict is decoded afresh from the cached JSON for every load, so
+callers are free to modify it without affecting later commits.
+"""
+
+import json
+import hashlib
+from collections import OrderedDict
+
+from vyos.configtree import ConfigTree
+
+def digest(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()
+
+def split_top_level(config_text: str) -> list:
+    """ Split config text into the text blocks of its top-level nodes.
+
+    Comments preceding a node are kept with the node; the version string
+    at the end of a config file is dropped, as it is not part of the tree.
+
+    Returns: list of (node name, block text) tuples, in order
+    """
+    blocks = []
+    lines = []
+    name = None
+    for line in config_text.splitlines(keepends=True):
+        if not lines and not line.strip():
+            continue
+        if not lines and line.startswith('//'):
+            continue
+        lines.append(line)
+        if line[:1].isspace() or not line.strip():
+            continue
+        stripped = line.rstrip()
+        if stripped.startswith('/*'):
+            continue
+        if name is None:
+            name = stripped.split()[0]
+        # top-level node is complete on its closing brace, or if it is
+        # a leaf node at top level
+        if stripped == '}' or not stripped.endswith('{'):
+            blocks.append((name, ''.join(lines)))
+            lines = []
+            name = None
+
+    if lines and name is not None:
+        blocks.append((name, ''.join(lines)))
+
+    return blocks
+
+def _update_root_dict(config_dict: dict, block_dict: dict):
+    # top-level tag nodes are split into one block per tag node value
+    for k, v in block_dict.items():
+        if isinstance(v, dict) and isinstance(config_dict.get(k), dict):
+            config_dict[k].update(v)
+        else:
+            config_dict[k] = v
+
+class ConfigCache:
+    """ Parsed config trees and root dicts, kept across loads
+
+    Args:
+        max_trees (int): number of complete ConfigTree objects to keep
+    """
+    def __init__(self, max_trees=4):
+        self._max_trees = max_trees
+        self._trees = OrderedDict()
+        self._blocks = {}
+        self.stats = {'bytes_received': 0, 'bytes_parsed': 0,
+                      'tree_hits': 0, 'tree_misses': 0,
+                      'block_hits': 0, 'block_misses': 0}
+        self.totals = self.stats.copy()
+
+    def reset_stats(self):
+        """ Reset the per-commit counters; totals are kept """
+        self.stats = dict.fromkeys(self.stats, 0)
+
+    def _count(self, key, n=1):
+        self.stats[key] += n
+        self.totals[key] += n
+
+    def _block_json(self, block_digest: str, text: str) -> str:
+        res = self._blocks.get(block_digest)
+        if res is not None:
+            self._count('block_hits')
+            return res
+
+        self._count('block_misses')
+        self._count('bytes_parsed', len(text))
+        res = ConfigTree(text).to_json()
+        self._blocks[block_digest] = res
+        return res
+
+    def _prune(self):
+        while len(self._trees) > self._max_trees:
+            self._trees.popitem(last=False)
+
+        live = set()
+        for (_, block_digests) in self._trees.values():
+            live.update(block_digests)
+        for k in list(self._blocks):
+            if k not in live:
+                del self._blocks[k]
+
+    def load(self, config_text: str) -> tuple:
+        """ Return a ConfigTree and root dict for config text, reusing
+        the results of previous loads where the text is unchanged
+
+        Raises:
+            ValueError: if the config text can not be parsed
+        """
+        if not config_text or not config_text.strip():
+            return None, {}
+
+        self._count('bytes_received', len(config_text))
+
+        key = digest(config_text)
+        entry = self._trees.get(key)
+        if entry is not None:
+            self._count('tree_hits')
+            self._trees.move_to_end(key)
+            tree, block_digests = entry
+        else:
+            self._count('tree_misses')
+            self._count('bytes_parsed', len(config_text))
+            tree = ConfigTree(config_text)
+            block_digests = []
+
+        config_dict = {}
+        if entry is not None:
+            for block_digest in block_digests:
+                _update_root_dict(config_dict,
+                                  json.loads(self._blocks[block_digest]))
+                self._count('block_hits')
+        else:
+            for (_, text) in split_top_level(config_text):
+                block_digest = digest(text)
+                block_digests.append(block_digest)
+                block_json = self._block_json(block_digest, text)
+                _update_root_dict(config_dict, json.loads(block_json))
+            self._trees[key] = (tree, block_digests)
+            self._prune()
+
+        return tree, config_dict
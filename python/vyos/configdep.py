@@ -119,6 +119,51 @@ def graph_from_dependency_dict(d: dict) -> dict:
 
     return g
 
+def dependents_closure(d: dict) -> dict:
+    """ Map the canonical name of each conf_mode script to the canonical
+    names of all scripts that may run as its dependents, directly or
+    transitively.
+    """
+    g = {}
+    for k, v in graph_from_dependency_dict(d).items():
+        g.setdefault(canon_name(k), set()).update(canon_name(t) for t in v)
+
+    closure = {}
+    def visit(k: str) -> set:
+        if k not in closure:
+            closure[k] = set()
+            for t in g.get(k, set()):
+                closure[k] |= {t} | visit(t)
+        return closure[k]
+
+    for k in list(g):
+        visit(k)
+
+    return closure
+
+def graph_from_batch(names: dict, closure: dict) -> dict:
+    """ Return the graph of predecessors of a batch of script runs.
+
+    Args:
+        names (dict): canonical script name of each run, keyed by run id
+        closure (dict): as returned by dependents_closure
+
+    Runs of the same script, for example for different tag node values,
+    are independent of each other.
+    """
+    by_name = {}
+    for i, name in names.items():
+        by_name.setdefault(name, set()).add(i)
+
+    preds = {}
+    for target in by_name:
+        preds[target] = set()
+        for name, ids in by_name.items():
+            if name != target and target in closure.get(name, set()):
+                preds[target] |= ids
+
+    return {j: preds[target].copy() for j, target in names.items()}
+
 def is_acyclic(d: dict) -> bool:
     g = graph_from_dependency_dict(d)
     ts = TopologicalSorter(g)
@@ -176,6 +176,95 @@ def get_removed_vlans(conf, path, dict):
 
     return dict
 
+def _values(node):
+    """ Values of a leaf node in a root dict: str for single, list for
+    multi-value leaf nodes """
+    if isinstance(node, list):
+        return node
+    if isinstance(node, str):
+        return [node]
+    return []
+
+class InterfaceIndex:
+    """
+    Reverse index of the relations between the interfaces of a config.
+
+    The helpers below answer questions like "which bridge is eth1 a member
+    of?" for a single interface. Walking all interfaces of all types for
+    each of them makes a commit touching many interfaces quadratic, so the
+    proposed config is walked once instead, and the answers are kept in
+    dicts keyed by the name of the related interface.
+
+    Use get_interface_index() to get the index cached on a Config object.
+    """
+    member_types = ['bonding', 'bridge']
+    mirror_directions = ['ingress', 'egress']
+    source_types = ['macsec', 'pppoe', 'pseudo-ethernet', 'tunnel', 'vxlan']
+
+    def __init__(self, root: dict):
+        # interface (or VLAN subinterface) name -> its config node
+        self.nodes = {}
+        # member -> {'bonding'|'bridge': [master, ...]}
+        self.masters = {}
+        # monitored interface -> {'ingress'|'egress': [interface, ...]}
+        self.mirrors = {}
+        # source-interface -> {type: [interface, ...]}
+        self.sources = {}
+        # interface -> its 'qos interface' node
+        self.qos = root.get('qos', {}).get('interface', {})
+
+        interfaces = root.get('interfaces', {})
+        if not isinstance(interfaces, dict):
+            return
+
+        for iftype, instances in interfaces.items():
+            if not isinstance(instances, dict):
+                continue
+            for intf, node in instances.items():
+                if not isinstance(node, dict):
+                    continue
+                self._add_node(intf, node)
+
+                if iftype in self.member_types:
+                    members = node.get('member', {}).get('interface', {})
+                    for member in members:
+                        self.masters.setdefault(member, {}).setdefault(
+                            iftype, []).append(intf)
+
+                mirror = node.get('mirror', {})
+                for direction in self.mirror_directions:
+                    for monitored in _values(mirror.get(direction)):
+                        self.mirrors.setdefault(monitored, {}).setdefault(
+                            direction, []).append(intf)
+
+                if iftype in self.source_types:
+                    for source in _values(node.get('source-interface')):
+                        self.sources.setdefault(source, {}).setdefault(
+                            iftype, []).append(intf)
+
+    def _add_node(self, intf, node):
+        # as in Section.get_config_path(), a single VLAN ID refers to a
+        # vif before a vif-s
+        for vif_s, vif_s_node in node.get('vif-s', {}).items():
+            self.nodes[f'{intf}.{vif_s}'] = vif_s_node
+            for vif_c, vif_c_node in vif_s_node.get('vif-c', {}).items():
+                self.nodes[f'{intf}.{vif_s}.{vif_c}'] = vif_c_node
+        for vif, vif_node in node.get('vif', {}).items():
+            self.nodes[f'{intf}.{vif}'] = vif_node
+        self.nodes[intf] = node
+
+def get_interface_index(conf):
+    """
+    Return the InterfaceIndex of the proposed config of a Config object,
+    built on first use and cached on the object: a Config object does not
+    change once created, and lives for one commit (or one script run).
+    """
+    index = getattr(conf, '_interface_index', None)
+    if index is None:
+        index = InterfaceIndex(conf.get_cached_root_dict())
+        conf._interface_index = index
+    return index
+
 def is_member(conf, interface, intftype=None):
     """
     Checks if passed interface is member of other interface of specified type.
@@ -186,10 +275,8 @@ def is_member(conf, interface, intftype=None):
     empty -> Interface is not a member
     key -> Interface is a member of this interface
     """
-    from vyos.ifconfig import Section
-
     ret_val = {}
-    intftypes = ['bonding', 'bridge']
+    intftypes = InterfaceIndex.member_types
 
     if intftype not in intftypes + [None]:
         raise ValueError((
@@ -198,15 +285,14 @@ def is_member(conf, interface, intftype=None):
 
     intftype = intftypes if intftype == None else [intftype]
 
+    masters = get_interface_index(conf).masters.get(interface, {})
     for iftype in intftype:
-        base = ['interfaces', iftype]
-        for intf in conf.list_nodes(base):
-            member = base + [intf, 'member', 'interface', interface]
-            if conf.exists(member):
-                tmp = conf.get_config_dict(member, key_mangling=('-', '_'),
-                                           get_first_key=True,
-                                           no_tag_node_value_mangle=True)
-                ret_val.update({intf : tmp})
+        for intf in masters.get(iftype, []):
+            member = ['interfaces', iftype, intf, 'member', 'interface', interface]
+            tmp = conf.get_config_dict(member, key_mangling=('-', '_'),
+                                       get_first_key=True,
+                                       no_tag_node_value_mangle=True)
+            ret_val.update({intf : tmp})
 
     return ret_val
 
@@ -222,25 +308,24 @@ def is_mirror_intf(conf, interface, direction=None):
     """
     from vyos.ifconfig import Section
 
-    directions = ['ingress', 'egress']
+    directions = InterfaceIndex.mirror_directions
     if direction not in directions + [None]:
         raise ValueError(f'Unknown interface mirror direction "{direction}"')
 
     direction = directions if direction == None else [direction]
 
     ret_val = None
-    base = ['interfaces']
-
-    for dir in direction:
-        for iftype in conf.list_nodes(base):
-            iftype_base = base + [iftype]
-            for intf in conf.list_nodes(iftype_base):
-                mirror = iftype_base + [intf, 'mirror', dir, interface]
-                if conf.exists(mirror):
-                    path = ['interfaces', Section.section(intf), intf]
-                    tmp = conf.get_config_dict(path, key_mangling=('-', '_'),
-                                               get_first_key=True)
-                    ret_val = {intf : tmp}
+    mirrors = get_interface_index(conf).mirrors.get(interface, {})
+
+    # the last mirroring interface found wins
+    for dir in reversed(direction):
+        if mirrors.get(dir):
+            intf = mirrors[dir][-1]
+            path = ['interfaces', Section.section(intf), intf]
+            tmp = conf.get_config_dict(path, key_mangling=('-', '_'),
+                                       get_first_key=True)
+            ret_val = {intf : tmp}
+            break
 
     return ret_val
 
@@ -252,20 +337,9 @@ def has_address_configured(conf, intf):
 
     Returns True if interface has address configured, False if it doesn't.
     """
-    from vyos.ifconfig import Section
-    ret = False
-
-    old_level = conf.get_level()
-    conf.set_level([])
-
-    intfpath = 'interfaces ' + Section.get_config_path(intf)
-    if ( conf.exists(f'{intfpath} address') or
-            conf.exists(f'{intfpath} ipv6 address autoconf') or
-            conf.exists(f'{intfpath} ipv6 address eui64') ):
-        ret = True
-
-    conf.set_level(old_level)
-    return ret
+    node = get_interface_index(conf).nodes.get(intf, {})
+    ipv6 = node.get('ipv6', {}).get('address', {})
+    return ('address' in node or 'autoconf' in ipv6 or 'eui64' in ipv6)
 
 def has_vrf_configured(conf, intf):
     """
@@ -273,18 +347,7 @@ def has_vrf_configured(conf, intf):
 
     Returns True if interface has VRF configured, False if it doesn't.
     """
-    from vyos.ifconfig import Section
-    ret = False
-
-    old_level = conf.get_level()
-    conf.set_level([])
-
-    tmp = ['interfaces', Section.get_config_path(intf), 'vrf']
-    if conf.exists(tmp):
-        ret = True
-
-    conf.set_level(old_level)
-    return ret
+    return 'vrf' in get_interface_index(conf).nodes.get(intf, {})
 
 def has_vlan_subinterface_configured(conf, intf):
     """
@@ -294,15 +357,16 @@ def has_vlan_subinterface_configured(conf, intf):
 
     Return True if interface has VLAN subinterface configured.
     """
-    from vyos.ifconfig import Section
-    ret = False
+    node = get_interface_index(conf).nodes.get(intf, {})
+    return ('vif' in node or 'vif-s' in node)
 
-    intfpath = ['interfaces', Section.section(intf), intf]
-    if ( conf.exists(intfpath + ['vif']) or
-            conf.exists(intfpath + ['vif-s'])):
-        ret = True
+def has_qos_policy(conf, intf):
+    """
+    Checks if a QoS policy is applied to the interface.
 
-    return ret
+    Return True if a 'qos interface' node exists for the interface.
+    """
+    return intf in get_interface_index(conf).qos
 
 def is_source_interface(conf, interface, intftype=None):
     """
@@ -317,7 +381,7 @@ def is_source_interface(conf, interface, intftype=None):
     False -> interface type cannot have members
     """
     ret_val = None
-    intftypes = ['macsec', 'pppoe', 'pseudo-ethernet', 'tunnel', 'vxlan']
+    intftypes = InterfaceIndex.source_types
     if not intftype:
         intftype = intftypes
 
@@ -330,13 +394,10 @@ def is_source_interface(conf, interface, intftype=None):
         raise ValueError(f'unknown interface type "{intftype}" or it can not '
             'have a source-interface')
 
+    sources = get_interface_index(conf).sources.get(interface, {})
     for it in intftype:
-        base = ['interfaces', it]
-        for intf in conf.list_nodes(base):
-            src_intf = base + [intf, 'source-interface']
-            if conf.exists(src_intf) and interface in conf.return_values(src_intf):
-                ret_val = intf
-                break
+        if sources.get(it):
+            ret_val = sources[it][0]
 
     return ret_val
 
@@ -456,7 +517,7 @@ def get_interface_dict(config, base, ifname='', recursive_defaults=True):
     dict.update({'ifname': ifname})
 
     # Check if QoS policy applied on this interface - See ifconfig.interface.set_mirror_redirect()
-    if config.exists(['qos', 'interface', ifname]):
+    if has_qos_policy(config, ifname):
         dict.update({'traffic_policy': {}})
 
     address = leaf_node_changed(config, base + [ifname, 'address'])
@@ -509,7 +570,7 @@ def get_interface_dict(config, base, ifname='', recursive_defaults=True):
         # Add subinterface name to dictionary
         dict['vif'][vif].update({'ifname' : f'{ifname}.{vif}'})
 
-        if config.exists(['qos', 'interface', f'{ifname}.{vif}']):
+        if has_qos_policy(config, f'{ifname}.{vif}'):
             dict['vif'][vif].update({'traffic_policy': {}})
 
         if 'deleted' not in dict:
@@ -534,7 +595,7 @@ def get_interface_dict(config, base, ifname='', recursive_defaults=True):
         # Add subinterface name to dictionary
         dict['vif_s'][vif_s].update({'ifname' : f'{ifname}.{vif_s}'})
 
-        if config.exists(['qos', 'interface', f'{ifname}.{vif_s}']):
+        if has_qos_policy(config, f'{ifname}.{vif_s}'):
             dict['vif_s'][vif_s].update({'traffic_policy': {}})
 
         if 'deleted' not in dict:
@@ -560,7 +621,7 @@ def get_interface_dict(config, base, ifname='', recursive_defaults=True):
             # Add subinterface name to dictionary
             dict['vif_s'][vif_s]['vif_c'][vif_c].update({'ifname' : f'{ifname}.{vif_s}.{vif_c}'})
 
-            if config.exists(['qos', 'interface', f'{ifname}.{vif_s}.{vif_c}']):
+            if has_qos_policy(config, f'{ifname}.{vif_s}.{vif_c}'):
                 dict['vif_s'][vif_s]['vif_c'][vif_c].update({'traffic_policy': {}})
 
             if 'deleted' not in dict:
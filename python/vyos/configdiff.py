@@ -100,6 +100,7 @@ class ConfigDiff(object):
     session config dict and the effective config dict.
     """
     def __init__(self, config, key_mangling=None, diff_tree=None, diff_dict=None):
+        self._config = config
         self._level = config.get_level()
         self._session_config_dict = config.get_cached_root_dict(effective=False)
         self._effective_config_dict = config.get_cached_root_dict(effective=True)
@@ -165,6 +166,60 @@ class ConfigDiff(object):
             return True
         return False
 
+    def get_tag_node_changes(self, path=[], no_tag_node_value_mangle=False,
+                             with_defaults=False, with_recursive_defaults=False):
+        """
+        Args:
+            path (str|list): config path of a tag node
+            with_defaults, with_recursive_defaults: as for get_config_dict
+
+        Returns: (changed, deleted) tuple, where
+                 changed = dict of tag node values added or modified in the
+                           session config, each as returned by
+                           Config.get_config_dict(path + [value], get_first_key=True)
+                 deleted = list of tag node values removed from the session
+                           config
+
+        Only the tag node values listed in the diff tree are converted, so the
+        cost is proportional to the change, not to the number of values.
+        """
+        if self._diff_tree is None:
+            raise NotImplementedError("diff_tree class not available")
+
+        lpath = self._make_path(path)
+
+        def changed_values(tree):
+            if tree is None or not tree.exists(lpath):
+                return []
+            return tree.list_nodes(lpath)
+
+        added = changed_values(self._diff_tree.add)
+        removed = changed_values(self._diff_tree.sub)
+
+        session_values = get_sub_dict(self._session_config_dict, lpath,
+                                      get_first_key=True)
+
+        deleted = [v for v in removed if v not in session_values]
+        modified = set(added) | set(removed)
+
+        changed = {}
+        level = self._config.get_level()
+        self._config.set_level([])
+        try:
+            for v in session_values:
+                if v not in modified:
+                    continue
+                changed[v] = self._config.get_config_dict(lpath + [v],
+                                    key_mangling=self._key_mangling,
+                                    get_first_key=True,
+                                    no_tag_node_value_mangle=no_tag_node_value_mangle,
+                                    with_defaults=with_defaults,
+                                    with_recursive_defaults=with_recursive_defaults)
+        finally:
+            self._config.set_level(level)
+
+        return changed, deleted
+
     def get_child_nodes_diff_str(self, path=[]):
         ret = {'add': {}, 'change': {}, 'delete': {}}
 
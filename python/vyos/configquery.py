@@ -26,6 +26,7 @@ from vyos.utils.process import popen
 from vyos.utils.boot import boot_configuration_complete
 from vyos.config import Config
 from vyos.configsource import ConfigSourceSession, ConfigSourceString
+from vyos.configtree import ConfigTreeError
 from vyos.defaults import directories
 
 config_file = os.path.join(directories['config'], 'config.boot')
@@ -108,6 +109,18 @@ class ConfigTreeQuery(GenericConfigQuery):
     def list_nodes(self, path: list):
         return self.config.list_nodes(path)
 
+    def query(self, queries: list, path=[], effective=False):
+        """ Answer many (method, path) queries on the subtree at path at once;
+        see vyos.configtree.TreeQuery.query
+        """
+        tree = self.config.get_config_tree(effective=effective)
+        try:
+            if tree is None:
+                raise ConfigTreeError()
+            return tree.query(path).query(queries)
+        except ConfigTreeError:
+            return [False if m == 'exists' else None for (m, _) in queries]
+
     def get_config_dict(self, path=[], effective=False, key_mangling=None,
                         get_first_key=False, no_multi_convert=False,
                         no_tag_node_value_mangle=False):
@@ -15,7 +15,9 @@
 import os
 import re
 import sys
+import shlex
 import subprocess
+import tempfile
 
 from vyos.utils.process import is_systemd_service_running
 from vyos.utils.dict import dict_to_paths
@@ -24,6 +26,7 @@ CLI_SHELL_API = '/bin/cli-shell-api'
 SET = '/opt/vyatta/sbin/my_set'
 DELETE = '/opt/vyatta/sbin/my_delete'
 COMMENT = '/opt/vyatta/sbin/my_comment'
+SHELL = '/bin/bash'
 COMMIT = '/opt/vyatta/sbin/my_commit'
 DISCARD = '/opt/vyatta/sbin/my_discard'
 SHOW_CONFIG = ['/bin/cli-shell-api', 'showConfig']
@@ -86,6 +89,12 @@ def inject_vyos_env(env):
 class ConfigSessionError(Exception):
     pass
 
+def raise_batch_errors(errors: list):
+    """ Raise ConfigSessionError for the errors returned by apply_batch """
+    if errors:
+        msg = '\n'.join(f"{' '.join(path)}: {err}" for path, err in errors)
+        raise ConfigSessionError(msg)
+
 
 class ConfigSession(object):
     """
@@ -151,10 +160,10 @@ class ConfigSession(object):
 
     def set_section(self, path: list, d: dict):
         try:
-            for p in dict_to_paths(d):
-                self.set(path + p)
-        except (ValueError, ConfigSessionError) as e:
+            ops = [('set', path + p) for p in dict_to_paths(d)]
+        except ValueError as e:
             raise ConfigSessionError(e)
+        raise_batch_errors(self.apply_batch(ops))
 
     def delete(self, path, value=None):
         if not value:
@@ -167,11 +176,50 @@ class ConfigSession(object):
         try:
             self.delete(path)
             if d:
-                for p in dict_to_paths(d):
-                    self.set(path + p)
+                ops = [('set', path + p) for p in dict_to_paths(d)]
+                raise_batch_errors(self.apply_batch(ops))
         except (ValueError, ConfigSessionError) as e:
             raise ConfigSessionError(e)
 
+    def apply_batch(self, ops: list) -> list:
+        """
+        Applies set and delete operations to the session in order, driven
+        by a single shell process rather than one subprocess per path.
+
+        Args:
+            ops (list): (op, path) tuples, where op is 'set' or 'delete'
+                        and path includes the value, if any
+
+        Returns:
+            list: (path, error message) tuples of the operations that failed;
+            the remaining operations are applied regardless
+        """
+        progs = {'set': SET, 'delete': DELETE}
+        lines = []
+        for n, (op, path) in enumerate(ops):
+            if op not in progs:
+                raise ConfigSessionError(f"'{op}' is not a valid operation")
+            args = ' '.join(shlex.quote(str(x)) for x in [progs[op]] + path)
+            # report index and output of failed operations, NUL-separated
+            lines.append(f'out=$({args} 2>&1 </dev/null) || '
+                         f'printf "%s\\0%s\\0" {n} "$out"')
+
+        if not lines:
+            return []
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.sh') as f:
+            f.write('\n'.join(lines) + '\n')
+            f.flush()
+            output = self.__run_command([SHELL, f.name])
+
+        res = output.split('\0')
+        errors = []
+        for n, msg in zip(res[0::2], res[1::2]):
+            path = ops[int(n)][1]
+            errors.append((path, msg.strip()))
+
+        return errors
+
     def comment(self, path, value=None):
         if not value:
             value = [""]
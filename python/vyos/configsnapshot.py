@@ -0,0 +1,162 @@
+# Copyright 2023 VyOS maintainers and contributors <maintainers@vyos.io>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Read-only snapshot of the running config, for long-running readers.
+
+A post-commit hook writes the JSON of the running config to snapshot_json
+after every commit, and a pre-commit hook removes it, so that the file is
+never older than the running config; the boot config loader writes it
+once the boot config is committed. Only write_snapshot() writes the file:
+the config.json of config_mgmt, created from the saved config at boot,
+may differ from the running config. ConfigSnapshot answers queries from
+that file, parsed once per commit: a stat of the file per query replaces
+the cli-shell-api calls and config parsing of creating a Config object.
+ConfigSourceSession also reads the running config from it.
+"""
+
+import os
+import re
+import json
+import hashlib
+import tempfile
+import threading
+
+from vyos.configtree import TreeQuery
+from vyos.configtree import ConfigTreeError
+
+snapshot_json = '/run/vyatta/config/running.json'
+
+def write_snapshot(json_file=snapshot_json):
+    """ Write the JSON of the running config, replacing the file atomically,
+    so that readers never see a partially written file """
+    from grp import getgrnam
+    from vyos.config import Config
+    from vyos.configsource import ConfigSourceSession
+    from vyos.defaults import cfg_group
+
+    # not from the snapshot being replaced
+    source = ConfigSourceSession(use_snapshot=False)
+    ct = Config(config_source=source).get_config_tree(effective=True)
+    if ct is None:
+        return False
+
+    dirname = os.path.dirname(json_file)
+    os.makedirs(dirname, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dirname, prefix='.running.json')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(ct.to_json())
+        os.chmod(tmp, 0o664)
+        try:
+            os.chown(tmp, -1, getgrnam(cfg_group).gr_gid)
+        except (KeyError, PermissionError):
+            pass
+        os.replace(tmp, json_file)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return True
+
+def _path(path):
+    if isinstance(path, str):
+        return re.split(r'\s+', path) if path else []
+    return path
+
+class ConfigSnapshot:
+    """ Running config read from the JSON written after every commit
+
+    Args:
+        json_file (str): path of the JSON of the running config
+    """
+    def __init__(self, json_file=snapshot_json):
+        self.json_file = json_file
+        self._key = None
+        self._tree = None
+        self._etag = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """ Reload the snapshot if the file changed
+
+        Returns: True if a snapshot is available
+        """
+        try:
+            st = os.stat(self.json_file)
+        except OSError:
+            return False
+
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if key == self._key:
+            return True
+
+        with self._lock:
+            if key == self._key:
+                return True
+            try:
+                with open(self.json_file, 'rb') as f:
+                    data = f.read()
+                tree = TreeQuery(json.loads(data))
+            except (OSError, ValueError, TypeError):
+                # caught while being written by a non-atomic writer; the
+                # next stat differs once the file is complete
+                return self._tree is not None
+            self._tree = tree
+            self._etag = hashlib.sha1(data).hexdigest()[:16]
+            self._key = key
+        return True
+
+    @property
+    def etag(self):
+        """ Identifier of the snapshot content, changes with the config """
+        return self._etag
+
+    def exists(self, path) -> bool:
+        """ Check if a node, or a value of a leaf node, exists """
+        tree = self._tree
+        path = _path(path)
+        if tree.exists(path):
+            return True
+        # as Config.exists, also check for a value at the end of the path
+        if len(path) < 2:
+            return False
+        try:
+            return path[-1] in tree.return_values(path[:-1])
+        except ConfigTreeError:
+            return False
+
+    def return_value(self, path, default=None):
+        try:
+            value = self._tree.return_value(_path(path))
+        except ConfigTreeError:
+            value = None
+        return value if value else default
+
+    def return_values(self, path, default=[]):
+        try:
+            values = self._tree.return_values(_path(path))
+        except ConfigTreeError:
+            values = []
+        return values if values else default.copy()
+
+    def get_subtree_dict(self, path):
+        """ Return the dict of the node at path, as ConfigTree.to_json of
+        the subtree, or None if there is no such non-leaf node """
+        res = self._tree.dict
+        for k in _path(path):
+            if not isinstance(res, dict) or k not in res:
+                return None
+            res = res[k]
+        return res if isinstance(res, dict) else None
@@ -16,10 +16,17 @@
 
 import os
 import re
+import json
 import subprocess
 
+from copy import deepcopy
+
 from vyos.configtree import ConfigTree
+from vyos.configtree import tree_from_dict
+from vyos.configcache import ConfigCache
+from vyos.configsnapshot import snapshot_json
 from vyos.utils.boot import boot_configuration_complete
+from vyos import xml_ref
 
 class VyOSError(Exception):
     """
@@ -33,6 +40,17 @@ class ConfigSourceError(Exception):
     '''
     pass
 
+def _schema_query(query, path) -> bool:
+    """ Answer a schema question from the XML reference; as cli-shell-api,
+    return False for paths not in the reference tree """
+    try:
+        return query(path)
+    except ValueError:
+        return False
+
+def _is_tag(path) -> bool:
+    return _schema_query(xml_ref.is_tag, path)
+
 class ConfigSource:
     def __init__(self):
         self._running_config: ConfigTree = None
@@ -41,6 +59,17 @@ class ConfigSource:
     def get_configtree_tuple(self):
         return self._running_config, self._session_config
 
+    def get_root_dict(self, effective=False):
+        """
+        Args:
+            effective (bool): running config if True, else session config
+
+        Returns:
+            dict: root dict of the config, if the source already holds one;
+            None otherwise, in which case it is decoded from the config tree
+        """
+        return None
+
     def session_changed(self):
         """
         Returns:
@@ -106,7 +135,22 @@ class ConfigSource:
         raise NotImplementedError(f"function not available for {type(self)}")
 
 class ConfigSourceSession(ConfigSource):
-    def __init__(self, session_env=None):
+    """
+    Config source of a CLI session, or of the running config outside one.
+
+    Since rendering the config with cli-shell-api and parsing it again is
+    the main cost of creating a Config object, the running config is read
+    from the JSON snapshot written after each commit (see
+    vyos.configsnapshot) if available; the snapshot is removed by a
+    pre-commit hook, so that it is never older than the running config.
+    In a session without uncommitted changes the working config is the
+    running config, otherwise it is still rendered by cli-shell-api.
+
+    Args:
+        session_env (dict): environment of the CLI session
+        use_snapshot (bool): read the running config from the snapshot
+    """
+    def __init__(self, session_env=None, use_snapshot=True):
         super().__init__()
         self._cli_shell_api = "/bin/cli-shell-api"
         self._level = []
@@ -114,38 +158,74 @@ class ConfigSourceSession(ConfigSource):
             self.__session_env = session_env
         else:
             self.__session_env = None
+        self._in_session = None
+        self._running_dict = None
+        self._session_dict = None
 
         # Running config can be obtained either from op or conf mode, it always succeeds
         # once the config system is initialized during boot;
         # before initialization, set to empty string
+        snapshot = None
+        running_config_text = ''
         if boot_configuration_complete():
-            try:
-                running_config_text = self._run([self._cli_shell_api, '--show-active-only', '--show-show-defaults', '--show-ignore-edit', 'showConfig'])
-            except VyOSError:
-                running_config_text = ''
-        else:
-            running_config_text = ''
+            if use_snapshot:
+                snapshot = self._read_snapshot()
+            if snapshot is None:
+                try:
+                    running_config_text = self._run([self._cli_shell_api, '--show-active-only', '--show-show-defaults', '--show-ignore-edit', 'showConfig'])
+                except VyOSError:
+                    running_config_text = ''
 
         # Session config ("active") only exists in conf mode.
         # In op mode, we'll just use the same running config for both active and session configs.
+        session_snapshot = False
         if self.in_session():
-            try:
-                session_config_text = self._run([self._cli_shell_api, '--show-working-only', '--show-show-defaults', '--show-ignore-edit', 'showConfig'])
-            except VyOSError:
+            if snapshot is not None and not self.session_changed():
+                session_snapshot = True
                 session_config_text = ''
+            else:
+                try:
+                    session_config_text = self._run([self._cli_shell_api, '--show-working-only', '--show-show-defaults', '--show-ignore-edit', 'showConfig'])
+                except VyOSError:
+                    session_config_text = ''
         else:
+            session_snapshot = snapshot is not None
             session_config_text = running_config_text
 
-        if running_config_text:
+        if snapshot is not None:
+            self._running_dict = snapshot
+            self._running_config = tree_from_dict(self._running_dict, _is_tag)
+        elif running_config_text:
             self._running_config = ConfigTree(running_config_text)
         else:
             self._running_config = None
 
-        if session_config_text:
+        if session_snapshot:
+            # separate objects, as callers may modify the trees
+            self._session_dict = deepcopy(snapshot)
+            self._session_config = tree_from_dict(self._session_dict, _is_tag)
+        elif session_config_text:
             self._session_config = ConfigTree(session_config_text)
         else:
             self._session_config = None
 
+    @staticmethod
+    def _read_snapshot():
+        """ Return the dict of the running config snapshot, or None if
+        there is no usable snapshot """
+        try:
+            with open(snapshot_json, 'rb') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            # missing, or not readable
+            return None
+        return snapshot if isinstance(snapshot, dict) else None
+
+    def get_root_dict(self, effective=False):
+        if effective:
+            return self._running_dict
+        return self._session_dict
+
     def _make_command(self, op, path):
         args = path.split()
         cmd = [self._cli_shell_api, op] + args
@@ -204,11 +284,18 @@ class ConfigSourceSession(ConfigSource):
         Returns:
             True if called from a configuration session, False otherwise.
         """
-        try:
-            self._run(self._make_command('inSession', ''))
-            return True
-        except VyOSError:
-            return False
+        if self._in_session is None:
+            env = self.__session_env or os.environ
+            if 'VYATTA_TEMP_CONFIG_DIR' not in env:
+                # a session always has a working directory
+                self._in_session = False
+            else:
+                try:
+                    self._run(self._make_command('inSession', ''))
+                    self._in_session = True
+                except VyOSError:
+                    self._in_session = False
+        return self._in_session
 
     def show_config(self, path=[], default=None, effective=False):
         """
@@ -265,12 +352,7 @@ class ConfigSourceSession(ConfigSource):
         Note:
             It also returns False if node doesn't exist.
         """
-        try:
-            path = " ".join(self._level) + " " + path
-            self._run(self._make_command('isMulti', path))
-            return True
-        except VyOSError:
-            return False
+        return _schema_query(xml_ref.is_multi, self._level + path.split())
 
     def is_tag(self, path):
         """
@@ -283,12 +365,7 @@ class ConfigSourceSession(ConfigSource):
         Note:
             It also returns False if node doesn't exist.
         """
-        try:
-            path = " ".join(self._level) + " " + path
-            self._run(self._make_command('isTag', path))
-            return True
-        except VyOSError:
-            return False
+        return _schema_query(xml_ref.is_tag, self._level + path.split())
 
     def is_leaf(self, path):
         """
@@ -301,12 +378,7 @@ class ConfigSourceSession(ConfigSource):
         Note:
             It also returns False if node doesn't exist.
         """
-        try:
-            path = " ".join(self._level) + " " + path
-            self._run(self._make_command('isLeaf', path))
-            return True
-        except VyOSError:
-            return False
+        return _schema_query(xml_ref.is_leaf, self._level + path.split())
 
 class ConfigSourceString(ConfigSource):
     def __init__(self, running_config_text=None, session_config_text=None):
@@ -317,3 +389,31 @@ class ConfigSourceString(ConfigSource):
             self._session_config = ConfigTree(session_config_text) if session_config_text else None
         except ValueError:
             raise ConfigSourceError(f"Init error in {type(self)}")
+
+class ConfigSourceCache(ConfigSource):
+    """
+    Config source for long-running processes, such as vyos-configd:
+    trees and root dicts are taken from a ConfigCache, so that
+    unchanged config text is not parsed again.
+    """
+    def __init__(self, running_config_text=None, session_config_text=None,
+                 cache=None):
+        super().__init__()
+
+        if cache is None:
+            cache = ConfigCache()
+        if not isinstance(cache, ConfigCache):
+            raise TypeError("cache not of type ConfigCache")
+
+        try:
+            (self._running_config,
+             self._running_dict) = cache.load(running_config_text)
+            (self._session_config,
+             self._session_dict) = cache.load(session_config_text)
+        except ValueError:
+            raise ConfigSourceError(f"Init error in {type(self)}")
+
+    def get_root_dict(self, effective=False):
+        if effective:
+            return self._running_dict
+        return self._session_dict
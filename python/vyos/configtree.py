@@ -39,6 +39,51 @@ def check_path(path):
         pass
 
 
+# Function prototypes of libvyosconfig: name: (argtypes, restype)
+_prototypes = {
+    'from_string': ([c_char_p], c_void_p),
+    'get_error': ([], c_char_p),
+    'to_string': ([c_void_p, c_bool], c_char_p),
+    'to_commands': ([c_void_p, c_char_p], c_char_p),
+    'to_json': ([c_void_p], c_char_p),
+    'to_json_ast': ([c_void_p], c_char_p),
+    'set_add_value': ([c_void_p, c_char_p, c_char_p], c_int),
+    'delete_value': ([c_void_p, c_char_p, c_char_p], c_int),
+    'delete_node': ([c_void_p, c_char_p], c_int),
+    'rename_node': ([c_void_p, c_char_p, c_char_p], c_int),
+    'copy_node': ([c_void_p, c_char_p, c_char_p], c_int),
+    'set_replace_value': ([c_void_p, c_char_p, c_char_p], c_int),
+    'set_valueless': ([c_void_p, c_char_p], c_int),
+    'exists': ([c_void_p, c_char_p], c_int),
+    'list_nodes': ([c_void_p, c_char_p], c_char_p),
+    'return_value': ([c_void_p, c_char_p], c_char_p),
+    'return_values': ([c_void_p, c_char_p], c_char_p),
+    'is_tag': ([c_void_p, c_char_p], c_int),
+    'set_tag': ([c_void_p, c_char_p], c_int),
+    'get_subtree': ([c_void_p, c_char_p, c_bool], c_void_p),
+    'destroy': ([c_void_p], None),
+    'show_diff': ([c_bool, c_char_p, c_void_p, c_void_p], c_char_p),
+    'tree_union': ([c_void_p, c_void_p], c_void_p),
+    'diff_tree': ([c_char_p, c_void_p, c_void_p], c_void_p),
+    'reference_tree_to_json': ([c_char_p, c_char_p], c_int),
+}
+
+_libraries = {}
+
+def load_library(libpath=LIBPATH):
+    """ Load libvyosconfig and declare its function prototypes, once per
+    process and library path; all trees share the bound functions.
+    """
+    lib = _libraries.get(libpath)
+    if lib is None:
+        lib = cdll.LoadLibrary(libpath)
+        for name, (argtypes, restype) in _prototypes.items():
+            func = getattr(lib, name)
+            func.argtypes = argtypes
+            func.restype = restype
+        _libraries[libpath] = lib
+    return lib
+
 class ConfigTreeError(Exception):
     pass
 
@@ -48,98 +93,14 @@ class ConfigTree(object):
         if config_string is None and address is None:
             raise TypeError("ConfigTree() requires one of 'config_string' or 'address'")
         self.__config = None
-        self.__lib = cdll.LoadLibrary(libpath)
-
-        # Import functions
-        self.__from_string = self.__lib.from_string
-        self.__from_string.argtypes = [c_char_p]
-        self.__from_string.restype = c_void_p
-
-        self.__get_error = self.__lib.get_error
-        self.__get_error.argtypes = []
-        self.__get_error.restype = c_char_p
-
-        self.__to_string = self.__lib.to_string
-        self.__to_string.argtypes = [c_void_p, c_bool]
-        self.__to_string.restype = c_char_p
-
-        self.__to_commands = self.__lib.to_commands
-        self.__to_commands.argtypes = [c_void_p, c_char_p]
-        self.__to_commands.restype = c_char_p
-
-        self.__to_json = self.__lib.to_json
-        self.__to_json.argtypes = [c_void_p]
-        self.__to_json.restype = c_char_p
-
-        self.__to_json_ast = self.__lib.to_json_ast
-        self.__to_json_ast.argtypes = [c_void_p]
-        self.__to_json_ast.restype = c_char_p
-
-        self.__set_add_value = self.__lib.set_add_value
-        self.__set_add_value.argtypes = [c_void_p, c_char_p, c_char_p]
-        self.__set_add_value.restype = c_int
-
-        self.__delete_value = self.__lib.delete_value
-        self.__delete_value.argtypes = [c_void_p, c_char_p, c_char_p]
-        self.__delete_value.restype = c_int
-
-        self.__delete = self.__lib.delete_node
-        self.__delete.argtypes = [c_void_p, c_char_p]
-        self.__delete.restype = c_int
-
-        self.__rename = self.__lib.rename_node
-        self.__rename.argtypes = [c_void_p, c_char_p, c_char_p]
-        self.__rename.restype = c_int
-
-        self.__copy = self.__lib.copy_node
-        self.__copy.argtypes = [c_void_p, c_char_p, c_char_p]
-        self.__copy.restype = c_int
-
-        self.__set_replace_value = self.__lib.set_replace_value
-        self.__set_replace_value.argtypes = [c_void_p, c_char_p, c_char_p]
-        self.__set_replace_value.restype = c_int
-
-        self.__set_valueless = self.__lib.set_valueless
-        self.__set_valueless.argtypes = [c_void_p, c_char_p]
-        self.__set_valueless.restype = c_int
-
-        self.__exists = self.__lib.exists
-        self.__exists.argtypes = [c_void_p, c_char_p]
-        self.__exists.restype = c_int
-
-        self.__list_nodes = self.__lib.list_nodes
-        self.__list_nodes.argtypes = [c_void_p, c_char_p]
-        self.__list_nodes.restype = c_char_p
-
-        self.__return_value = self.__lib.return_value
-        self.__return_value.argtypes = [c_void_p, c_char_p]
-        self.__return_value.restype = c_char_p
-
-        self.__return_values = self.__lib.return_values
-        self.__return_values.argtypes = [c_void_p, c_char_p]
-        self.__return_values.restype = c_char_p
-
-        self.__is_tag = self.__lib.is_tag
-        self.__is_tag.argtypes = [c_void_p, c_char_p]
-        self.__is_tag.restype = c_int
-
-        self.__set_tag = self.__lib.set_tag
-        self.__set_tag.argtypes = [c_void_p, c_char_p]
-        self.__set_tag.restype = c_int
-
-        self.__get_subtree = self.__lib.get_subtree
-        self.__get_subtree.argtypes = [c_void_p, c_char_p]
-        self.__get_subtree.restype = c_void_p
-
-        self.__destroy = self.__lib.destroy
-        self.__destroy.argtypes = [c_void_p]
+        self.__lib = load_library(libpath)
 
         if address is None:
             config_section, version_section = extract_version(config_string)
             config_section = escape_backslash(config_section)
-            config = self.__from_string(config_section.encode())
+            config = self.__lib.from_string(config_section.encode())
             if config is None:
-                msg = self.__get_error().decode()
+                msg = self.__lib.get_error().decode()
                 raise ValueError("Failed to parse config: {0}".format(msg))
             else:
                 self.__config = config
@@ -152,7 +113,7 @@ class ConfigTree(object):
 
     def __del__(self):
         if self.__config is not None:
-            self.__destroy(self.__config)
+            self.__lib.destroy(self.__config)
 
     def __str__(self):
         return self.to_string()
@@ -161,18 +122,18 @@ class ConfigTree(object):
         return self.__config
 
     def to_string(self, ordered_values=False):
-        config_string = self.__to_string(self.__config, ordered_values).decode()
+        config_string = self.__lib.to_string(self.__config, ordered_values).decode()
         config_string = "{0}\n{1}".format(config_string, self.__version)
         return config_string
 
     def to_commands(self, op="set"):
-        return self.__to_commands(self.__config, op.encode()).decode()
+        return self.__lib.to_commands(self.__config, op.encode()).decode()
 
     def to_json(self):
-        return self.__to_json(self.__config).decode()
+        return self.__lib.to_json(self.__config).decode()
 
     def to_json_ast(self):
-        return self.__to_json_ast(self.__config).decode()
+        return self.__lib.to_json_ast(self.__config).decode()
 
     def set(self, path, value=None, replace=True):
         """Set new entry in VyOS configuration.
@@ -187,12 +148,12 @@ class ConfigTree(object):
         path_str = " ".join(map(str, path)).encode()
 
         if value is None:
-            self.__set_valueless(self.__config, path_str)
+            self.__lib.set_valueless(self.__config, path_str)
         else:
             if replace:
-                self.__set_replace_value(self.__config, path_str, str(value).encode())
+                self.__lib.set_replace_value(self.__config, path_str, str(value).encode())
             else:
-                self.__set_add_value(self.__config, path_str, str(value).encode())
+                self.__lib.set_add_value(self.__config, path_str, str(value).encode())
 
         if self.__migration:
             print(f"- op: set path: {path} value: {value} replace: {replace}")
@@ -201,7 +162,7 @@ class ConfigTree(object):
         check_path(path)
         path_str = " ".join(map(str, path)).encode()
 
-        res = self.__delete(self.__config, path_str)
+        res = self.__lib.delete_node(self.__config, path_str)
         if (res != 0):
             raise ConfigTreeError(f"Path doesn't exist: {path}")
 
@@ -212,7 +173,7 @@ class ConfigTree(object):
         check_path(path)
         path_str = " ".join(map(str, path)).encode()
 
-        res = self.__delete_value(self.__config, path_str, value.encode())
+        res = self.__lib.delete_value(self.__config, path_str, value.encode())
         if (res != 0):
             if res == 1:
                 raise ConfigTreeError(f"Path doesn't exist: {path}")
@@ -233,7 +194,7 @@ class ConfigTree(object):
         new_path = path[:-1] + [new_name]
         if self.exists(new_path):
             raise ConfigTreeError()
-        res = self.__rename(self.__config, path_str, newname_str)
+        res = self.__lib.rename_node(self.__config, path_str, newname_str)
         if (res != 0):
             raise ConfigTreeError("Path [{}] doesn't exist".format(path))
 
@@ -249,9 +210,9 @@ class ConfigTree(object):
         # Check if a node with intended new name already exists
         if self.exists(new_path):
             raise ConfigTreeError()
-        res = self.__copy(self.__config, oldpath_str, newpath_str)
+        res = self.__lib.copy_node(self.__config, oldpath_str, newpath_str)
         if (res != 0):
-            msg = self.__get_error().decode()
+            msg = self.__lib.get_error().decode()
             raise ConfigTreeError(msg)
 
         if self.__migration:
@@ -261,7 +222,7 @@ class ConfigTree(object):
         check_path(path)
         path_str = " ".join(map(str, path)).encode()
 
-        res = self.__exists(self.__config, path_str)
+        res = self.__lib.exists(self.__config, path_str)
         if (res == 0):
             return False
         else:
@@ -271,7 +232,7 @@ class ConfigTree(object):
         check_path(path)
         path_str = " ".join(map(str, path)).encode()
 
-        res_json = self.__list_nodes(self.__config, path_str).decode()
+        res_json = self.__lib.list_nodes(self.__config, path_str).decode()
         res = json.loads(res_json)
 
         if res is None:
@@ -283,7 +244,7 @@ class ConfigTree(object):
         check_path(path)
         path_str = " ".join(map(str, path)).encode()
 
-        res_json = self.__return_value(self.__config, path_str).decode()
+        res_json = self.__lib.return_value(self.__config, path_str).decode()
         res = json.loads(res_json)
 
         if res is None:
@@ -295,7 +256,7 @@ class ConfigTree(object):
         check_path(path)
         path_str = " ".join(map(str, path)).encode()
 
-        res_json = self.__return_values(self.__config, path_str).decode()
+        res_json = self.__lib.return_values(self.__config, path_str).decode()
         res = json.loads(res_json)
 
         if res is None:
@@ -307,7 +268,7 @@ class ConfigTree(object):
         check_path(path)
         path_str = " ".join(map(str, path)).encode()
 
-        res = self.__is_tag(self.__config, path_str)
+        res = self.__lib.is_tag(self.__config, path_str)
         if (res >= 1):
             return True
         else:
@@ -317,7 +278,7 @@ class ConfigTree(object):
         check_path(path)
         path_str = " ".join(map(str, path)).encode()
 
-        res = self.__set_tag(self.__config, path_str)
+        res = self.__lib.set_tag(self.__config, path_str)
         if (res == 0):
             return True
         else:
@@ -327,10 +288,113 @@ class ConfigTree(object):
         check_path(path)
         path_str = " ".join(map(str, path)).encode()
 
-        res = self.__get_subtree(self.__config, path_str, with_node)
+        res = self.__lib.get_subtree(self.__config, path_str, with_node)
         subt = ConfigTree(address=res)
         return subt
 
+    def query(self, path=[]):
+        """ Return a TreeQuery of the subtree at path, for answering many
+        queries with a single round-trip to the library.
+        """
+        check_path(path)
+        if not path:
+            return TreeQuery(json.loads(self.to_json()))
+        if not self.exists(path):
+            raise ConfigTreeError(f"Path {path} doesn't exist")
+        subtree = self.get_subtree(path)
+        return TreeQuery(json.loads(subtree.to_json()))
+
+class TreeQuery:
+    """ Read-only queries on the dict representation of a (sub)tree.
+
+    Answers exists, return_value, return_values and list_nodes from a dict
+    decoded once, instead of crossing the library boundary and decoding
+    JSON per path. Paths are relative to the root of the dict.
+
+    Note: the dict representation does not distinguish valueless leaf
+    nodes from empty non-leaf nodes; return_value returns None for both.
+    """
+    def __init__(self, d: dict):
+        if not isinstance(d, dict):
+            raise TypeError("Expected a dict, got a {}".format(type(d)))
+        self.dict = d
+
+    def _get(self, path):
+        check_path(path)
+        d = self.dict
+        for k in path:
+            if not isinstance(d, dict) or k not in d:
+                raise ConfigTreeError(f"Path {path} doesn't exist")
+            d = d[k]
+        return d
+
+    def exists(self, path):
+        try:
+            self._get(path)
+        except ConfigTreeError:
+            return False
+        return True
+
+    def list_nodes(self, path):
+        res = self._get(path)
+        if not isinstance(res, dict):
+            return []
+        return list(res)
+
+    def return_value(self, path):
+        res = self._get(path)
+        if isinstance(res, list):
+            return res[0] if res else None
+        if isinstance(res, dict):
+            return None
+        return res
+
+    def return_values(self, path):
+        res = self._get(path)
+        if isinstance(res, list):
+            return res.copy()
+        if isinstance(res, dict):
+            return []
+        return [res]
+
+    def query(self, queries):
+        """ Answer a list of (method, path) queries, where method is one of
+        'exists', 'return_value', 'return_values' or 'list_nodes'.
+
+        Returns: list of results, in order; None for paths that do not
+        exist, except for 'exists'
+        """
+        methods = {'exists': self.exists,
+                   'return_value': self.return_value,
+                   'return_values': self.return_values,
+                   'list_nodes': self.list_nodes}
+        res = []
+        for method, path in queries:
+            if method not in methods:
+                raise ValueError(f"Unknown query method '{method}'")
+            try:
+                res.append(methods[method](path))
+            except ConfigTreeError:
+                res.append(None)
+        return res
+
+    def __iter__(self):
+        """ Iterate over (path, values) of all leaf nodes, depth-first;
+        values is a list, empty for valueless nodes.
+        """
+        def walk(path, d):
+            for k, v in d.items():
+                if isinstance(v, dict) and v:
+                    yield from walk(path + [k], v)
+                elif isinstance(v, dict):
+                    yield path + [k], []
+                elif isinstance(v, list):
+                    yield path + [k], v.copy()
+                else:
+                    yield path + [k], [v]
+
+        return walk([], self.dict)
+
 def show_diff(left, right, path=[], commands=False, libpath=LIBPATH):
     if left is None:
         left = ConfigTree(config_string='\n')
@@ -345,18 +409,12 @@ def show_diff(left, right, path=[], commands=False, libpath=LIBPATH):
     check_path(path)
     path_str = " ".join(map(str, path)).encode()
 
-    __lib = cdll.LoadLibrary(libpath)
-    __show_diff = __lib.show_diff
-    __show_diff.argtypes = [c_bool, c_char_p, c_void_p, c_void_p]
-    __show_diff.restype = c_char_p
-    __get_error = __lib.get_error
-    __get_error.argtypes = []
-    __get_error.restype = c_char_p
+    __lib = load_library(libpath)
 
-    res = __show_diff(commands, path_str, left._get_config(), right._get_config())
+    res = __lib.show_diff(commands, path_str, left._get_config(), right._get_config())
     res = res.decode()
     if res == "#1@":
-        msg = __get_error().decode()
+        msg = __lib.get_error().decode()
         raise ConfigTreeError(msg)
 
     return res
@@ -369,32 +427,49 @@ def union(left, right, libpath=LIBPATH):
     if not (isinstance(left, ConfigTree) and isinstance(right, ConfigTree)):
         raise TypeError("Arguments must be instances of ConfigTree")
 
-    __lib = cdll.LoadLibrary(libpath)
-    __tree_union = __lib.tree_union
-    __tree_union.argtypes = [c_void_p, c_void_p]
-    __tree_union.restype = c_void_p
-    __get_error = __lib.get_error
-    __get_error.argtypes = []
-    __get_error.restype = c_char_p
+    __lib = load_library(libpath)
 
-    res = __tree_union( left._get_config(), right._get_config())
+    res = __lib.tree_union(left._get_config(), right._get_config())
     tree = ConfigTree(address=res)
 
     return tree
 
+def tree_from_dict(d: dict, is_tag=None, libpath=LIBPATH):
+    """ Build a ConfigTree from its dict representation, as decoded from
+    to_json(). The dict representation does not tell tag nodes apart:
+    is_tag(path) is called for each non-leaf node not being a tag node
+    value, and the node is marked as a tag node if it returns True.
+    """
+    tree = ConfigTree(config_string='', libpath=libpath)
+
+    def walk(path, node, tag_values):
+        for name, value in node.items():
+            p = path + [name]
+            if isinstance(value, dict):
+                if value:
+                    tag = not tag_values and is_tag is not None and is_tag(p)
+                    walk(p, value, tag)
+                    if tag:
+                        tree.set_tag(p)
+                else:
+                    tree.set(p)
+            elif isinstance(value, list):
+                for v in value:
+                    tree.set(p, value=v, replace=False)
+            else:
+                tree.set(p, value=value)
+
+    walk([], d, False)
+    return tree
+
 def reference_tree_to_json(from_dir, to_file, libpath=LIBPATH):
     try:
-        __lib = cdll.LoadLibrary(libpath)
-        __reference_tree_to_json = __lib.reference_tree_to_json
-        __reference_tree_to_json.argtypes = [c_char_p, c_char_p]
-        __get_error = __lib.get_error
-        __get_error.argtypes = []
-        __get_error.restype = c_char_p
-        res = __reference_tree_to_json(from_dir.encode(), to_file.encode())
+        __lib = load_library(libpath)
+        res = __lib.reference_tree_to_json(from_dir.encode(), to_file.encode())
     except Exception as e:
         raise ConfigTreeError(e)
     if res == 1:
-        msg = __get_error().decode()
+        msg = __lib.get_error().decode()
         raise ConfigTreeError(msg)
 
 class DiffTree:
@@ -414,16 +489,12 @@ class DiffTree:
         self.left = left
         self.right = right
 
-        self.__lib = cdll.LoadLibrary(libpath)
-
-        self.__diff_tree = self.__lib.diff_tree
-        self.__diff_tree.argtypes = [c_char_p, c_void_p, c_void_p]
-        self.__diff_tree.restype = c_void_p
+        self.__lib = load_library(libpath)
 
         check_path(path)
         path_str = " ".join(map(str, path)).encode()
 
-        res = self.__diff_tree(path_str, left._get_config(), right._get_config())
+        res = self.__lib.diff_tree(path_str, left._get_config(), right._get_config())
 
         # full diff config_tree and python dict representation
         self.full = ConfigTree(address=res)
@@ -0,0 +1,187 @@
+# Copyright 2023 VyOS maintainers and contributors <maintainers@vyos.io>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Streaming access to the conntrack table.
+
+The XML output of "conntrack --dump" is parsed incrementally and flows are
+yielded one at a time, so memory use does not grow with the size of the
+table. Each flow is a dict in the same layout as produced by
+xmltodict.parse(xml, attr_prefix='') for a <flow> element.
+"""
+
+from collections import Counter
+from subprocess import Popen
+from subprocess import PIPE
+from xml.etree.ElementTree import XMLPullParser
+
+def _element_to_dict(elem):
+    data = dict(elem.attrib)
+    for child in elem:
+        value = _element_to_dict(child)
+        if child.tag not in data:
+            data[child.tag] = value
+        elif isinstance(data[child.tag], list):
+            data[child.tag].append(value)
+        else:
+            data[child.tag] = [data[child.tag], value]
+
+    text = (elem.text or '').strip()
+    if not data:
+        return text or None
+    if text:
+        data['#text'] = text
+    return data
+
+def parse_flows(stream, limit=None):
+    """ Parse conntrack XML output from a binary stream
+
+    Yields: dict per <flow> element
+    """
+    parser = XMLPullParser(events=('start', 'end'))
+    root = None
+    count = 0
+    while True:
+        chunk = stream.read1(1 << 16)
+        if not chunk:
+            # no output at all if the table is empty
+            if root is None:
+                return
+            parser.close()
+        else:
+            parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == 'start':
+                if root is None:
+                    root = elem
+                continue
+            if elem.tag != 'flow':
+                continue
+            yield _element_to_dict(elem)
+            # drop the parsed flow, only the current one is kept in memory
+            root.remove(elem)
+            count += 1
+            if limit is not None and count >= limit:
+                return
+        if not chunk:
+            return
+
+def dump_command(family='ipv4', zone=None, source=None, destination=None,
+                 protocol=None, nat=None, sudo=False):
+    """ Return the conntrack command line for a filtered dump; filters are
+    applied by conntrack (and the kernel, where supported) """
+    command = ['conntrack', '--dump', '--family', family, '--output', 'xml']
+    if nat == 'source':
+        command.append('--src-nat')
+    elif nat == 'destination':
+        command.append('--dst-nat')
+    if zone is not None:
+        command += ['--zone', str(zone)]
+    if source:
+        command += ['--src', source]
+    if destination:
+        command += ['--dst', destination]
+    if protocol:
+        command += ['--proto', protocol]
+    if sudo:
+        command.insert(0, 'sudo')
+    return command
+
+def dump_flows(family='ipv4', zone=None, source=None, destination=None,
+               protocol=None, nat=None, limit=None, sudo=False):
+    """ Dump the conntrack table
+
+    family:      'ipv4' or 'ipv6'
+    zone:        only flows in this conntrack zone
+    source:      only flows with this original source address
+    destination: only flows with this original destination address
+    protocol:    only flows of this layer 4 protocol, e.g. 'tcp'
+    nat:         only flows translated by 'source' or 'destination' NAT
+    limit:       stop after this number of flows
+
+    Yields: dict per flow
+
+    Raises OSError if conntrack fails
+    """
+    command = dump_command(family, zone, source, destination, protocol, nat,
+                           sudo)
+    proc = Popen(command, stdout=PIPE, stderr=PIPE)
+    count = 0
+    killed = True
+    try:
+        for flow in parse_flows(proc.stdout, limit):
+            count += 1
+            yield flow
+        killed = limit is not None and count >= limit
+    finally:
+        # stopped early, by limit or by the consumer
+        if killed:
+            proc.kill()
+        proc.stdout.close()
+        err = proc.stderr.read().decode(errors='replace').strip()
+        proc.stderr.close()
+        proc.wait()
+
+    if proc.returncode and not killed:
+        raise OSError(proc.returncode, err)
+
+def flow_tuple(flow) -> dict:
+    """ Return the commonly used fields of a flow as a flat dict:
+    protocol, orig_src, orig_dst, orig_sport, orig_dport, reply_src,
+    reply_dst, reply_sport, reply_dport, id, state, timeout, mark, zone
+    """
+    res = {}
+    for meta in flow['meta']:
+        direction = meta['direction']
+        if direction in ['original', 'reply']:
+            prefix = 'orig' if direction == 'original' else 'reply'
+            if 'layer3' in meta:
+                res[f'{prefix}_src'] = meta['layer3']['src']
+                res[f'{prefix}_dst'] = meta['layer3']['dst']
+            if 'layer4' in meta:
+                res[f'{prefix}_sport'] = meta['layer4'].get('sport')
+                res[f'{prefix}_dport'] = meta['layer4'].get('dport')
+                res['protocol'] = meta['layer4']['protoname']
+        elif direction == 'independent':
+            for key in ['id', 'state', 'timeout', 'mark', 'zone']:
+                res[key] = meta.get(key)
+    return res
+
+def summarize(flows, top=10) -> dict:
+    """ Aggregate flows in a single pass
+
+    Returns: dict with the total number of flows, the number of flows per
+    state and per protocol, and the original source addresses with the
+    most flows (top talkers)
+    """
+    total = 0
+    states = Counter()
+    protocols = Counter()
+    talkers = Counter()
+    for flow in flows:
+        tmp = flow_tuple(flow)
+        total += 1
+        states[tmp.get('state') or 'none'] += 1
+        protocols[tmp.get('protocol') or 'unknown'] += 1
+        if tmp.get('orig_src'):
+            talkers[tmp['orig_src']] += 1
+
+    return {
+        'total': total,
+        'state': dict(states.most_common()),
+        'protocol': dict(protocols.most_common()),
+        'top_talkers': [{'address': address, 'flows': count}
+                        for address, count in talkers.most_common(top)]
+    }
@@ -0,0 +1,304 @@
+# Copyright 2023 VyOS maintainers and contributors <maintainers@vyos.io>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Indexed store of ISC DHCP server leases.
+
+dhcpd appends a lease block to its leases file for every change of a lease,
+and periodically rewrites the file with only the current leases. The last
+block of an address is the current state of its lease, so the store keeps
+one lease per address, and indexes of the addresses per MAC address and per
+pool (shared-network-name).
+
+The parsed leases are saved to a cache file together with the inode of the
+leases file and the offset up to which it was parsed; as long as the leases
+file was only appended to, a later update only parses the new blocks.
+"""
+
+import os
+import re
+import json
+import codecs
+import binascii
+import calendar
+import tempfile
+
+cache_version = 1
+
+def _parse_time(value: str):
+    """ Convert an ISC lease time ('4 2023/08/03 10:00:00' or 'epoch
+    1691056800') to UNIX time, None for 'never' """
+    if value == 'never':
+        return None
+    if value.startswith('epoch '):
+        return float(value.split(' ')[1])
+    _, date_part, time_part = value.split(' ')
+    year, mon, day = date_part.split('/')
+    hour, minute, sec = time_part.split(':')
+    return float(calendar.timegm((int(year), int(mon), int(day),
+                                  int(hour), int(minute), int(sec))))
+
+def _statement(line: str):
+    """ Split a statement line of a lease block into (kind, key, value),
+    kind being 'option', 'set' or '' for all other statements """
+    line = line.strip()
+    if '; #' in line:
+        line = line[:line.index('; #') + 1]
+    if not line.endswith(';'):
+        return None
+    line = line[:-1]
+    if line.startswith('option '):
+        key, _, value = line[7:].partition(' ')
+        return 'option', key, value
+    if line.startswith('set '):
+        key, _, value = line[4:].partition(' = ')
+        return 'set', key, value.strip('"')
+    key, _, value = line.partition(' ')
+    return '', key, value
+
+def _host_identifier(value: str) -> str:
+    """ Hex representation of the quoted, octal escaped IAID/DUID of an
+    IPv6 lease """
+    raw = codecs.decode(value, 'unicode_escape').encode('latin-1')
+    return binascii.hexlify(raw).decode('ascii')
+
+_block = re.compile(r'^(\S[^\n]*)\{\n(.*?)^\}\n', re.MULTILINE | re.DOTALL)
+_statement4 = re.compile(r'^\s+(starts|ends|binding state|hardware ethernet|'
+                         r'client-hostname|set shared-networkname =) ([^\n]*?);'
+                         r'(?: #[^\n]*)?$', re.MULTILINE)
+
+def _lease4(header: str, config: str):
+    ip = header.split(' ')[1]
+    lease = {'ip': ip, 'state': None, 'pool': '', 'start': None,
+             'end': None, 'mac': None, 'hostname': ''}
+    for key, value in _statement4.findall(config):
+        if key == 'binding state':
+            lease['state'] = value
+        elif key == 'starts':
+            lease['start'] = _parse_time(value)
+        elif key == 'ends':
+            lease['end'] = _parse_time(value)
+        elif key == 'hardware ethernet':
+            lease['mac'] = value
+        elif key == 'client-hostname':
+            lease['hostname'] = value.replace('"', '')
+        else:
+            lease['pool'] = value.strip('"')
+
+    # leases without hardware address are backup or abandoned
+    # addresses, not assigned to a client
+    if lease['mac'] is None:
+        return []
+    return [lease]
+
+def _lease6(header: str, config: str):
+    lease_type = header[3:5]
+    host_identifier = _host_identifier(header[header.index('"') + 1:header.rindex('"')])
+    cltt = None
+    leases = []
+    lease = None
+    for line in config.splitlines():
+        stripped = line.strip()
+        if stripped.startswith(('iaaddr ', 'iaprefix ')):
+            lease = {'ip': stripped.split(' ')[1], 'state': None, 'pool': '',
+                     'end': None, 'last_communication': None,
+                     'host_identifier': host_identifier, 'type': lease_type}
+            leases.append(lease)
+            continue
+        if stripped == '}':
+            lease = None
+            continue
+        tmp = _statement(line)
+        if tmp is None:
+            continue
+        kind, key, value = tmp
+        if lease is None:
+            if not kind and key == 'cltt':
+                cltt = _parse_time(value)
+            continue
+        if kind == 'set':
+            if key == 'shared-networkname':
+                lease['pool'] = value
+        elif kind:
+            continue
+        elif key == 'binding':
+            lease['state'] = value.split(' ', 1)[1]
+        elif key == 'ends':
+            lease['end'] = _parse_time(value)
+
+    for lease in leases:
+        lease['last_communication'] = cltt
+    return leases
+
+def parse_blocks(data: str):
+    """ Parse complete top-level blocks of leases file text
+
+    Returns: tuple of (list of leases in file order, number of characters
+    parsed); an incomplete block at the end is not parsed
+    """
+    leases = []
+    parsed = 0
+    for match in _block.finditer(data):
+        header, config = match.groups()
+        if header.startswith('lease '):
+            leases += _lease4(header, config)
+        elif header.startswith(('ia-na ', 'ia-ta ', 'ia-pd ')):
+            leases += _lease6(header, config)
+        parsed = match.end()
+    return leases, parsed
+
+class LeaseStore:
+    """ Current leases of a DHCP server leases file
+
+    Args:
+        lease_file (str): path of the ISC DHCP server leases file
+        cache_file (str): path of the cache of parsed leases, None to
+            always parse the leases file completely
+    """
+    def __init__(self, lease_file, cache_file=None):
+        self.lease_file = lease_file
+        self.cache_file = cache_file
+        self._inode = None
+        self._offset = 0
+        self._tail = ''
+        self._leases = {}
+        self._by_mac = {}
+        self._by_pool = {}
+
+    def _reset(self):
+        self._inode = None
+        self._offset = 0
+        self._tail = ''
+        self._leases = {}
+        self._by_mac = {}
+        self._by_pool = {}
+
+    def _add(self, lease):
+        ip = lease['ip']
+        old = self._leases.pop(ip, None)
+        if old is not None:
+            self._by_pool[old['pool']].pop(ip, None)
+            if old.get('mac'):
+                self._by_mac[old['mac']].pop(ip, None)
+        # ordered by the last change of a lease, as in the leases file
+        self._leases[ip] = lease
+        self._by_pool.setdefault(lease['pool'], {})[ip] = None
+        if lease.get('mac'):
+            self._by_mac.setdefault(lease['mac'], {})[ip] = None
+
+    def _load_cache(self):
+        try:
+            stat = os.stat(self.cache_file)
+            # do not trust a cache written by someone else
+            if stat.st_uid not in [0, os.getuid()]:
+                return
+            with open(self.cache_file) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cache.get('version') != cache_version or \
+           cache.get('lease_file') != self.lease_file:
+            return
+        self._inode = tuple(cache['inode'])
+        self._offset = cache['offset']
+        self._tail = cache['tail']
+        fields = cache['fields']
+        for values in cache['leases']:
+            self._add(dict(zip(fields, values)))
+
+    def _save_cache(self):
+        # leases of a file all have the same fields, saved once
+        leases = list(self._leases.values())
+        fields = list(leases[0]) if leases else []
+        cache = {'version': cache_version, 'lease_file': self.lease_file,
+                 'inode': self._inode, 'offset': self._offset,
+                 'tail': self._tail, 'fields': fields,
+                 'leases': [list(lease.values()) for lease in leases]}
+        dirname = os.path.dirname(self.cache_file)
+        try:
+            fd, tmp = tempfile.mkstemp(dir=dirname, prefix='.leases')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(cache, f, separators=(',', ':'))
+            os.replace(tmp, self.cache_file)
+        except OSError:
+            # the cache is an optimization only
+            pass
+
+    def update(self):
+        """ Read changes of the leases file since the last update """
+        if self.cache_file and self._inode is None:
+            self._load_cache()
+
+        try:
+            stat = os.stat(self.lease_file)
+        except FileNotFoundError:
+            self._reset()
+            return self
+
+        inode = (stat.st_dev, stat.st_ino)
+        with open(self.lease_file, 'rb') as f:
+            # the file was rewritten, or changed other than by appending
+            if inode != self._inode or stat.st_size < self._offset:
+                self._reset()
+            elif self._tail:
+                f.seek(self._offset - len(self._tail))
+                if f.read(len(self._tail)) != self._tail.encode('latin-1'):
+                    self._reset()
+            f.seek(self._offset)
+            data = f.read().decode('latin-1')
+
+        if not data and self._inode == inode:
+            return self
+
+        leases, parsed = parse_blocks(data)
+        for lease in leases:
+            self._add(lease)
+        self._inode = inode
+        self._offset += parsed
+        self._tail = data[max(0, parsed - 64):parsed] if parsed else self._tail
+
+        if self.cache_file and parsed:
+            self._save_cache()
+        return self
+
+    def get(self, ip):
+        """ Return the current lease of an address, or None """
+        return self._leases.get(ip)
+
+    def by_mac(self, mac) -> list:
+        """ Return the current leases of a client MAC address """
+        return [self._leases[ip] for ip in self._by_mac.get(mac, {})]
+
+    def leases(self, pools=None, states=None) -> list:
+        """ Return current leases, in the order of their last change
+
+        pools:  list of pool names to return leases of, or None for all
+        states: list of binding states to return leases in, or None for all
+        """
+        if pools is None:
+            ips = self._leases
+        elif len(pools) == 1:
+            ips = self._by_pool.get(pools[0], {})
+        else:
+            ips = [ip for ip in self._leases if self._leases[ip]['pool'] in pools]
+        res = [self._leases[ip] for ip in ips]
+        if states is not None:
+            res = [lease for lease in res if lease['state'] in states]
+        return res
+
+    def count(self, pool, exclude_states=[]) -> int:
+        """ Return the number of current leases of a pool """
+        return sum(1 for ip in self._by_pool.get(pool, {})
+                   if self._leases[ip]['state'] not in exclude_states)
@@ -13,10 +13,11 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library.  If not, see <http://www.gnu.org/licenses/>.
 
-import os
 import re
+import struct
+from functools import cached_property
 
-from vyos.utils.process import popen
+from vyos.ioctl import ethtool_ioctl
 
 # These drivers do not support using ethtool to change the speed, duplex, or
 # flow control settings
@@ -24,9 +25,99 @@ _drivers_without_speed_duplex_flow = ['vmxnet3', 'virtio_net', 'xen_netfront',
                                       'iavf', 'ice', 'i40e', 'hv_netvsc', 'veth', 'ixgbevf',
                                       'tun']
 
+# ethtool commands, see linux/ethtool.h
+ETHTOOL_GSET = 0x00000001
+ETHTOOL_GDRVINFO = 0x00000003
+ETHTOOL_GRINGPARAM = 0x00000010
+ETHTOOL_GPAUSEPARAM = 0x00000012
+ETHTOOL_GSTRINGS = 0x0000001b
+ETHTOOL_GSSET_INFO = 0x00000037
+ETHTOOL_GFEATURES = 0x0000003a
+ETHTOOL_GLINKSETTINGS = 0x0000004c
+
+ETH_SS_FEATURES = 4
+ETH_GSTRING_LEN = 32
+AUTONEG_ENABLE = 1
+
+# bit numbers of enum ethtool_link_mode_bit_indices
+_link_modes = (
+    '10baseT_Half', '10baseT_Full', '100baseT_Half', '100baseT_Full',
+    '1000baseT_Half', '1000baseT_Full', 'Autoneg', 'TP', 'AUI', 'MII',
+    'FIBRE', 'BNC', '10000baseT_Full', 'Pause', 'Asym_Pause',
+    '2500baseX_Full', 'Backplane', '1000baseKX_Full', '10000baseKX4_Full',
+    '10000baseKR_Full', '10000baseR_FEC', '20000baseMLD2_Full',
+    '20000baseKR2_Full', '40000baseKR4_Full', '40000baseCR4_Full',
+    '40000baseSR4_Full', '40000baseLR4_Full', '56000baseKR4_Full',
+    '56000baseCR4_Full', '56000baseSR4_Full', '56000baseLR4_Full',
+    '25000baseCR_Full', '25000baseKR_Full', '25000baseSR_Full',
+    '50000baseCR2_Full', '50000baseKR2_Full', '100000baseKR4_Full',
+    '100000baseSR4_Full', '100000baseCR4_Full', '100000baseLR4_ER4_Full',
+    '50000baseSR2_Full', '1000baseX_Full', '10000baseCR_Full',
+    '10000baseSR_Full', '10000baseLR_Full', '10000baseLRM_Full',
+    '10000baseER_Full', '2500baseT_Full', '5000baseT_Full', 'FEC_NONE',
+    'FEC_RS', 'FEC_BASER', '50000baseKR_Full', '50000baseSR_Full',
+    '50000baseCR_Full', '50000baseLR_ER_FR_Full', '50000baseDR_Full',
+    '100000baseKR2_Full', '100000baseSR2_Full', '100000baseCR2_Full',
+    '100000baseLR2_ER2_FR2_Full', '100000baseDR2_Full', '200000baseKR4_Full',
+    '200000baseSR4_Full', '200000baseLR4_ER4_FR4_Full', '200000baseDR4_Full',
+    '200000baseCR4_Full', '100baseT1_Full', '1000baseT1_Full',
+    '400000baseKR8_Full', '400000baseSR8_Full', '400000baseLR8_ER8_FR8_Full',
+    '400000baseDR8_Full', '400000baseCR8_Full', 'FEC_LLRS',
+    '100000baseKR_Full', '100000baseSR_Full', '100000baseLR_ER_FR_Full',
+    '100000baseCR_Full', '100000baseDR_Full', '200000baseKR2_Full',
+    '200000baseSR2_Full', '200000baseLR2_ER2_FR2_Full', '200000baseDR2_Full',
+    '200000baseCR2_Full', '400000baseKR4_Full', '400000baseSR4_Full',
+    '400000baseLR4_ER4_FR4_Full', '400000baseDR4_Full', '400000baseCR4_Full',
+    '100baseFX_Half', '100baseFX_Full', '10baseT1L_Full', '800000baseCR8_Full',
+    '800000baseKR8_Full', '800000baseDR8_Full', '800000baseDR8_2_Full',
+    '800000baseSR8_Full', '800000baseVR8_Full', '10baseT1S_Full',
+    '10baseT1S_Half', '10baseT1S_P2MP_Half',
+)
+_link_mode_autoneg = _link_modes.index('Autoneg')
+
+# feature names as shown by "ethtool --show-features" for groups of kernel
+# features; a group is enabled if any of its features is active and fixed
+# if none of its features can be changed
+_feature_groups = {
+    'rx-checksumming': ['rx-checksum'],
+    'tx-checksumming': ['tx-checksum-ipv4', 'tx-checksum-ip-generic',
+                        'tx-checksum-ipv6', 'tx-checksum-fcoe-crc',
+                        'tx-checksum-sctp'],
+    'scatter-gather': ['tx-scatter-gather', 'tx-scatter-gather-fraglist'],
+    'tcp-segmentation-offload': ['tx-tcp-segmentation',
+                                 'tx-tcp-ecn-segmentation',
+                                 'tx-tcp-mangleid-segmentation',
+                                 'tx-tcp6-segmentation'],
+    'generic-segmentation-offload': ['tx-generic-segmentation'],
+    'generic-receive-offload': ['rx-gro'],
+    'large-receive-offload': ['rx-lro'],
+}
+
+def _ethtool(ifname, fmt, *args, size=None):
+    """ Issue an ethtool command and unpack the result; returns None if
+    the command is not supported by the interface """
+    data = bytearray(struct.pack(fmt, *args))
+    if size is not None:
+        data.extend(bytes(size - len(data)))
+    try:
+        ethtool_ioctl(ifname, data)
+    except OSError:
+        return None
+    return data
+
+def _bits(words):
+    for i, word in enumerate(words):
+        for bit in range(32):
+            if word & (1 << bit):
+                yield i * 32 + bit
+
 class Ethtool:
     """
     Class is used to retrive and cache information about an ethernet adapter
+
+    Information is read from the kernel using the ethtool ioctl interface,
+    grouped by ethtool command: each group is only queried when one of its
+    attributes is first accessed.
     """
     # dictionary containing driver featurs, it will be populated on demand and
     # the content will look like:
@@ -40,105 +131,165 @@ class Ethtool:
     #   'tx-checksumming': {'fixed': False, 'enabled': True},
     #   'tx-esp-segmentation': {'fixed': True, 'enabled': False},
     # }
-    _features = { }
+    #
     # dictionary containing available interface speed and duplex settings
     # {
     #   '10'  : {'full': '', 'half': ''},
     #   '100' : {'full': '', 'half': ''},
     #   '1000': {'full': ''}
     #  }
-    _speed_duplex = {'auto': {'auto': ''}}
-    _ring_buffers = { }
-    _ring_buffers_max = { }
-    _driver_name = None
-    _auto_negotiation = False
-    _auto_negotiation_supported = None
-    _flow_control = False
-    _flow_control_enabled = None
 
     def __init__(self, ifname):
-        # Get driver used for interface
-        out, err = popen(f'ethtool --driver {ifname}')
-        driver = re.search(r'driver:\s(\w+)', out)
-        if driver:
-            self._driver_name = driver.group(1)
-
-        # Build a dictinary of supported link-speed and dupley settings.
-        out, err = popen(f'ethtool {ifname}')
-        reading = False
-        pattern = re.compile(r'\d+base.*')
-        for line in out.splitlines()[1:]:
-            line = line.lstrip()
-            if 'Supported link modes:' in line:
-                reading = True
-            if 'Supported pause frame use:' in line:
-                reading = False
-            if reading:
-                for block in line.split():
-                    if pattern.search(block):
-                        speed = block.split('base')[0]
-                        duplex = block.split('/')[-1].lower()
-                        if speed not in self._speed_duplex:
-                            self._speed_duplex.update({ speed : {}})
-                        if duplex not in self._speed_duplex[speed]:
-                            self._speed_duplex[speed].update({ duplex : ''})
-            if 'Supports auto-negotiation:' in line:
-                # Split the following string: Auto-negotiation: off
-                # we are only interested in off or on
-                tmp = line.split()[-1]
-                self._auto_negotiation_supported = bool(tmp == 'Yes')
-            # Only read in if Auto-negotiation is supported
-            if self._auto_negotiation_supported and 'Auto-negotiation:' in line:
-                # Split the following string: Auto-negotiation: off
-                # we are only interested in off or on
-                tmp = line.split()[-1]
-                self._auto_negotiation = bool(tmp == 'on')
-
-        # Now populate features dictionaty
-        out, err = popen(f'ethtool --show-features {ifname}')
-        # skip the first line, it only says: "Features for eth0":
-        for line in out.splitlines()[1:]:
-            if ":" in line:
-                key, value = [s.strip() for s in line.strip().split(":", 1)]
-                fixed = bool('fixed' in value)
-                if fixed:
-                    value = value.split()[0].strip()
-                self._features[key.strip()] = {
-                    'enabled' : bool(value == 'on'),
-                    'fixed' : fixed
+        self.ifname = ifname
+
+    @cached_property
+    def _driver_name(self):
+        # struct ethtool_drvinfo: cmd, driver[32], ...
+        data = _ethtool(self.ifname, 'I32s', ETHTOOL_GDRVINFO, b'', size=196)
+        if data is None:
+            return None
+        driver = data[4:36].split(b'\0', 1)[0].decode()
+        driver = re.match(r'\w+', driver)
+        return driver.group(0) if driver else None
+
+    @cached_property
+    def _link_settings(self):
+        """ Supported link modes and autoneg setting: tuple of (list of
+        supported link mode bits, autoneg enabled) """
+        # struct ethtool_link_settings: a first request with zero
+        # link_mode_masks_nwords returns the negated number of words needed
+        fmt = 'IIBBBBBBBbBBBB28x'
+        data = _ethtool(self.ifname, fmt, ETHTOOL_GLINKSETTINGS,
+                        *[0] * 13)
+        if data is not None:
+            nwords = -struct.unpack_from(fmt, data)[9]
+            if nwords > 0:
+                data = _ethtool(self.ifname, fmt, ETHTOOL_GLINKSETTINGS,
+                                *[0] * 8, nwords, *[0] * 4,
+                                size=struct.calcsize(fmt) + 3 * 4 * nwords)
+            if data is not None and nwords > 0:
+                autoneg = struct.unpack_from(fmt, data)[5]
+                supported = struct.unpack_from(f'{nwords}I', data,
+                                               struct.calcsize(fmt))
+                return list(_bits(supported)), autoneg == AUTONEG_ENABLE
+
+        # fall back to the legacy struct ethtool_cmd
+        fmt = 'IIIHBBBBBBIIHBBI8x'
+        data = _ethtool(self.ifname, fmt, ETHTOOL_GSET, *[0] * 15)
+        if data is None:
+            return [], False
+        values = struct.unpack(fmt, data)
+        return list(_bits([values[1]])), values[8] == AUTONEG_ENABLE
+
+    @cached_property
+    def _speed_duplex(self):
+        speed_duplex = {'auto': {'auto': ''}}
+        for bit in self._link_settings[0]:
+            if bit >= len(_link_modes):
+                continue
+            mode = re.match(r'(\d+)base.*_(Full|Half)$', _link_modes[bit])
+            if mode:
+                speed, duplex = mode.group(1), mode.group(2).lower()
+                speed_duplex.setdefault(speed, {})[duplex] = ''
+        return speed_duplex
+
+    @cached_property
+    def _auto_negotiation_supported(self):
+        supported, _ = self._link_settings
+        if not supported:
+            return None
+        return _link_mode_autoneg in supported
+
+    @cached_property
+    def _auto_negotiation(self):
+        return self._link_settings[1]
+
+    @cached_property
+    def _features(self):
+        # number of features
+        data = _ethtool(self.ifname, 'IIQI', ETHTOOL_GSSET_INFO, 0,
+                        1 << ETH_SS_FEATURES, 0)
+        if data is None:
+            return {}
+        count = struct.unpack('IIQI', data)[3]
+
+        data = _ethtool(self.ifname, 'III', ETHTOOL_GSTRINGS,
+                        ETH_SS_FEATURES, count,
+                        size=12 + count * ETH_GSTRING_LEN)
+        if data is None:
+            return {}
+        names = [data[12 + i * ETH_GSTRING_LEN:12 + (i + 1) * ETH_GSTRING_LEN]
+                 .split(b'\0', 1)[0].decode() for i in range(count)]
+
+        # struct ethtool_gfeatures: cmd, size, then blocks of
+        # {available, requested, active, never_changed}
+        blocks = (count + 31) // 32
+        data = _ethtool(self.ifname, 'II', ETHTOOL_GFEATURES, blocks,
+                        size=8 + blocks * 16)
+        if data is None:
+            return {}
+        words = struct.unpack_from(f'{blocks * 4}I', data, 8)
+
+        features = {}
+        for i, name in enumerate(names):
+            available, _, active, never_changed = words[i // 32 * 4:i // 32 * 4 + 4]
+            bit = 1 << (i % 32)
+            features[name] = {
+                'enabled' : bool(active & bit),
+                'fixed' : not available & bit or bool(never_changed & bit)
+            }
+
+        for group, members in _feature_groups.items():
+            members = [features[m] for m in members if m in features]
+            if members:
+                features[group] = {
+                    'enabled' : any(m['enabled'] for m in members),
+                    'fixed' : all(m['fixed'] for m in members)
                 }
+        return features
+
+    @cached_property
+    def _ring_params(self):
+        """ Tuple of (maximum, current) ring buffer sizes """
+        # struct ethtool_ringparam
+        data = _ethtool(self.ifname, '9I', ETHTOOL_GRINGPARAM, *[0] * 8)
+        if data is None:
+            return {}, {}
+        values = struct.unpack('9I', data)
+        keys = ['rx', 'rx_mini', 'rx_jumbo', 'tx']
+        # T3645: as with the ethtool output, unsupported values (0) are left
+        # out; we are only interested in the tx/rx keys
+        ring_max = {k: str(v) for k, v in zip(keys, values[1:5]) if v}
+        ring = {k: str(v) for k, v in zip(keys, values[5:9]) if v}
+        return ring_max, ring
+
+    @property
+    def _ring_buffers_max(self):
+        return self._ring_params[0]
 
-        out, err = popen(f'ethtool --show-ring {ifname}')
-        # We are only interested in line 2-5 which contains the device maximum
-        # ringbuffers
-        for line in out.splitlines()[2:6]:
-            if ':' in line:
-                key, value = [s.strip() for s in line.strip().split(":", 1)]
-                key = key.lower().replace(' ', '_')
-                # T3645: ethtool version used on Debian Bullseye changed the
-                # output format from 0 -> n/a. As we are only interested in the
-                # tx/rx keys we do not care about RX Mini/Jumbo.
-                if value.isdigit():
-                    self._ring_buffers_max[key] = value
-        # Now we wan't to get the current RX/TX ringbuffer values - used for
-        for line in out.splitlines()[7:11]:
-            if ':' in line:
-                key, value = [s.strip() for s in line.strip().split(":", 1)]
-                key = key.lower().replace(' ', '_')
-                # T3645: ethtool version used on Debian Bullseye changed the
-                # output format from 0 -> n/a. As we are only interested in the
-                # tx/rx keys we do not care about RX Mini/Jumbo.
-                if value.isdigit():
-                    self._ring_buffers[key] = value
+    @property
+    def _ring_buffers(self):
+        return self._ring_params[1]
 
+    @cached_property
+    def _pause_params(self):
+        # struct ethtool_pauseparam: cmd, autoneg, rx_pause, tx_pause
+        data = _ethtool(self.ifname, '4I', ETHTOOL_GPAUSEPARAM, 0, 0, 0)
+        if data is None:
+            return None
+        return struct.unpack('4I', data)
+
+    @property
+    def _flow_control(self):
         # Get current flow control settings, but this is not supported by
         # all NICs (e.g. vmxnet3 does not support is)
-        out, err = popen(f'ethtool --show-pause {ifname}')
-        if len(out.splitlines()) > 1:
-            self._flow_control = True
-            # read current flow control setting, this returns:
-            # ['Autonegotiate:', 'on']
-            self._flow_control_enabled = out.splitlines()[1].split()[-1]
+        return self._pause_params is not None
+
+    @property
+    def _flow_control_enabled(self):
+        if self._pause_params is None:
+            return None
+        return 'on' if self._pause_params[1] else 'off'
 
     def check_auto_negotiation_supported(self):
         """ Check if the NIC supports changing auto-negotiation """
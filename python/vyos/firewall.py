@@ -14,10 +14,11 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-import csv
-import gzip
+import asyncio
+import json
 import os
 import re
+import time
 
 from pathlib import Path
 from socket import AF_INET
@@ -25,13 +26,17 @@ from socket import AF_INET6
 from socket import getaddrinfo
 from time import strftime
 
+from vyos.geoip import GeoIPIndex
+from vyos.geoip import build_index
+from vyos.geoip import format_range
+from vyos.geoip import merge_ranges
+from vyos.geoip import parse_nft_elements
 from vyos.remote import download
-from vyos.template import is_ipv4
-from vyos.template import render
 from vyos.utils.dict import dict_search_args
 from vyos.utils.dict import dict_search_recursive
 from vyos.utils.process import call
 from vyos.utils.process import cmd
+from vyos.utils.process import rc_cmd
 from vyos.utils.process import run
 
 # Domain Resolver
@@ -63,6 +68,87 @@ def fqdn_resolve(fqdn, ipv6=False):
     except:
         return None
 
+class DomainCache:
+    """ Addresses of domain names, with the time their DNS records expire
+
+    Entries are keyed by (fqdn, ipv6). A name is only queried again once
+    its records expire; with keep_stale, the last addresses of a name are
+    kept while it fails to resolve.
+    """
+    def __init__(self, keep_stale=False):
+        self.keep_stale = keep_stale
+        self._entries = {}
+
+    def expiring(self, keys, until: float) -> list:
+        """ Return the keys which are unknown or expire before 'until' """
+        res = []
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= until:
+                res.append(key)
+        return res
+
+    def update(self, key, addresses, ttl: float, now: float):
+        """ Store the result of a query; addresses None for a failed query """
+        if addresses is None:
+            entry = self._entries.get(key)
+            if entry is not None and self.keep_stale:
+                # retry on the next cycle
+                self._entries[key] = (entry[0], now)
+            else:
+                self._entries.pop(key, None)
+            return
+        self._entries[key] = (frozenset(addresses), now + ttl)
+
+    def get(self, key) -> frozenset:
+        entry = self._entries.get(key)
+        return entry[0] if entry is not None else frozenset()
+
+    def retain(self, keys):
+        """ Drop the entries of names no longer configured """
+        keys = set(keys)
+        for key in list(self._entries):
+            if key not in keys:
+                del self._entries[key]
+
+async def fqdn_query(fqdn, ipv6=False):
+    """ Resolve a name, returning (addresses, ttl); addresses is None if
+    the query failed, and empty if the name has no such records """
+    import dns.asyncresolver
+    import dns.exception
+    import dns.resolver
+
+    rdtype = 'AAAA' if ipv6 else 'A'
+    try:
+        answer = await dns.asyncresolver.resolve(fqdn, rdtype)
+    except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+        return set(), None
+    except dns.exception.DNSException:
+        return None, None
+    return set(rr.address for rr in answer), answer.rrset.ttl
+
+async def fqdn_resolve_many(keys, cache, interval, concurrency=64, query=fqdn_query):
+    """ Resolve the (fqdn, ipv6) keys expiring before the next cycle,
+    'interval' seconds from now, running up to 'concurrency' queries at
+    once, and store the results in cache
+
+    Returns: list of (key, addresses, latency) of the queried names
+    """
+    now = time.time()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def resolve(key):
+        async with semaphore:
+            start = time.monotonic()
+            addresses, ttl = await query(key[0], ipv6=key[1])
+            latency = time.monotonic() - start
+        # names without records are queried again on the next cycle
+        cache.update(key, addresses, interval if ttl is None else ttl, now)
+        return key, addresses, latency
+
+    keys = cache.expiring(keys, now + interval)
+    return await asyncio.gather(*(resolve(key) for key in keys))
+
 # End Domain Resolver
 
 def find_nftables_rule(table, chain, rule_matches=[]):
@@ -513,25 +599,58 @@ def parse_policy_set(set_conf, def_suffix):
 
 nftables_geoip_conf = '/run/nftables-geoip.conf'
 geoip_database = '/usr/share/vyos-geoip/dbip-country-lite.csv.gz'
+geoip_index = '/usr/share/vyos-geoip/dbip-country-lite.idx'
 geoip_lock_file = '/run/vyos-geoip.lock'
 
-def geoip_load_data(codes=[]):
-    data = None
-
+def geoip_load_index():
+    """ Return the GeoIP index, built from the database if missing or older
+    than it, or None if there is no database """
     if not os.path.exists(geoip_database):
-        return []
+        return None
 
     try:
-        with gzip.open(geoip_database, mode='rt') as csv_fh:
-            reader = csv.reader(csv_fh)
-            out = []
-            for start, end, code in reader:
-                if code.lower() in codes:
-                    out.append([start, end, code.lower()])
-            return out
+        if (not os.path.exists(geoip_index) or
+                os.path.getmtime(geoip_index) < os.path.getmtime(geoip_database)):
+            build_index(geoip_database, geoip_index)
+        return GeoIPIndex(geoip_index)
     except:
         print('Error: Failed to open GeoIP database')
-    return []
+    return None
+
+def geoip_set_ranges(table, set_name, family):
+    """ Return the ranges of the elements of an nftables set, None if the
+    set cannot be listed """
+    code, out = rc_cmd(f'nft -j list set {table} {set_name}')
+    if code != 0:
+        return None
+    try:
+        for obj in json.loads(out)['nftables']:
+            if 'set' in obj:
+                return parse_nft_elements(obj['set'].get('elem', []), family)
+    except (ValueError, KeyError):
+        pass
+    return None
+
+def geoip_set_update(table, set_name, family, ranges, diff=True):
+    """ nft commands to update a set to the given ranges, as a diff against
+    its current elements, or by flushing and refilling it """
+    current = geoip_set_ranges(table, set_name, family) if diff else None
+    if current is None:
+        output = [f'flush set {table} {set_name}']
+        removed = []
+        added = ranges
+    else:
+        output = []
+        removed = sorted(set(current) - set(ranges))
+        added = sorted(set(ranges) - set(current))
+
+    if removed:
+        elements = ','.join(format_range(s, e, family) for s, e in removed)
+        output.append(f'delete element {table} {set_name} {{ {elements} }}')
+    if added:
+        elements = ','.join(format_range(s, e, family) for s, e in added)
+        output.append(f'add element {table} {set_name} {{ {elements} }}')
+    return output
 
 def geoip_download_data():
     url = 'https://download.db-ip.com/free/dbip-country-lite-{}.csv.gz'.format(strftime("%Y-%m"))
@@ -542,6 +661,7 @@ def geoip_download_data():
 
         download(geoip_database, url)
         print("Downloaded GeoIP database")
+        build_index(geoip_database, geoip_index)
         return True
     except:
         print("Error: Failed to download GeoIP database")
@@ -599,28 +719,39 @@ def geoip_update(firewall, force=False):
                 print("GeoIP not in use by firewall")
             return True
 
-        geoip_data = geoip_load_data([*ipv4_codes, *ipv6_codes])
-
-        # Iterate IP blocks to assign to sets
-        for start, end, code in geoip_data:
-            ipv4 = is_ipv4(start)
-            if code in ipv4_codes and ipv4:
-                ip_range = f'{start}-{end}' if start != end else start
-                for setname in ipv4_codes[code]:
-                    ipv4_sets.setdefault(setname, []).append(ip_range)
-            if code in ipv6_codes and not ipv4:
-                ip_range = f'{start}-{end}' if start != end else start
-                for setname in ipv6_codes[code]:
-                    ipv6_sets.setdefault(setname, []).append(ip_range)
-
-        render(nftables_geoip_conf, 'firewall/nftables-geoip-update.j2', {
-            'ipv4_sets': ipv4_sets,
-            'ipv6_sets': ipv6_sets
-        })
-
-        result = run(f'nft -f {nftables_geoip_conf}')
-        if result != 0:
-            print('Error: GeoIP failed to update firewall')
+        index = geoip_load_index()
+        if index is None:
             return False
 
-        return True
+        # Merge the ranges of the countries of each set
+        with index:
+            for family, codes, sets in [(4, ipv4_codes, ipv4_sets),
+                                        (6, ipv6_codes, ipv6_sets)]:
+                for code, setnames in codes.items():
+                    country_ranges = index.ranges(code, family)
+                    for setname in setnames:
+                        sets.setdefault(setname, []).extend(country_ranges)
+
+                for setname in sets:
+                    sets[setname] = merge_ranges(sets[setname])
+
+        # Apply the changes of all sets as one diff; should the elements
+        # not match the listed ones, refill the sets
+        for diff in [True, False]:
+            conf_lines = []
+            for setname, ranges in ipv4_sets.items():
+                conf_lines += geoip_set_update('ip vyos_filter', setname, 4, ranges, diff)
+            for setname, ranges in ipv6_sets.items():
+                conf_lines += geoip_set_update('ip6 vyos_filter', setname, 6, ranges, diff)
+
+            if not conf_lines:
+                return True
+
+            with open(nftables_geoip_conf, 'w') as f:
+                f.write('#!/usr/sbin/nft -f\n\n' + '\n'.join(conf_lines) + '\n')
+
+            if run(f'nft -f {nftables_geoip_conf}') == 0:
+                return True
+
+        print('Error: GeoIP failed to update firewall')
+        return False
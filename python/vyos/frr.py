@@ -67,6 +67,8 @@ Apply the new configuration:
 
 import tempfile
 import re
+import socket
+import threading
 
 from vyos.utils.permission import chown
 from vyos.utils.process import cmd
@@ -99,6 +101,9 @@ path_config = '/run/frr'
 
 default_add_before = r'(ip prefix-list .*|route-map .*|line vty|end)'
 
+# idle vty connections kept per daemon
+vty_pool_size = 4
+
 class FrrError(Exception):
     pass
 
@@ -127,6 +132,109 @@ class ConfigSectionNotFound(FrrError):
     """
     pass
 
+class VtyClient:
+    """
+    Connection to the vty unix socket of a single FRR daemon, speaking the
+    protocol used by vtysh: a command is sent NUL terminated, the response
+    ends with three NUL bytes and a status byte (CMD_SUCCESS == 0)
+    """
+    def __init__(self, daemon):
+        if daemon not in _frr_daemons:
+            raise ValueError(f'The specified daemon type is not supported {repr(daemon)}')
+        self.daemon = daemon
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._sock.connect(f'{path_config}/{daemon}.vty')
+        except OSError:
+            self._sock.close()
+            raise
+        # vtysh enters enable mode on connect; there is no "enable"
+        # command once in enable mode, so the status is not checked
+        self.execute('enable')
+
+    def close(self):
+        self._sock.close()
+
+    def execute(self, command):
+        """ Run a command, return tuple of (output, status) """
+        self._sock.sendall(command.encode() + b'\0')
+        data = bytearray()
+        while len(data) < 4 or data[-4:-1] != b'\0\0\0':
+            chunk = self._sock.recv(1 << 16)
+            if not chunk:
+                raise ConnectionResetError(f'{self.daemon} closed the vty connection')
+            data += chunk
+        return data[:-4].decode(errors='replace'), data[-1]
+
+_vty_pool = {}
+_vty_pool_lock = threading.Lock()
+
+def vty_execute(command, daemon):
+    """ Run a command on a daemon over a pooled vty connection
+    command:  str containing a single command, as for "vtysh -c"
+    daemon:   name of the FRR daemon implementing the command
+
+    return:   output of the command
+
+    Raises OSError if the daemon can not be reached or the command failed;
+    the exception of a failed command has the status as errno.
+    """
+    pid = os.getpid()
+    with _vty_pool_lock:
+        idle = _vty_pool.setdefault((pid, daemon), [])
+        client = idle.pop() if idle else None
+
+    # a pooled connection may have been closed by a daemon restart, so
+    # one retry on a fresh connection
+    for retry in [True, False]:
+        if client is None:
+            client = VtyClient(daemon)
+        try:
+            output, status = client.execute(command)
+            break
+        except OSError:
+            client.close()
+            client = None
+            if not retry:
+                raise
+
+    with _vty_pool_lock:
+        if len(idle) < vty_pool_size:
+            idle.append(client)
+        else:
+            client.close()
+
+    if status:
+        raise OSError(status, output)
+    return output
+
+def show(command, daemon):
+    """ Run a show command on a daemon, using a pooled vty connection or
+    vtysh if the vty socket is not accessible """
+    try:
+        return vty_execute(command, daemon).strip()
+    except (FileNotFoundError, PermissionError, ConnectionRefusedError):
+        pass
+    output, code = popen(f"{path_vtysh} -c '{command}'", stderr=STDOUT)
+    if code:
+        raise OSError(code, output)
+    return output
+
+# running configuration per daemon, kept between FRRConfig objects while
+# enabled (vyos-configd, which clears it at the start of every commit)
+_config_cache = {}
+_config_cache_enabled = False
+
+def enable_configuration_cache(enable=True):
+    global _config_cache_enabled
+    _config_cache_enabled = enable
+    _config_cache.clear()
+
+def clear_configuration_cache():
+    """ Drop cached running configurations, required after the FRR
+    configuration was changed other than by FRRConfig.commit_configuration() """
+    _config_cache.clear()
+
 def init_debugging():
     global DEBUG
 
@@ -407,6 +515,205 @@ def _find_elements(config, pattern, start_at=0):
     return [i for i, element in enumerate(config[start_at:], start=0) if re.match(pattern + '$', element)]
 
 
+def _literal_prefix(pattern):
+    '''Return the literal text every match of the regex <pattern> starts
+    with, used to skip non-matching lines without running the regex'''
+    # an alternation or a group (flags, alternatives, ...) may match other
+    # text than the one before it: no prefix is known
+    if re.search(r'(?<!\\)(?:\\\\)*[|(]', pattern):
+        return ''
+    if pattern.startswith('^'):
+        pattern = pattern[1:]
+    prefix = ''
+    for i, c in enumerate(pattern):
+        if c in '.^$*+?{}[]\\|()':
+            # a quantifier makes the preceding character optional
+            if c in '*?{' and prefix:
+                prefix = prefix[:-1]
+            break
+        prefix += c
+    return prefix
+
+
+def _is_exit(line):
+    return line.startswith('exit')
+
+
+def _parse_sections(config):
+    '''Split a configuration into its top-level sections
+    config:  (list) configuration lines as shown by "show running-config"
+
+    return:  dict of section header line to a list of (context, line) items,
+             where context is the tuple of the enclosing header lines, and
+             a set of items which open a sub-context (e.g. address-family);
+             None if a header is found more than once
+
+    Comments, "!" separators and exit lines are not part of the items.
+    '''
+    sections = {}
+    openers = set()
+    stack = []
+    last = None
+    for line in config:
+        stripped = line.strip()
+        if not stripped or stripped[0] == '!' or stripped == 'end':
+            continue
+        indent = len(line) - len(line.lstrip(' '))
+        if indent == 0 and not _is_exit(stripped):
+            if stripped in sections:
+                return None
+            sections[stripped] = []
+            stack = [(0, stripped)]
+            last = None
+            continue
+        while len(stack) > 1 and stack[-1][0] >= indent:
+            stack.pop()
+        if _is_exit(stripped):
+            last = None
+            continue
+        if not stack:
+            # indented line before the first section
+            return None
+        if last and last[0] < indent:
+            openers.add(last[1])
+        item = (tuple(text for (_, text) in stack), stripped)
+        sections[stack[0][1]].append(item)
+        stack.append((indent, stripped))
+        last = (indent, item)
+    return sections, openers
+
+
+def _negate(line):
+    if line.startswith('no '):
+        return line[3:]
+    return f'no {line}'
+
+
+def _item_commands(items, negate=False):
+    '''Commands for a list of (context, line) items, entering and leaving
+    the context of each group of items with the same context'''
+    commands = []
+    context = None
+    for item_context, line in items:
+        if item_context != context:
+            if context:
+                commands.extend(['exit'] * len(context))
+            commands.extend(item_context)
+            context = item_context
+        commands.append(_negate(line) if negate else line)
+    if context:
+        commands.extend(['exit'] * len(context))
+    return commands
+
+
+# sections which are removed line by line, as FRR does not allow to delete
+# them while the kernel object exists
+_remove_by_item = ('interface ', 'vrf ')
+
+def config_delta(old, new):
+    '''Compute the commands to change a running configuration into a new one
+    old:     (list) running configuration lines
+    new:     (list) new configuration lines
+
+    return:  tuple of (list of vtysh configuration commands, list of changed
+             section headers); None if the configuration can not be split
+             into unique sections, then the configuration can only be
+             applied with frr-reload
+
+    Sections which are removed are negated in reverse order of the running
+    configuration, then lines removed from changed sections are negated,
+    then new lines and sections are added in order of the new configuration.
+    '''
+    old_parsed = _parse_sections(old)
+    new_parsed = _parse_sections(new)
+    if old_parsed is None or new_parsed is None:
+        return None
+    old_sections, old_openers = old_parsed
+    new_sections, new_openers = new_parsed
+
+    remove = []
+    add = []
+    changed = []
+    for header in reversed(old_sections):
+        if header in new_sections:
+            continue
+        changed.append(header)
+        if header.startswith(_remove_by_item):
+            items = [i for i in reversed(old_sections[header]) if i not in old_openers]
+            remove.extend(_item_commands(items, negate=True))
+        else:
+            remove.append(_negate(header))
+
+    for header, items in new_sections.items():
+        if header not in old_sections:
+            changed.append(header)
+            if items:
+                add.extend(_item_commands([i for i in items if i not in new_openers]))
+            else:
+                add.append(header)
+            continue
+
+        old_items = old_sections[header]
+        if old_items == items:
+            continue
+        new_set = set(items)
+        old_set = set(old_items)
+        removed = [i for i in reversed(old_items)
+                   if i not in new_set and i not in old_openers]
+        added = [i for i in items
+                 if i not in old_set and i not in new_openers]
+        if not removed and not added:
+            # only the order of lines changed
+            continue
+        changed.append(header)
+        remove.extend(_item_commands(removed, negate=True))
+        add.extend(_item_commands(added))
+
+    return remove + add, changed
+
+
+def _delta_applied(running, new, changed):
+    '''Check that the changed sections of the running configuration match
+    the new configuration'''
+    running = _parse_sections(running)
+    new = _parse_sections(new)
+    if running is None or new is None:
+        return False
+    running, _ = running
+    new, _ = new
+    for header in changed:
+        if header in new:
+            if header not in running or set(running[header]) != set(new[header]):
+                return False
+        elif header in running:
+            # an interface or vrf may stay without configuration
+            if not header.startswith(_remove_by_item) or running[header]:
+                return False
+    return True
+
+
+def apply_delta(commands, daemon=None):
+    '''Apply configuration commands in a single vtysh session
+    commands:  (list) commands in configuration file syntax, as returned
+               by config_delta()
+    daemon:    Apply the commands to the specified FRR daemon only
+    '''
+    if daemon and daemon not in _frr_daemons:
+        raise ValueError(f'The specified daemon type is not supported {repr(daemon)}')
+
+    with tempfile.NamedTemporaryFile('w') as f:
+        f.write('\n'.join(commands) + '\n')
+        f.flush()
+        LOG.debug(f'apply_delta: applying {len(commands)} commands from {f.name}')
+        cmd = f'{path_vtysh}'
+        if daemon:
+            cmd += f' -d {daemon}'
+        output, code = popen(f'{cmd} -f {f.name}', stderr=STDOUT)
+    if code:
+        raise CommitError(f'FRR configuration delta failed: {repr(output)}')
+    return output
+
+
 class FRRConfig:
     '''Main FRR Configuration manipulation object
     Using this object the user could load, manipulate and commit the configuration to FRR
@@ -424,7 +731,7 @@ class FRRConfig:
             raise ValueError(
                 'The config element needs to be a string or list type object')
 
-        if config:
+        if config and DEBUG:
             LOG.debug(f'__init__: frr library initiated with initial config')
             for i, e in enumerate(self.config):
                 LOG.debug(f'__init__: initial              {i:3} {e}')
@@ -438,7 +745,12 @@ class FRRConfig:
         '''
         init_debugging()
 
-        self.imported_config = get_configuration(daemon=daemon)
+        if _config_cache_enabled and daemon in _config_cache:
+            self.imported_config = _config_cache[daemon]
+        else:
+            self.imported_config = get_configuration(daemon=daemon)
+            if _config_cache_enabled:
+                _config_cache[daemon] = self.imported_config
         if daemon:
             LOG.debug(f'load_configuration: Configuration loaded from FRR daemon {daemon}')
         else:
@@ -447,8 +759,10 @@ class FRRConfig:
         self.original_config = self.imported_config.split('\n')
         self.config = self.original_config.copy()
 
-        for i, e in enumerate(self.imported_config.split('\n')):
-            LOG.debug(f'load_configuration:  loaded    {i:3} {e}')
+        # per-line logging is expensive on large configs
+        if DEBUG:
+            for i, e in enumerate(self.original_config):
+                LOG.debug(f'load_configuration:  loaded    {i:3} {e}')
         return
 
     def test_configuration(self):
@@ -466,8 +780,20 @@ class FRRConfig:
         Configuration is automatically saved after apply
         '''
         LOG.debug('commit_configuration:  Commiting configuration')
-        for i, e in enumerate(self.config):
-            LOG.debug(f'commit_configuration: new_config {i:3} {e}')
+        if DEBUG:
+            for i, e in enumerate(self.config):
+                LOG.debug(f'commit_configuration: new_config {i:3} {e}')
+
+        # the running configuration is about to change; _commit_delta()
+        # caches the configuration it verified against
+        _config_cache.pop(daemon, None)
+        _config_cache.pop(None, None)
+
+        # Apply only the changed sections, and verify the result; frr-reload
+        # is used if the delta can not be computed or did not apply cleanly
+        if self._commit_delta(daemon):
+            save_configuration()
+            return
 
         # https://github.com/FRRouting/frr/issues/10132
         # https://github.com/FRRouting/frr/issues/10133
@@ -489,6 +815,35 @@ class FRRConfig:
         save_configuration()
 
 
+    def _commit_delta(self, daemon):
+        '''Apply the difference between the loaded and the current config
+        in a single vtysh session; returns False if frr-reload is needed'''
+        delta = config_delta(self.original_config, self.config)
+        if delta is None:
+            LOG.debug('commit_configuration: no unique sections, using frr-reload')
+            return False
+        commands, changed = delta
+        if not commands:
+            LOG.debug('commit_configuration: configuration is unchanged')
+            return True
+
+        if DEBUG:
+            for i, e in enumerate(commands):
+                LOG.debug(f'commit_configuration: delta      {i:3} {e}')
+        try:
+            apply_delta(commands, daemon=daemon)
+        except CommitError as e:
+            LOG.debug(f'commit_configuration: {e}')
+            return False
+
+        running = get_configuration(daemon=daemon)
+        if not _delta_applied(running.split('\n'), self.config, changed):
+            LOG.debug('commit_configuration: delta did not apply, using frr-reload')
+            return False
+        if _config_cache_enabled:
+            _config_cache[daemon] = running
+        return True
+
     def modify_section(self, start_pattern, replacement='!', stop_pattern=r'\S+', remove_stop_mark=False, count=0):
         if isinstance(replacement, str):
             replacement = replacement.split('\n')
@@ -496,36 +851,45 @@ class FRRConfig:
             return ValueError("The replacement element needs to be a string or list type object")
         LOG.debug(f'modify_section: starting search for {repr(start_pattern)} until {repr(stop_pattern)}')
 
+        # While searching, always assume that the user wants to search for the exact pattern he entered
+        # To be more specific the user needs a override, eg. a "pattern.*"
+        start_re = re.compile(start_pattern + '$')
+        stop_re = re.compile(stop_pattern)
+        prefix = _literal_prefix(start_pattern)
+
+        # The config is rebuilt in a single pass: a block starts at a line
+        # matching start_pattern and ends before (or with, if
+        # remove_stop_mark is set) the next line matching stop_pattern
+        config = self.config
+        result = []
         _count = 0
-        _next_start = 0
-        while True:
+        i = 0
+        while i < len(config):
             if count and count <= _count:
-                # Break out of the loop after specified amount of matches
-                LOG.debug(f'modify_section: reached limit ({_count}), exiting loop at line {_next_start}')
+                # Keep the rest after specified amount of matches
+                LOG.debug(f'modify_section: reached limit ({_count}), exiting loop at line {i}')
+                result.extend(config[i:])
                 break
-            # While searching, always assume that the user wants to search for the exact pattern he entered
-            # To be more specific the user needs a override, eg. a "pattern.*"
-            _w = _find_first_block(
-                self.config, start_pattern+'$', stop_pattern, start_at=_next_start)
-            if not _w:
-                # Reached the end, no more elements to remove
+            line = config[i]
+            if not line.startswith(prefix) or not start_re.match(line):
+                result.append(line)
+                i += 1
+                continue
+
+            end = next((j for j in range(i + 1, len(config))
+                        if stop_re.match(config[j])), None)
+            if end is None:
+                # Reached the end, no complete block
                 LOG.debug(f'modify_section: No more config sections found, exiting')
+                result.extend(config[i:])
                 break
-            start_element, end_element = _w
-            LOG.debug(f'modify_section:   found match between {start_element} and {end_element}')
-            for i, e in enumerate(self.config[start_element:end_element+1 if remove_stop_mark else end_element],
-                                  start=start_element):
-                LOG.debug(f'modify_section:   remove       {i:3} {e}')
-            del self.config[start_element:end_element +
-                            1 if remove_stop_mark else end_element]
-            if replacement:
-                # Append the replacement config at the current position
-                for i, e in enumerate(replacement, start=start_element):
-                    LOG.debug(f'modify_section:   add          {i:3} {e}')
-                self.config[start_element:start_element] = replacement
+
+            LOG.debug(f'modify_section:   found match between {i} and {end}')
+            result.extend(replacement)
             _count += 1
-            _next_start = start_element + len(replacement)
+            i = end + 1 if remove_stop_mark else end
 
+        self.config = result
         return _count
 
     def add_before(self, before_pattern, addition):
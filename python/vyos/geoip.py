@@ -0,0 +1,171 @@
+# Copyright 2023 VyOS maintainers and contributors <maintainers@vyos.io>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Binary index of the db-ip country database, for the firewall GeoIP sets.
+
+The CSV database is parsed once, when it is downloaded, into per country
+and address family sorted arrays of merged (start, end) address ranges.
+Looking up a country then reads only its own ranges from the mmap'ed
+index, instead of decompressing and scanning the whole CSV.
+
+Index layout, all integers little endian except IPv6 addresses:
+    header:  magic, number of entries (uint32)
+    entries: country code (2 bytes), family (uint8, 4 or 6),
+             offset and number of ranges (uint64)
+    data:    IPv4 ranges as uint32 start and end pairs, IPv6 ranges as
+             16 byte big endian start and end pairs
+"""
+
+import csv
+import gzip
+import mmap
+import os
+import socket
+import struct
+import tempfile
+
+from ipaddress import IPv4Address
+from ipaddress import IPv6Address
+
+magic = b'VYOSGEO1'
+_header = struct.Struct('<8sI')
+_entry = struct.Struct('<2sB5xQQ')
+_range4 = struct.Struct('<II')
+_range6 = struct.Struct('>QQQQ')
+
+def merge_ranges(ranges) -> list:
+    """ Sort (start, end) ranges, merging overlapping and adjacent ones """
+    res = []
+    for start, end in sorted(ranges):
+        if res and start <= res[-1][1] + 1:
+            if end > res[-1][1]:
+                res[-1] = (res[-1][0], end)
+        else:
+            res.append((start, end))
+    return res
+
+def _address_int(address: str):
+    """ Return (family, integer) of an IPv4 or IPv6 address """
+    if ':' in address:
+        return 6, int.from_bytes(socket.inet_pton(socket.AF_INET6, address), 'big')
+    return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, address), 'big')
+
+def build_index(database: str, index_file: str):
+    """ Build the index of a gzip compressed db-ip country CSV database """
+    ranges = {}
+    with gzip.open(database, mode='rt') as f:
+        for start, end, code in csv.reader(f):
+            family, start = _address_int(start)
+            _, end = _address_int(end)
+            ranges.setdefault((code.lower().encode(), family), []).append((start, end))
+
+    entries = []
+    data = []
+    offset = _header.size + _entry.size * len(ranges)
+    for (code, family), country_ranges in sorted(ranges.items()):
+        country_ranges = merge_ranges(country_ranges)
+        if family == 4:
+            chunk = b''.join(_range4.pack(s, e) for s, e in country_ranges)
+        else:
+            chunk = b''.join(_range6.pack(s >> 64, s & 0xffffffffffffffff,
+                                          e >> 64, e & 0xffffffffffffffff)
+                             for s, e in country_ranges)
+        entries.append(_entry.pack(code, family, offset, len(country_ranges)))
+        data.append(chunk)
+        offset += len(chunk)
+
+    dirname = os.path.dirname(index_file)
+    fd, tmp = tempfile.mkstemp(dir=dirname, prefix='.geoip')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_header.pack(magic, len(entries)))
+            f.write(b''.join(entries))
+            f.write(b''.join(data))
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, index_file)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+class GeoIPIndex:
+    """ Read access to a GeoIP index built by build_index() """
+    def __init__(self, index_file: str):
+        with open(index_file, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        tag, count = _header.unpack_from(self._map, 0)
+        if tag != magic:
+            raise ValueError(f'{index_file} is not a GeoIP index')
+        self._entries = {}
+        for n in range(count):
+            code, family, offset, length = _entry.unpack_from(
+                self._map, _header.size + n * _entry.size)
+            self._entries[(code.decode(), family)] = (offset, length)
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def countries(self) -> list:
+        return sorted(set(code for code, _ in self._entries))
+
+    def ranges(self, code: str, family: int) -> list:
+        """ Return the sorted (start, end) ranges of a country """
+        entry = self._entries.get((code.lower(), family))
+        if entry is None:
+            return []
+        offset, length = entry
+        if family == 4:
+            size = _range4.size * length
+            return list(_range4.iter_unpack(self._map[offset:offset + size]))
+        size = _range6.size * length
+        return [(shi << 64 | slo, ehi << 64 | elo) for shi, slo, ehi, elo
+                in _range6.iter_unpack(self._map[offset:offset + size])]
+
+def format_range(start: int, end: int, family: int) -> str:
+    """ Format a range as nftables set element: an address, a prefix if the
+    range is exactly one, or else a start-end range """
+    address = IPv4Address if family == 4 else IPv6Address
+    bits = 32 if family == 4 else 128
+    if start == end:
+        return str(address(start))
+    size = end - start + 1
+    if size & (size - 1) == 0 and start % size == 0:
+        return f'{address(start)}/{bits - size.bit_length() + 1}'
+    return f'{address(start)}-{address(end)}'
+
+def parse_nft_elements(elements: list, family: int) -> list:
+    """ Return the (start, end) ranges of the elements of an nftables set,
+    as listed by 'nft -j list set' """
+    bits = 32 if family == 4 else 128
+    to_int = lambda address: _address_int(address)[1]
+    res = []
+    for elem in elements:
+        if isinstance(elem, dict) and 'elem' in elem:
+            elem = elem['elem']['val']
+        if isinstance(elem, str):
+            res.append((to_int(elem), to_int(elem)))
+        elif 'range' in elem:
+            res.append((to_int(elem['range'][0]), to_int(elem['range'][1])))
+        elif 'prefix' in elem:
+            start = to_int(elem['prefix']['addr'])
+            host_bits = bits - elem['prefix']['len']
+            res.append((start, start + (1 << host_bits) - 1))
+    return res
@@ -23,11 +23,14 @@ from vyos.utils.process import popen
 from vyos.utils.process import cmd
 from vyos.utils.file import read_file
 from vyos.utils.file import write_file
+from vyos.netlink import rtnl
 from vyos import debug
 
 class Control(Section):
     _command_get = {}
     _command_set = {}
+    _netlink_get = {}
+    _netlink_set = {}
     _signature = {}
 
     def __init__(self, **kargs):
@@ -46,10 +49,13 @@ class Control(Section):
         return debug.message(message, self.debug)
 
     def _popen(self, command):
+        # queued netlink changes must be applied before anything else
+        rtnl().flush()
         return popen(command, self.debug)
 
     def _cmd(self, command):
         import re
+        rtnl().flush()
         if 'netns' in self.config:
             # This command must be executed from default netns 'ip link set dev X netns X'
             # exclude set netns cmd from netns to avoid:
@@ -121,6 +127,42 @@ class Control(Section):
         cmd = self._command_set[name]['shellcmd'].format(**config)
         return self._command_set[name].get('format', lambda _: _)(self._cmd(cmd))
 
+    def _use_netlink(self, config):
+        # netlink requests are only sent in the default network namespace
+        return 'netns' not in config
+
+    def _get_netlink(self, config, name):
+        """
+        Using the defined names, get data from the link information as
+        returned by vyos.netlink.RtNetlink.get_link().
+        """
+        link = rtnl().get_link(config['ifname'])
+        return self._netlink_get[name]['format'](link)
+
+    def _set_netlink(self, config, name, value):
+        """
+        Using the defined names, change link attributes with a netlink
+        request, queued if a batch is in progress.
+        """
+        # the code can pass int as int
+        value = str(value)
+
+        validate = self._netlink_set[name].get('validate', None)
+        if validate:
+            try:
+                validate(**self._values(name, validate, value))
+            except Exception as e:
+                raise e.__class__(f'Could not set {name}. {e}')
+
+        convert = self._netlink_set[name].get('convert', None)
+        if convert:
+            value = convert(value)
+
+        attributes = self._netlink_set[name]['attributes'](value)
+        self._debug_msg(f"netlink set link {config['ifname']} {attributes}")
+        rtnl().set_link(config['ifname'], **attributes)
+        return None
+
     _sysfs_get = {}
     _sysfs_set = {}
 
@@ -139,6 +181,7 @@ class Control(Section):
         Provide a single primitive w/ error checking for writing to sysfs.
         """
         if os.path.isfile(filename):
+            rtnl().flush()
             write_file(filename, str(value))
             self._debug_msg("write '{}' > '{}'".format(value, filename))
             return True
@@ -184,6 +227,8 @@ class Control(Section):
     def get_interface(self, name):
         if name in self._sysfs_get:
             return self._get_sysfs(self.config, name)
+        if name in self._netlink_get and self._use_netlink(self.config):
+            return self._get_netlink(self.config, name)
         if name in self._command_get:
             return self._get_command(self.config, name)
         raise KeyError(f'{name} is not a attribute of the interface we can get')
@@ -191,6 +236,8 @@ class Control(Section):
     def set_interface(self, name, value):
         if name in self._sysfs_set:
             return self._set_sysfs(self.config, name, value)
+        if name in self._netlink_set and self._use_netlink(self.config):
+            return self._set_netlink(self.config, name, value)
         if name in self._command_set:
             return self._set_command(self.config, name, value)
         raise KeyError(f'{name} is not a attribute of the interface we can set')
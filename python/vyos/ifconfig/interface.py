@@ -32,6 +32,8 @@ from vyos.configdict import list_diff
 from vyos.configdict import dict_merge
 from vyos.configdict import get_vlan_ids
 from vyos.defaults import directories
+from vyos.netlink import batched
+from vyos.netlink import rtnl
 from vyos.template import render
 from vyos.utils.network import mac2eui64
 from vyos.utils.dict import dict_search
@@ -119,6 +121,56 @@ class Interface(Control):
         },
     }
 
+    # used instead of _command_get/_command_set outside of network namespaces
+    _netlink_get = {
+        'admin_state': {
+            'format': lambda l: 'up' if 'UP' in l['flags'] else 'down',
+        },
+        'alias': {
+            'format': lambda l: l.get('ifalias') or '',
+        },
+        'mac': {
+            'format': lambda l: l.get('address'),
+        },
+        'min_mtu': {
+            'format': lambda l: l.get('min_mtu'),
+        },
+        'max_mtu': {
+            'format': lambda l: l.get('max_mtu'),
+        },
+        'mtu': {
+            'format': lambda l: l.get('mtu'),
+        },
+        'oper_state': {
+            'format': lambda l: l.get('operstate'),
+        },
+        'vrf': {
+            'format': lambda l: l.get('master'),
+        },
+    }
+
+    _netlink_set = {
+        'admin_state': {
+            'validate': lambda v: assert_list(v, ['up', 'down']),
+            'attributes': lambda v: {'up': v == 'up'},
+        },
+        'alias': {
+            'convert': lambda name: name if name else '',
+            'attributes': lambda v: {'alias': v},
+        },
+        'mac': {
+            'validate': assert_mac,
+            'attributes': lambda v: {'address': v},
+        },
+        'mtu': {
+            'validate': assert_mtu,
+            'attributes': lambda v: {'mtu': int(v)},
+        },
+        'vrf': {
+            'attributes': lambda v: {'master': v or None},
+        },
+    }
+
     _command_set = {
         'admin_state': {
             'validate': lambda v: assert_list(v, ['up', 'down']),
@@ -1165,12 +1217,14 @@ class Interface(Control):
         elif addr == 'dhcpv6':
             self.set_dhcpv6(True)
         elif not is_intf_addr_assigned(self.ifname, addr, netns=netns):
-            netns_cmd  = f'ip netns exec {netns}' if netns else ''
-            tmp = f'{netns_cmd} ip addr add {addr} dev {self.ifname}'
-            # Add broadcast address for IPv4
-            if is_ipv4(addr): tmp += ' brd +'
-
-            self._cmd(tmp)
+            if not netns:
+                # Add broadcast address for IPv4
+                rtnl().add_address(self.ifname, addr, broadcast=True)
+            else:
+                tmp = f'ip netns exec {netns} ip addr add {addr} dev {self.ifname}'
+                # Add broadcast address for IPv4
+                if is_ipv4(addr): tmp += ' brd +'
+                self._cmd(tmp)
         else:
             return False
 
@@ -1215,8 +1269,10 @@ class Interface(Control):
         elif addr == 'dhcpv6':
             self.set_dhcpv6(False)
         elif is_intf_addr_assigned(self.ifname, addr, netns=netns):
-            netns_cmd  = f'ip netns exec {netns}' if netns else ''
-            self._cmd(f'{netns_cmd} ip addr del {addr} dev {self.ifname}')
+            if not netns:
+                rtnl().del_address(self.ifname, addr)
+            else:
+                self._cmd(f'ip netns exec {netns} ip addr del {addr} dev {self.ifname}')
         else:
             return False
 
@@ -1471,11 +1527,13 @@ class Interface(Control):
             return None
         self.set_interface('per_client_thread', enable)
 
+    @batched
     def update(self, config):
         """ General helper function which works on a dictionary retrived by
         get_config_dict(). It's main intention is to consolidate the scattered
         interface setup code and provide a single point of entry when workin
-        on any interface. """
+        on any interface. Link and address changes are sent to the kernel
+        in netlink batches. """
 
         if self.debug:
             import pprint
@@ -14,6 +14,8 @@
 # License along with this library.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
+import json
+import tempfile
 
 from time import time
 from datetime import datetime
@@ -22,13 +24,42 @@ from tabulate import tabulate
 
 from vyos.ifconfig import Control
 
+# the counters of all interfaces at the time they were last cleared, as a
+# JSON object indexed by interface name
+counters_file = '/var/run/vyatta/interface-counters.json'
+
+def load_counters_index() -> dict:
+    """
+    return the cleared counters of all interfaces, indexed by interface name
+    """
+    try:
+        with open(counters_file) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return index if isinstance(index, dict) else {}
+
+def save_counters_index(index: dict):
+    """
+    replace the counters index, atomically so that a concurrent reader sees
+    either the old or the new one
+    """
+    dirname = os.path.dirname(counters_file)
+    fd, tmp = tempfile.mkstemp(dir=dirname, prefix='.counters')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(index, f)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, counters_file)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
 class Operational(Control):
     """
     A class able to load Interface statistics
     """
 
-    cache_magic = 'XYZZYX'
-
     _stat_names = {
         'rx': ['bytes', 'packets', 'errors', 'dropped', 'overrun', 'mcast'],
         'tx': ['bytes', 'packets', 'errors', 'dropped', 'carrier', 'collisions'],
@@ -50,12 +81,6 @@ class Operational(Control):
     }
 
 
-    @classmethod
-    def cachefile (cls, ifname):
-        # the file where we are saving the counters
-        return f'/var/run/vyatta/{ifname}.stats'
-
-
     def __init__(self, ifname):
         """
         Operational provide access to the counters of an interface
@@ -102,58 +127,50 @@ class Operational(Control):
         """
         return datetime.fromtimestamp(epoc).strftime("%a %b %d %R:%S %Z %Y")
 
-    def save_counters(self, stats):
+    @classmethod
+    def counters_entry(cls, stats):
         """
-        record the provided stats to a file keeping vyatta compatibility
+        the entry of the counters index recording the provided stats
         """
+        entry = {'timestamp': int(time())}
+        entry.update({k: v for k, v in stats.items()
+                      if v and k in cls._stats_all})
+        return entry
 
-        with open(self.cachefile(self.ifname), 'w') as f:
-            f.write(self.cache_magic)
-            f.write('\n')
-            f.write(str(int(time())))
-            f.write('\n')
-            for k,v in stats.items():
-                if v:
-                    f.write(f'{k},{v}\n')
+    @classmethod
+    def cached_counters(cls, index, ifname):
+        """
+        return a dict() with the value for each interface counter from the
+        counters index, 0 for the counters not recorded
+        """
+        stats = {name: 0 for name in cls._stats_all}
+        stats.update(index.get(ifname, {}))
+        return stats
 
-    def load_counters(self):
+    def save_counters(self, stats):
         """
-        load the stats from a file keeping vyatta compatibility
-        return a dict() with the value for each interface counter for the cache
+        record the provided stats in the counters index
         """
-        ifname = self.config['ifname']
+        index = load_counters_index()
+        index[self.ifname] = self.counters_entry(stats)
+        save_counters_index(index)
 
-        stats = {}
-        no_stats = {}
-        for name in self._stats_all:
-            stats[name] = 0
-            no_stats[name] = 0
-
-        try:
-            with open(self.cachefile(self.ifname),'r') as f:
-                magic = f.readline().strip()
-                if magic != self.cache_magic:
-                    print(f'bad magic {ifname}')
-                    return no_stats
-                stats['timestamp'] = f.readline().strip()
-                for line in f:
-                    k, v = line.split(',')
-                    stats[k] = int(v)
-            return stats
-        except IOError:
-            return no_stats
+    def load_counters(self, index=None):
+        """
+        load the stats from the counters index, or from the provided one
+        return a dict() with the value for each interface counter for the cache
+        """
+        if index is None:
+            index = load_counters_index()
+        return self.cached_counters(index, self.ifname)
 
     def clear_counters(self):
-        stats = self.get_stats()
-        for counter, value in stats.items():
-            stats[counter] = value
-        self.save_counters(stats)
+        self.save_counters(self.get_stats())
 
     def reset_counters(self):
-        try:
-            os.remove(self.cachefile(self.ifname))
-        except FileNotFoundError:
-            pass
+        index = load_counters_index()
+        if index.pop(self.ifname, None) is not None:
+            save_counters_index(index)
 
     def get_stats(self):
         """ return a dict() with the value for each interface counter """
@@ -13,6 +13,7 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library.  If not, see <http://www.gnu.org/licenses/>.
 
+from vyos.frr import clear_configuration_cache
 from vyos.ifconfig.interface import Interface
 from vyos.utils.assertion import assert_range
 from vyos.utils.network import get_interface_config
@@ -50,6 +51,7 @@ class PPPoEIf(Interface):
             vrf_cmd = f'-c "vrf {vrf}"'
         self._cmd(f'vtysh -c "conf t" {vrf_cmd} -c "no ip route 0.0.0.0/0 {self.ifname} tag 210"')
         self._cmd(f'vtysh -c "conf t" {vrf_cmd} -c "no ipv6 route ::/0 {self.ifname} tag 210"')
+        clear_configuration_cache()
 
     def remove(self):
         """
@@ -148,3 +150,4 @@ class PPPoEIf(Interface):
             self._cmd(f'vtysh -c "conf t" {vrf} -c "ip route 0.0.0.0/0 {self.ifname} tag 210 {distance}"')
             if 'ipv6' in config:
                 self._cmd(f'vtysh -c "conf t" {vrf} -c "ipv6 route ::/0 {self.ifname} tag 210 {distance}"')
+            clear_configuration_cache()
@@ -0,0 +1,248 @@
+# Copyright 2023 VyOS maintainers and contributors <maintainers@vyos.io>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+import socket
+import threading
+
+from array import array
+from time import monotonic
+
+from vyos.netlink import rtnl
+
+class CounterSampler:
+    """
+    Samples the counters of all interfaces at once, with one netlink dump,
+    into a ring buffer of the last `size` samples, and computes deltas,
+    rates and rate percentiles from it.
+
+    A sample is kept as an array of the interface indexes and a flat array
+    of their counters, one row of len(counters) values per interface. As
+    long as the set of interfaces does not change, the samples share the
+    same index array, and the rows of two samples are paired by position.
+
+    Example:
+    >>> from vyos.ifconfig.sampler import CounterSampler
+    >>> sampler = CounterSampler(interval=1, size=60)
+    >>> sampler.start()
+    >>> sampler.rates(['eth0'])
+    {'eth0': {'rx_packets': 12.0, 'tx_packets': 10.0, 'rx_bytes': 9200.0, ...}}
+    """
+
+    # the first counters of struct rtnl_link_stats64, in this order
+    counters = ('rx_packets', 'tx_packets', 'rx_bytes', 'tx_bytes',
+                'rx_errors', 'tx_errors', 'rx_dropped', 'tx_dropped')
+
+    def __init__(self, interval=1.0, size=60):
+        """
+        interval: seconds between two samples taken by the sampling thread
+        size: number of samples kept, at least 2
+        """
+        if size < 2:
+            raise ValueError('At least two samples are needed for rates')
+        self.interval = float(interval)
+        self.size = size
+        self._times = array('d', bytes(8 * size))
+        self._indexes = [None] * size
+        self._values = [None] * size
+        self._count = 0
+        self._names = {}
+        self._indexes_of = {}
+        self._positions = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        """
+        take a sample of the counters of all interfaces now
+        """
+        indexes, values = rtnl().dump_stats(len(self.counters))
+        now = monotonic()
+        with self._lock:
+            last = self._indexes[(self._count - 1) % self.size] if self._count else None
+            if last is not None and last == indexes:
+                indexes = last
+            else:
+                self._update_names(indexes)
+            pos = self._count % self.size
+            self._times[pos] = now
+            self._indexes[pos] = indexes
+            self._values[pos] = values
+            self._count += 1
+
+    def _update_names(self, indexes):
+        if not all(index in self._names for index in indexes):
+            self._names = {index: name for (index, name) in socket.if_nameindex()}
+            self._indexes_of = {name: index for (index, name) in self._names.items()}
+
+    def start(self):
+        """
+        sample every interval from a background thread, until stop()
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name='counter-sampler')
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        deadline = monotonic()
+        while not self._stop.is_set():
+            self.sample()
+            # keep the samples on a fixed schedule, skipping missed ones
+            deadline += self.interval
+            now = monotonic()
+            if deadline < now:
+                deadline = now + self.interval
+            self._stop.wait(deadline - now)
+
+    def samples(self) -> int:
+        """
+        return the number of samples in the buffer
+        """
+        return min(self._count, self.size)
+
+    def _slot(self, age):
+        """ sample taken `age` samples before the last one """
+        pos = (self._count - 1 - age) % self.size
+        return self._times[pos], self._indexes[pos], self._values[pos]
+
+    def _position(self, indexes):
+        """ return {ifindex: position} for the index array of samples """
+        key = id(indexes)
+        entry = self._positions.get(key)
+        if entry is None or entry[0] is not indexes:
+            # forget the arrays no longer in the buffer
+            live = {id(i) for i in self._indexes}
+            for old in [k for k in self._positions if k not in live]:
+                del self._positions[old]
+            entry = (indexes, {index: i for i, index in enumerate(indexes)})
+            self._positions[key] = entry
+        return entry[1]
+
+    def _rows(self, indexes, ifnames):
+        """ return (position, ifname) of the interfaces of a sample,
+        restricted to the given interface names """
+        if ifnames is None:
+            names = self._names
+            return [(i, names.get(index, str(index)))
+                    for i, index in enumerate(indexes)]
+        positions = self._position(indexes)
+        res = []
+        for ifname in ifnames:
+            i = positions.get(self._indexes_of.get(ifname))
+            if i is not None:
+                res.append((i, ifname))
+        return res
+
+    def _deltas(self, new, old, ifnames, columns=None):
+        """ return {ifname: list of counter deltas} between two samples,
+        of all counters or of the given counter positions """
+        _, new_indexes, new_values = new
+        _, old_indexes, old_values = old
+        width = len(self.counters)
+        if old_indexes is new_indexes:
+            old_pos = None
+        else:
+            old_pos = self._position(old_indexes)
+
+        res = {}
+        for i, ifname in self._rows(new_indexes, ifnames):
+            j = i if old_pos is None else old_pos.get(new_indexes[i])
+            if j is None:
+                # a new interface, all its counters are new
+                continue
+            if columns is None:
+                now = new_values[i * width:(i + 1) * width]
+                prev = old_values[j * width:(j + 1) * width]
+            else:
+                now = [new_values[i * width + c] for c in columns]
+                prev = [old_values[j * width + c] for c in columns]
+            # a counter lower than before was reset, count from zero
+            res[ifname] = [n - p if n >= p else n for n, p in zip(now, prev)]
+        return res
+
+    def deltas(self, ifnames=None, window=1) -> dict:
+        """
+        return the change of the counters of the interfaces over the last
+        `window` intervals, as {ifname: {counter: delta}}, or {} if there
+        are not enough samples yet
+
+        ifnames: the interfaces to report, all if None
+        """
+        with self._lock:
+            window = min(window, self.samples() - 1)
+            if window < 1:
+                return {}
+            deltas = self._deltas(self._slot(0), self._slot(window), ifnames)
+        return {ifname: dict(zip(self.counters, values))
+                for ifname, values in deltas.items()}
+
+    def rates(self, ifnames=None, window=1) -> dict:
+        """
+        return the per second rates of the counters of the interfaces over
+        the last `window` intervals, as {ifname: {counter: rate}}, or {} if
+        there are not enough samples yet
+        """
+        with self._lock:
+            window = min(window, self.samples() - 1)
+            if window < 1:
+                return {}
+            new = self._slot(0)
+            old = self._slot(window)
+            deltas = self._deltas(new, old, ifnames)
+        elapsed = new[0] - old[0]
+        if elapsed <= 0:
+            return {}
+        return {ifname: {c: d / elapsed for c, d in zip(self.counters, values)}
+                for ifname, values in deltas.items()}
+
+    def percentiles(self, ifnames=None, percentiles=(50, 95, 99),
+                    counters=None) -> dict:
+        """
+        return percentiles of the per second rates of each interval in the
+        buffer, as {ifname: {counter: {percentile: rate}}}, using the
+        nearest rank method
+
+        counters: the counters to report, all if None
+        """
+        names = [counter for counter in self.counters
+                 if counters is None or counter in counters]
+        columns = [self.counters.index(counter) for counter in names]
+        series = {}
+        with self._lock:
+            for age in range(self.samples() - 1):
+                new = self._slot(age)
+                old = self._slot(age + 1)
+                elapsed = new[0] - old[0]
+                if elapsed <= 0:
+                    continue
+                for ifname, values in self._deltas(new, old, ifnames, columns).items():
+                    series.setdefault(ifname, []).append([d / elapsed for d in values])
+
+        res = {}
+        for ifname, rows in series.items():
+            res[ifname] = {}
+            for c, counter in enumerate(names):
+                rates = sorted(row[c] for row in rows)
+                res[ifname][counter] = {
+                    p: rates[max(0, -(-p * len(rates) // 100) - 1)]
+                    for p in percentiles}
+        return res
@@ -88,12 +88,13 @@ class Section:
         raise ValueError(f'No type found for interface name: {name}')
 
     @classmethod
-    def _intf_under_section (cls,section='',vlan=True):
+    def _intf_under_section (cls,section='',vlan=True,names=None):
         """
         return a generator with the name of the configured interface
         which are under a section
+        names: the interface names to look at, all interfaces if None
         """
-        interfaces = netifaces.interfaces()
+        interfaces = netifaces.interfaces() if names is None else names
 
         for ifname in interfaces:
             ifsection = cls.section(ifname)
@@ -138,14 +139,16 @@ class Section:
         return l
 
     @classmethod
-    def interfaces(cls, section='', vlan=True):
+    def interfaces(cls, section='', vlan=True, names=None):
         """
         return a list of the name of the configured interface which are under a section
         if no section is provided, then it returns all configured interfaces.
         If vlan is True, also Vlan subinterfaces will be returned
+        If names is given, only these interface names are considered, e.g.
+        the names of an already retrieved list of links
         """
 
-        return cls._sort_interfaces(cls._intf_under_section(section, vlan))
+        return cls._sort_interfaces(cls._intf_under_section(section, vlan, names))
 
     @classmethod
     def _intf_with_feature(cls, feature=''):
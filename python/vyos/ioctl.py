@@ -18,8 +18,10 @@ import os
 import socket
 import fcntl
 import struct
+import array
 
 SIOCGIFFLAGS = 0x8913
+SIOCETHTOOL = 0x8946
 
 def get_terminal_size():
     """ pull the terminal size """
@@ -34,3 +36,14 @@ def get_interface_flags(intf):
     raw = fcntl.ioctl(sock.fileno(), SIOCGIFFLAGS, intf + nullif)
     flags, = struct.unpack('H', raw[16:18])
     return flags
+
+def ethtool_ioctl(intf, data):
+    """ Issue a SIOCETHTOOL request; data is the ethtool command structure,
+    starting with the u32 command number, and is updated in place """
+    buf = array.array('B', data)
+    addr, _ = buf.buffer_info()
+    ifreq = struct.pack('16sP', intf.encode(), addr)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        fcntl.ioctl(sock.fileno(), SIOCETHTOOL, ifreq)
+    data[:] = buf.tobytes()
+    return data
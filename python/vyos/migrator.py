@@ -15,11 +15,18 @@
 
 import sys
 import os
+import re
+import io
 import json
+import time
 import logging
+import importlib.util
+import importlib.machinery
+from contextlib import redirect_stdout
 
 import vyos.defaults
 import vyos.component_version as component_version
+from vyos.configtree import ConfigTree
 from vyos.utils.process import cmd
 
 log_file = os.path.join(vyos.defaults.directories['config'], 'vyos-migrate.log')
@@ -27,6 +34,32 @@ log_file = os.path.join(vyos.defaults.directories['config'], 'vyos-migrate.log')
 class MigratorError(Exception):
     pass
 
+# A migration script can be run in-process if it defines the function
+#   def migrate(config: ConfigTree) -> None
+# which modifies the config tree in place, and keeps the code handling its
+# file argument below 'if __name__ == "__main__":'
+_migrate_function = re.compile(r'^def migrate\(', re.MULTILINE)
+
+def load_migration_function(migrate_script):
+    """
+    Return the migrate function of a migration script, or None if the
+    script has to be run as a separate process.
+    """
+    with open(migrate_script) as f:
+        source = f.read()
+    # only scripts converted to the function interface can be imported,
+    # all others run at import time
+    if not _migrate_function.search(source):
+        return None
+
+    name = 'vyos_migration_' + re.sub(r'\W', '_', os.path.relpath(
+        migrate_script, vyos.defaults.directories['migrate']))
+    loader = importlib.machinery.SourceFileLoader(name, migrate_script)
+    spec = importlib.util.spec_from_loader(name, loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return getattr(module, 'migrate', None)
+
 class Migrator(object):
     def __init__(self, config_file, force=False, set_vintage='vyos'):
         self._config_file = config_file
@@ -84,6 +117,21 @@ class Migrator(object):
         else:
             return True
 
+    def _load_config(self):
+        with open(self._config_file) as f:
+            self._config_text = f.read()
+        return ConfigTree(self._config_text)
+
+    def _write_config(self, config):
+        config_text = config.to_string()
+        if config_text == self._config_text:
+            return
+        try:
+            with open(self._config_file, 'w') as f:
+                f.write(config_text)
+        except OSError as err:
+            raise MigratorError(f'Failed to save the modified config: {err}')
+
     def run_migration_scripts(self, config_file_versions, system_versions):
         """
         Run migration scripts iteratively, until config file version equals
@@ -107,6 +155,12 @@ class Migrator(object):
 
         rev_versions = {}
 
+        # config tree shared by consecutive in-process migration scripts;
+        # written back to the config file before a script is run as a
+        # subprocess, and at the end
+        config = None
+        total_start = time.monotonic()
+
         for key in sys_keys:
             sys_ver = sys_versions[key]
             if key in cfg_versions:
@@ -123,9 +177,27 @@ class Migrator(object):
                 migrate_script = os.path.join(migrate_script_dir,
                         '{}-to-{}'.format(cfg_ver, next_ver))
 
+                start = time.monotonic()
                 try:
-                    out = cmd([migrate_script, self._config_file])
-                    self.logger.info(f'{migrate_script}')
+                    migrate = load_migration_function(migrate_script)
+                    if migrate:
+                        if config is None:
+                            config = self._load_config()
+                        out = io.StringIO()
+                        with redirect_stdout(out):
+                            migrate(config)
+                        out = out.getvalue().strip()
+                        mode = 'in-process'
+                    else:
+                        # the script reads the config file, so it must be
+                        # up to date
+                        if config is not None:
+                            self._write_config(config)
+                            config = None
+                        out = cmd([migrate_script, self._config_file])
+                        mode = 'subprocess'
+                    elapsed = time.monotonic() - start
+                    self.logger.info(f'{migrate_script} ({mode}, {elapsed:.3f}s)')
                     if out: self.logger.info(out)
                 except FileNotFoundError:
                     pass
@@ -137,6 +209,15 @@ class Migrator(object):
                 cfg_ver = next_ver
             rev_versions[key] = cfg_ver
 
+        if config is not None:
+            try:
+                self._write_config(config)
+            except MigratorError as err:
+                print(f'\nMigration error: {err}.')
+                sys.exit(1)
+
+        self.logger.info(f'Migration finished in {time.monotonic() - total_start:.3f}s')
+
         del os.environ['VYOS_MIGRATION']
         return rev_versions
 
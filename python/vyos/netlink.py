@@ -0,0 +1,588 @@
+# Copyright 2023 VyOS maintainers and contributors <maintainers@vyos.io>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+# Minimal rtnetlink client for link and address operations, so reading or
+# changing an interface attribute does not require running "ip".
+#
+# One channel is kept per process (see rtnl()). Requests which only need
+# an acknowledgement can be queued in a batch, they are then sent to the
+# kernel in a single write and processed in order. A failed request raises
+# an RtNetlinkError naming it when the batch is sent; the requests of a
+# batch left by an exception are dropped.
+
+import os
+import errno
+import socket
+import struct
+
+from array import array
+from contextlib import contextmanager
+from functools import wraps
+from ipaddress import ip_interface
+
+# message types, see linux/rtnetlink.h and linux/netlink.h
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+RTM_NEWLINK = 16
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_GETADDR = 22
+RTM_NEWSTATS = 92
+RTM_GETSTATS = 94
+
+NLM_F_REQUEST = 0x1
+NLM_F_MULTI = 0x2
+NLM_F_ACK = 0x4
+NLM_F_DUMP = 0x300
+NLM_F_EXCL = 0x200
+NLM_F_CREATE = 0x400
+
+SOL_NETLINK = 270
+NETLINK_GET_STRICT_CHK = 12
+
+IFF_UP = 0x1
+IFF_POINTOPOINT = 0x10
+IFF_RUNNING = 0x40
+
+IFLA_ADDRESS = 1
+IFLA_BROADCAST = 2
+IFLA_IFNAME = 3
+IFLA_MTU = 4
+IFLA_LINK = 5
+IFLA_QDISC = 6
+IFLA_MASTER = 10
+IFLA_TXQLEN = 13
+IFLA_OPERSTATE = 16
+IFLA_LINKINFO = 18
+IFLA_IFALIAS = 20
+IFLA_STATS64 = 23
+IFLA_GROUP = 27
+IFLA_LINK_NETNSID = 37
+IFLA_MIN_MTU = 50
+IFLA_MAX_MTU = 51
+IFLA_PROP_LIST = 52
+IFLA_ALT_IFNAME = 53
+IFLA_PERM_ADDRESS = 54
+
+IFLA_INFO_KIND = 1
+IFLA_INFO_SLAVE_KIND = 4
+
+IFLA_STATS_LINK_64 = 1
+
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+IFA_LABEL = 3
+IFA_BROADCAST = 4
+IFA_ANYCAST = 5
+IFA_CACHEINFO = 6
+IFA_FLAGS = 8
+
+IFA_F_SECONDARY = 0x1
+IFA_F_PERMANENT = 0x80
+
+_nlmsghdr = struct.Struct('IHHII')
+_ifinfomsg = struct.Struct('BxHiII')
+_ifaddrmsg = struct.Struct('BBBBI')
+_rtattr = struct.Struct('HH')
+_ifa_cacheinfo = struct.Struct('IIII')
+_if_stats_msg = struct.Struct('BxxxII')
+
+# struct rtnl_link_stats64, the counters are named as in
+# /sys/class/net/<ifname>/statistics
+_link_stats = ['rx_packets', 'tx_packets', 'rx_bytes', 'tx_bytes',
+               'rx_errors', 'tx_errors', 'rx_dropped', 'tx_dropped',
+               'multicast', 'collisions', 'rx_length_errors',
+               'rx_over_errors', 'rx_crc_errors', 'rx_frame_errors',
+               'rx_fifo_errors', 'rx_missed_errors', 'tx_aborted_errors',
+               'tx_carrier_errors', 'tx_fifo_errors', 'tx_heartbeat_errors',
+               'tx_window_errors', 'rx_compressed', 'tx_compressed',
+               'rx_nohandler']
+
+# interface flags in the order and spelling used by iproute2
+_link_flags = [('LOOPBACK', 0x8), ('BROADCAST', 0x2), ('POINTOPOINT', 0x10),
+               ('MULTICAST', 0x1000), ('NOARP', 0x80), ('ALLMULTI', 0x200),
+               ('PROMISC', 0x100), ('MASTER', 0x400), ('SLAVE', 0x800),
+               ('DEBUG', 0x4), ('DYNAMIC', 0x8000), ('AUTOMEDIA', 0x4000),
+               ('PORTSEL', 0x2000), ('NOTRAILERS', 0x20), ('UP', IFF_UP),
+               ('LOWER_UP', 0x10000), ('DORMANT', 0x20000),
+               ('ECHO', 0x40000)]
+
+# address flags in the order and spelling used by iproute2, the secondary
+# flag of IPv6 addresses is shown as temporary, and the permanent flag is
+# shown as dynamic when not set
+_addr_flags = [('secondary', IFA_F_SECONDARY), ('nodad', 0x2),
+               ('optimistic', 0x4), ('dadfailed', 0x8), ('home', 0x10),
+               ('deprecated', 0x20), ('tentative', 0x40),
+               ('dynamic', IFA_F_PERMANENT), ('mngtmpaddr', 0x100),
+               ('noprefixroute', 0x200), ('autojoin', 0x400),
+               ('stable-privacy', 0x800)]
+
+_scopes = {0: 'global', 200: 'site', 253: 'link', 254: 'host', 255: 'nowhere'}
+
+# link types as named by iproute2, see linux/if_arp.h
+_link_types = {1: 'ether', 24: 'ieee1394', 32: 'infiniband', 256: 'slip',
+               280: 'can', 512: 'ppp', 513: 'cisco', 519: 'rawip',
+               768: 'ipip', 769: 'tunnel6', 772: 'loopback', 774: 'fddi',
+               776: 'sit', 778: 'gre', 779: 'pimreg', 801: 'ieee802.11',
+               803: 'ieee802.11/radiotap', 804: 'ieee802.15.4',
+               820: 'phonet', 823: 'gre6', 824: 'netlink', 825: '6lowpan',
+               826: 'vsockmon', 65534: 'none', 65535: 'void'}
+
+_operstates = ['UNKNOWN', 'NOTPRESENT', 'DOWN', 'LOWERLAYERDOWN', 'TESTING',
+               'DORMANT', 'UP']
+
+# link types whose hardware address is an IPv4 or IPv6 address
+_arphrd_inet = (768, 776, 778)
+_arphrd_inet6 = (769, 823)
+
+def _align(n: int) -> int:
+    return (n + 3) & ~3
+
+def _attr(attr_type: int, data: bytes) -> bytes:
+    length = _rtattr.size + len(data)
+    return _rtattr.pack(length, attr_type) + data + bytes(_align(length) - length)
+
+def _attr_str(attr_type: int, value: str) -> bytes:
+    return _attr(attr_type, value.encode() + b'\0')
+
+def _attr_u32(attr_type: int, value: int) -> bytes:
+    return _attr(attr_type, struct.pack('I', value))
+
+def _parse_attrs(data: bytes, offset: int=0) -> dict:
+    attrs = {}
+    while offset + _rtattr.size <= len(data):
+        length, attr_type = _rtattr.unpack_from(data, offset)
+        if length < _rtattr.size:
+            break
+        # mask NLA_F_NESTED and NLA_F_NET_BYTEORDER
+        attrs[attr_type & 0x3fff] = data[offset + _rtattr.size:offset + length]
+        offset += _align(length)
+    return attrs
+
+def _str(data: bytes) -> str:
+    return data.split(b'\0', 1)[0].decode()
+
+def _u32(data: bytes) -> int:
+    return struct.unpack('I', data[:4])[0]
+
+def _link_address(link_type: int, data: bytes) -> str:
+    if link_type in _arphrd_inet and len(data) == 4:
+        return socket.inet_ntop(socket.AF_INET, data)
+    if link_type in _arphrd_inet6 and len(data) == 16:
+        return socket.inet_ntop(socket.AF_INET6, data)
+    return ':'.join(f'{b:02x}' for b in data)
+
+def _ifindex(ifname: str) -> int:
+    try:
+        return socket.if_nametoindex(ifname)
+    except OSError:
+        raise OSError(errno.ENODEV, f'Device "{ifname}" does not exist.')
+
+def _parse_link(data: bytes, detail: bool=True) -> dict:
+    """ Decode a RTM_NEWLINK message, with the key names of "ip --json
+    addr show", and with detail those of "ip --json --detail link
+    show" used by get_link() """
+    _, link_type, index, flags, _ = _ifinfomsg.unpack_from(data)
+    attrs = _parse_attrs(data, _ifinfomsg.size)
+
+    link = {'ifindex': index, 'ifname': _str(attrs.get(IFLA_IFNAME, b''))}
+    if IFLA_LINK in attrs:
+        iflink = _u32(attrs[IFLA_LINK])
+        if not iflink:
+            link['link'] = None
+        elif IFLA_LINK_NETNSID in attrs:
+            link['link_index'] = iflink
+        else:
+            try:
+                link['link'] = socket.if_indextoname(iflink)
+            except OSError:
+                link['link_index'] = iflink
+    link['flags'] = [name for (name, bit) in _link_flags if flags & bit]
+    if flags & IFF_UP and not flags & IFF_RUNNING:
+        link['flags'].insert(0, 'NO-CARRIER')
+    if IFLA_MTU in attrs:
+        link['mtu'] = _u32(attrs[IFLA_MTU])
+    if IFLA_QDISC in attrs:
+        link['qdisc'] = _str(attrs[IFLA_QDISC])
+    if IFLA_MASTER in attrs:
+        link['master'] = socket.if_indextoname(_u32(attrs[IFLA_MASTER]))
+    if IFLA_OPERSTATE in attrs:
+        state = attrs[IFLA_OPERSTATE][0]
+        link['operstate'] = _operstates[state] if state < len(_operstates) else 'UNKNOWN'
+    if IFLA_GROUP in attrs:
+        group = _u32(attrs[IFLA_GROUP])
+        link['group'] = 'default' if not group else str(group)
+    if IFLA_TXQLEN in attrs:
+        link['txqlen'] = _u32(attrs[IFLA_TXQLEN])
+    link['link_type'] = _link_types.get(link_type, f'[{link_type}]')
+    if IFLA_ADDRESS in attrs:
+        link['address'] = _link_address(link_type, attrs[IFLA_ADDRESS])
+        if IFLA_BROADCAST in attrs:
+            if flags & IFF_POINTOPOINT:
+                link['link_pointtopoint'] = True
+            link['broadcast'] = _link_address(link_type, attrs[IFLA_BROADCAST])
+    if IFLA_PERM_ADDRESS in attrs and attrs[IFLA_PERM_ADDRESS] != attrs.get(IFLA_ADDRESS):
+        link['permaddr'] = _link_address(link_type, attrs[IFLA_PERM_ADDRESS])
+    if IFLA_LINK_NETNSID in attrs:
+        link['link_netnsid'] = struct.unpack('i', attrs[IFLA_LINK_NETNSID][:4])[0]
+    if IFLA_PROP_LIST in attrs:
+        # several IFLA_ALT_IFNAME attributes, not collapsed by _parse_attrs()
+        prop_list = attrs[IFLA_PROP_LIST]
+        offset = 0
+        altnames = []
+        while offset + _rtattr.size <= len(prop_list):
+            length, attr_type = _rtattr.unpack_from(prop_list, offset)
+            if length < _rtattr.size:
+                break
+            if attr_type == IFLA_ALT_IFNAME:
+                altnames.append(_str(prop_list[offset + _rtattr.size:offset + length]))
+            offset += _align(length)
+        if altnames:
+            link['altnames'] = altnames
+    if IFLA_IFALIAS in attrs:
+        link['ifalias'] = _str(attrs[IFLA_IFALIAS])
+
+    if detail:
+        for key, attr in [('min_mtu', IFLA_MIN_MTU), ('max_mtu', IFLA_MAX_MTU)]:
+            if attr in attrs:
+                link[key] = _u32(attrs[attr])
+        if IFLA_LINKINFO in attrs:
+            info = _parse_attrs(attrs[IFLA_LINKINFO])
+            link['linkinfo'] = {}
+            if IFLA_INFO_KIND in info:
+                link['linkinfo']['info_kind'] = _str(info[IFLA_INFO_KIND])
+            if IFLA_INFO_SLAVE_KIND in info:
+                link['linkinfo']['info_slave_kind'] = _str(info[IFLA_INFO_SLAVE_KIND])
+    if IFLA_STATS64 in attrs:
+        values = struct.unpack_from(f'{len(_link_stats)}Q',
+                                    attrs[IFLA_STATS64].ljust(8 * len(_link_stats), b'\0'))
+        link['stats'] = dict(zip(_link_stats, values))
+    return link
+
+class RtNetlinkError(OSError):
+    """ A request failed, request is the description of the request """
+    def __init__(self, err: int, request: str):
+        super().__init__(err, f'{request}: {os.strerror(err)}')
+        self.request = request
+
+class RtNetlink:
+    """ A NETLINK_ROUTE socket with helpers for link and address requests """
+    def __init__(self):
+        self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW,
+                                   socket.NETLINK_ROUTE)
+        self._sock.bind((0, 0))
+        # let the kernel filter dumps by the header of the request, e.g.
+        # addresses by interface (Linux 4.20 and later)
+        try:
+            self._sock.setsockopt(SOL_NETLINK, NETLINK_GET_STRICT_CHK, 1)
+        except OSError:
+            pass
+        self._seq = 0
+        self._batch_depth = 0
+        self._pending = []
+
+    def close(self):
+        self._sock.close()
+
+    def _message(self, msg_type: int, flags: int, payload: bytes) -> tuple:
+        self._seq += 1
+        header = _nlmsghdr.pack(_nlmsghdr.size + len(payload), msg_type,
+                                flags, self._seq, 0)
+        return self._seq, header + payload
+
+    def _receive(self, seqs: set) -> tuple:
+        """ Read replies until all requests in seqs are answered
+
+        Returns: tuple of (dict of seq -> list of (type, payload), dict of
+        seq -> error number)
+        """
+        replies = {seq: [] for seq in seqs}
+        errors = {}
+        pending = set(seqs)
+        while pending:
+            data = self._sock.recv(1 << 16)
+            offset = 0
+            while offset + _nlmsghdr.size <= len(data):
+                length, msg_type, flags, seq, _ = _nlmsghdr.unpack_from(data, offset)
+                payload = data[offset + _nlmsghdr.size:offset + length]
+                offset += _align(length)
+                if seq not in pending:
+                    continue
+                if msg_type == NLMSG_ERROR:
+                    err = -struct.unpack_from('i', payload)[0]
+                    if err:
+                        errors[seq] = err
+                    pending.discard(seq)
+                elif msg_type == NLMSG_DONE:
+                    pending.discard(seq)
+                else:
+                    replies[seq].append((msg_type, payload))
+                    if not flags & NLM_F_MULTI:
+                        pending.discard(seq)
+        return replies, errors
+
+    def _request(self, msg_type: int, flags: int, payload: bytes,
+                 what: str) -> list:
+        self.flush()
+        seq, msg = self._message(msg_type, NLM_F_REQUEST | flags, payload)
+        self._sock.send(msg)
+        replies, errors = self._receive({seq})
+        if seq in errors:
+            raise RtNetlinkError(errors[seq], what)
+        return replies[seq]
+
+    def _change(self, msg_type: int, flags: int, payload: bytes, what: str):
+        """ Send a request which only returns an acknowledgement; while in a
+        batch, the request is queued until the batch is flushed """
+        seq, msg = self._message(msg_type, NLM_F_REQUEST | NLM_F_ACK | flags,
+                                 payload)
+        self._pending.append((seq, msg, what))
+        if not self._batch_depth:
+            self.flush()
+
+    def flush(self):
+        """ Send all queued requests and wait for their acknowledgements
+
+        Raises:
+            RtNetlinkError: for the first failed request; all queued
+            requests are processed regardless
+        """
+        pending, self._pending = self._pending, []
+        first_error = None
+        # keep the acknowledgements within the default socket buffer
+        for i in range(0, len(pending), 256):
+            chunk = pending[i:i + 256]
+            self._sock.send(b''.join(msg for (_, msg, _) in chunk))
+            _, errors = self._receive({seq for (seq, _, _) in chunk})
+            for seq, _, what in chunk:
+                if seq in errors and first_error is None:
+                    first_error = RtNetlinkError(errors[seq], what)
+        if first_error:
+            raise first_error
+
+    @contextmanager
+    def batch(self):
+        """ Queue link and address changes and send them together on exit,
+        or before the next read request; on an exception, the changes queued
+        by the batch are dropped """
+        first_seq = self._seq
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            # not to be sent by a later flush, for another caller
+            self._pending = [p for p in self._pending if p[0] <= first_seq]
+            raise
+        finally:
+            self._batch_depth -= 1
+        if not self._batch_depth:
+            self.flush()
+
+    def get_link(self, ifname: str) -> dict:
+        """ Return link information of an interface, using the key names of
+        "ip --json --detail link show"; the counters of the interface are
+        under 'stats', named as in /sys/class/net/<ifname>/statistics
+
+        Raises:
+            RtNetlinkError: if the interface does not exist
+        """
+        payload = _ifinfomsg.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+        payload += _attr_str(IFLA_IFNAME, ifname)
+        reply = self._request(RTM_GETLINK, 0, payload, f'get link {ifname}')
+        _, data = reply[0]
+        return _parse_link(data)
+
+    def dump_links(self, addresses: bool=True, stats: bool=False) -> list:
+        """ Return all links with one dump request, using the key names of
+        "ip --json addr show", and with their addresses under 'addr_info'
+        from a second dump request. With stats, the counters of each link
+        are under 'stats', named as in /sys/class/net/<ifname>/statistics
+        """
+        payload = _ifinfomsg.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+        links = []
+        for _, data in self._request(RTM_GETLINK, NLM_F_DUMP, payload, 'dump links'):
+            link = _parse_link(data, detail=False)
+            if not stats:
+                link.pop('stats', None)
+            links.append(link)
+        if addresses:
+            addr_info = {link['ifindex']: [] for link in links}
+            for addr in self._dump_addresses():
+                index = addr.pop('ifindex')
+                if index in addr_info:
+                    addr_info[index].append(addr)
+            for link in links:
+                # before the stats, as in the output of "ip -s"
+                link_stats = link.pop('stats', None)
+                link['addr_info'] = addr_info[link['ifindex']]
+                if link_stats is not None:
+                    link['stats'] = link_stats
+        return links
+
+    def dump_stats(self, counters: int=len(_link_stats)) -> tuple:
+        """ Return the counters of all links with one RTM_GETSTATS dump,
+        which only carries the counters and is cheaper for the kernel to
+        build than a link dump, as compact arrays for sampling them often
+
+        Args:
+            counters: number of counters returned per link, the first ones
+            of struct rtnl_link_stats64 (rx_packets, tx_packets, rx_bytes,
+            tx_bytes, rx_errors, tx_errors, rx_dropped, tx_dropped, ...)
+
+        Returns: tuple of (array('I') of the link indexes, array('Q') of
+        their counters, one row of `counters` values per link)
+        """
+        payload = _if_stats_msg.pack(socket.AF_UNSPEC, 0, 1 << (IFLA_STATS_LINK_64 - 1))
+        row = struct.Struct(f'{counters}Q')
+        # the counters are the first attribute of the reply
+        offset = _if_stats_msg.size + _rtattr.size
+        indexes = array('I')
+        values = array('Q')
+        for msg_type, data in self._request(RTM_GETSTATS, NLM_F_DUMP, payload, 'dump stats'):
+            if msg_type != RTM_NEWSTATS:
+                continue
+            _, index, _ = _if_stats_msg.unpack_from(data)
+            length, attr_type = _rtattr.unpack_from(data, _if_stats_msg.size)
+            if attr_type != IFLA_STATS_LINK_64 or length - _rtattr.size < row.size:
+                continue
+            indexes.append(index)
+            values.extend(row.unpack_from(data, offset))
+        return indexes, values
+
+    def _dump_addresses(self) -> list:
+        """ Return all addresses, using the key names of the entries of
+        'addr_info' in "ip --json addr show", and their ifindex """
+        payload = _ifaddrmsg.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+        res = []
+        for _, data in self._request(RTM_GETADDR, NLM_F_DUMP, payload, 'dump addresses'):
+            family, prefixlen, flags, scope, index = _ifaddrmsg.unpack_from(data)
+            if family not in (socket.AF_INET, socket.AF_INET6):
+                continue
+            attrs = _parse_attrs(data, _ifaddrmsg.size)
+            local = attrs.get(IFA_LOCAL, attrs.get(IFA_ADDRESS))
+            if local is None:
+                continue
+            addr = {'ifindex': index,
+                    'family': 'inet' if family == socket.AF_INET else 'inet6',
+                    'local': socket.inet_ntop(family, local)}
+            if IFA_LOCAL in attrs and IFA_ADDRESS in attrs and attrs[IFA_ADDRESS] != local:
+                addr['address'] = socket.inet_ntop(family, attrs[IFA_ADDRESS])
+            addr['prefixlen'] = prefixlen
+            for key, attr in [('broadcast', IFA_BROADCAST), ('anycast', IFA_ANYCAST)]:
+                if attr in attrs:
+                    addr[key] = socket.inet_ntop(family, attrs[attr])
+            addr['scope'] = _scopes.get(scope, str(scope))
+            if IFA_FLAGS in attrs:
+                flags = _u32(attrs[IFA_FLAGS])
+            for name, bit in _addr_flags:
+                if bit == IFA_F_PERMANENT:
+                    if not flags & bit:
+                        addr[name] = True
+                elif flags & bit:
+                    if bit == IFA_F_SECONDARY and family == socket.AF_INET6:
+                        name = 'temporary'
+                    addr[name] = True
+            if IFA_LABEL in attrs:
+                addr['label'] = _str(attrs[IFA_LABEL])
+            if IFA_CACHEINFO in attrs:
+                preferred, valid, _, _ = _ifa_cacheinfo.unpack_from(attrs[IFA_CACHEINFO])
+                addr['valid_life_time'] = valid
+                addr['preferred_life_time'] = preferred
+            res.append(addr)
+        return res
+
+    def set_link(self, ifname: str, up: bool=None, mtu: int=None,
+                 address: str=None, alias: str=None, master=False):
+        """ Change link attributes, only attributes which are passed are
+        changed; pass master=None to remove the interface from its master
+        """
+        flags = change = 0
+        if up is not None:
+            flags = IFF_UP if up else 0
+            change = IFF_UP
+        payload = _ifinfomsg.pack(socket.AF_UNSPEC, 0, _ifindex(ifname),
+                                  flags, change)
+        if mtu is not None:
+            payload += _attr_u32(IFLA_MTU, int(mtu))
+        if address is not None:
+            payload += _attr(IFLA_ADDRESS, bytes.fromhex(address.replace(':', '')))
+        if alias is not None:
+            payload += _attr(IFLA_IFALIAS, alias.encode())
+        if master is not False:
+            payload += _attr_u32(IFLA_MASTER, _ifindex(master) if master else 0)
+        self._change(RTM_NEWLINK, 0, payload, f'set link {ifname}')
+
+    def get_addresses(self, ifname: str=None) -> list:
+        """ Return the addresses of an interface, or of all interfaces, as
+        list of dicts with keys ifindex, family, local and prefixlen; the
+        addresses of an interface are only dumped for it by the kernel with
+        strict checking, else they are filtered here """
+        index = _ifindex(ifname) if ifname else 0
+        payload = _ifaddrmsg.pack(socket.AF_UNSPEC, 0, 0, 0, index)
+        res = []
+        for _, data in self._request(RTM_GETADDR, NLM_F_DUMP, payload,
+                                     f'get addresses {ifname or ""}'):
+            family, prefixlen, _, _, addr_index = _ifaddrmsg.unpack_from(data)
+            if index and addr_index != index:
+                continue
+            attrs = _parse_attrs(data, _ifaddrmsg.size)
+            local = attrs.get(IFA_LOCAL, attrs.get(IFA_ADDRESS))
+            if local is None:
+                continue
+            res.append({'ifindex': addr_index,
+                        'family': 'inet' if family == socket.AF_INET else 'inet6',
+                        'local': socket.inet_ntop(family, local),
+                        'prefixlen': prefixlen})
+        return res
+
+    def _address(self, msg_type: int, flags: int, ifname: str, addr: str,
+                 broadcast: bool, what: str):
+        addr = ip_interface(addr)
+        family = socket.AF_INET if addr.version == 4 else socket.AF_INET6
+        payload = _ifaddrmsg.pack(family, addr.network.prefixlen, 0, 0,
+                                  _ifindex(ifname))
+        packed = addr.ip.packed
+        payload += _attr(IFA_LOCAL, packed) + _attr(IFA_ADDRESS, packed)
+        if broadcast and addr.version == 4 and addr.network.prefixlen < 31:
+            payload += _attr(IFA_BROADCAST, addr.network.broadcast_address.packed)
+        self._change(msg_type, flags, payload, f'{what} {addr} dev {ifname}')
+
+    def add_address(self, ifname: str, addr: str, broadcast: bool=True):
+        """ Add an address, the equivalent of "ip addr add <addr> dev
+        <ifname> brd +" """
+        self._address(RTM_NEWADDR, NLM_F_CREATE | NLM_F_EXCL, ifname, addr,
+                      broadcast, 'add address')
+
+    def del_address(self, ifname: str, addr: str):
+        self._address(RTM_DELADDR, 0, ifname, addr, False, 'delete address')
+
+def rtnl(_channel={}) -> RtNetlink:
+    """ Return the rtnetlink channel of this process """
+    # a forked child must not share the socket of its parent
+    pid = os.getpid()
+    if _channel.get('pid') != pid:
+        _channel['pid'] = pid
+        _channel['rtnl'] = RtNetlink()
+    return _channel['rtnl']
+
+def batched(func):
+    """ Decorator: queue the netlink changes of a function call and send
+    them as one batch when it returns """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with rtnl().batch():
+            return func(*args, **kwargs)
+    return wrapper
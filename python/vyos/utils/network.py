@@ -74,8 +74,10 @@ def get_vrf_members(vrf: str) -> list:
 def get_interface_vrf(interface):
     """ Returns VRF of given interface """
     from vyos.utils.dict import dict_search
-    from vyos.utils.network import get_interface_config
-    tmp = get_interface_config(interface)
+    from vyos.netlink import rtnl
+    if not interface_exists(interface):
+        return 'default'
+    tmp = rtnl().get_link(interface)
     if dict_search('linkinfo.info_slave_kind', tmp) == 'vrf':
         return tmp['master']
     return 'default'
@@ -314,27 +316,36 @@ def is_intf_addr_assigned(ifname: str, addr: str, netns: str=None) -> bool:
     It can check both a single IP address (e.g. 192.0.2.1 or a assigned CIDR
     address 192.0.2.1/24.
     """
-    import json
-    import jmespath
-
-    from vyos.utils.process import rc_cmd
     from ipaddress import ip_interface
 
-    netns_cmd = f'ip netns exec {netns}' if netns else ''
-    rc, out = rc_cmd(f'{netns_cmd} ip --json address show dev {ifname}')
-    if rc == 0:
+    if netns:
+        import json
+        import jmespath
+        from vyos.utils.process import rc_cmd
+
+        rc, out = rc_cmd(f'ip netns exec {netns} ip --json address show dev {ifname}')
+        if rc != 0:
+            return False
         json_out = json.loads(out)
         addresses = jmespath.search("[].addr_info[].{family: family, address: local, prefixlen: prefixlen}", json_out)
-        for address_info in addresses:
-            family = address_info['family']
-            address = address_info['address']
-            prefixlen = address_info['prefixlen']
-            # Remove the interface name if present in the given address
-            if '%' in addr:
-                addr = addr.split('%')[0]
-            interface = ip_interface(f"{address}/{prefixlen}")
-            if ip_interface(addr) == interface or address == addr:
-                return True
+    else:
+        from vyos.netlink import rtnl
+        if not interface_exists(ifname):
+            return False
+        addresses = [{'family': a['family'], 'address': a['local'],
+                      'prefixlen': a['prefixlen']}
+                     for a in rtnl().get_addresses(ifname)]
+
+    for address_info in addresses:
+        family = address_info['family']
+        address = address_info['address']
+        prefixlen = address_info['prefixlen']
+        # Remove the interface name if present in the given address
+        if '%' in addr:
+            addr = addr.split('%')[0]
+        interface = ip_interface(f"{address}/{prefixlen}")
+        if ip_interface(addr) == interface or address == addr:
+            return True
 
     return False
 
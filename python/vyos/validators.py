@@ -0,0 +1,676 @@
+# Copyright 2023 VyOS maintainers and contributors <maintainers@vyos.io>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+In-process value validation, for checking many values without starting a
+validator process (or two, with ipaddrcheck) for each of them.
+
+The validators of src/validators are implemented natively here, returning
+the exit code and output of the script as (code, output). The ones which
+depend on the state of the system (installed files, sysctl and timezone
+lists, ...) are still run as scripts. Constraints of the XML definitions,
+an OR of regexes and validators as checked by validate-value, are taken
+from the xml_ref cache; their regexes are compiled once per process, with
+the POSIX classes of PCRE translated, and a regex which cannot be ported is
+left to validate-value.
+"""
+
+import os
+import re
+import shlex
+import base64
+import binascii
+import subprocess
+
+from ipaddress import ip_address
+from ipaddress import ip_interface
+from ipaddress import IPv6Address
+
+validators_dir = '/usr/libexec/vyos/validators'
+libexec_dir = '/usr/libexec/vyos'
+services_file = '/etc/services'
+
+default_error = 'Invalid value'
+
+_regex_cache = {}
+
+# POSIX character classes of the PCRE regexes of validate-value, as the
+# content of a Python character set
+_posix_classes = {
+    'alnum': 'a-zA-Z0-9',
+    'alpha': 'a-zA-Z',
+    'ascii': '\\x00-\\x7f',
+    'blank': ' \\t',
+    'cntrl': '\\x00-\\x1f\\x7f',
+    'digit': '0-9',
+    'graph': '!-~',
+    'lower': 'a-z',
+    'print': ' -~',
+    'punct': '!-/:-@\\[-`{-~',
+    'space': ' \\t\\n\\v\\f\\r',
+    'upper': 'A-Z',
+    'word': 'a-zA-Z0-9_',
+    'xdigit': '0-9A-Fa-f',
+}
+
+_posix_class = re.compile(r'\[:(\^?)([a-z]+):\]')
+
+def translate_regex(regex: str) -> str:
+    """ Translate the POSIX character classes of a PCRE regex, which
+    Python does not know, to their ranges; raise ValueError if one
+    cannot be translated """
+    res = []
+    in_set = False
+    i = 0
+    while i < len(regex):
+        c = regex[i]
+        if c == '\\':
+            res.append(regex[i:i + 2])
+            i += 2
+            continue
+        if not in_set:
+            res.append(c)
+            i += 1
+            if c == '[':
+                in_set = True
+                if regex[i:i + 1] == '^':
+                    res.append('^')
+                    i += 1
+                if regex[i:i + 1] == ']':
+                    res.append('\\]')
+                    i += 1
+            continue
+        m = _posix_class.match(regex, i)
+        if m:
+            negated, name = m.groups()
+            if negated or name not in _posix_classes:
+                raise ValueError(f'cannot translate "{m.group(0)}"')
+            res.append(_posix_classes[name])
+            i = m.end()
+            # a hyphen after a class is a literal, not a range
+            if regex[i:i + 1] == '-':
+                res.append('\\-')
+                i += 1
+            continue
+        if c == ']':
+            in_set = False
+        elif c == '[':
+            c = '\\['
+        res.append(c)
+        i += 1
+    return ''.join(res)
+
+def compile_regex(regex: str):
+    """ Compiled regex of a constraint, matching the whole value, or None
+    if it cannot be ported to Python and must be checked by validate-value """
+    try:
+        return _regex_cache[regex]
+    except KeyError:
+        pass
+    try:
+        res = re.compile(f'(?:{translate_regex(regex)})\\Z', re.ASCII)
+    except (ValueError, re.error):
+        res = None
+    _regex_cache[regex] = res
+    return res
+
+def match_regex(regex: str, value: str) -> bool:
+    """ Return True if the whole value matches a regex of a constraint """
+    compiled = compile_regex(regex)
+    if compiled is not None:
+        return compiled.match(value) is not None
+    cmd = [os.path.join(libexec_dir, 'validate-value'),
+           '--regex', regex, '--value', value]
+    try:
+        return subprocess.run(cmd, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL).returncode == 0
+    except OSError:
+        return False
+
+# ipaddrcheck
+
+def _ip(value: str):
+    """ Return (address, prefix length or None) of an IPv4 or IPv6
+    address with optional prefix length, or None if not valid """
+    address, sep, plen = value.partition('/')
+    if '%' in address:
+        return None
+    try:
+        address = ip_address(address)
+    except ValueError:
+        return None
+    if not sep:
+        return address, None
+    if not plen.isdigit() or plen != str(int(plen)) or int(plen) > address.max_prefixlen:
+        return None
+    return address, int(plen)
+
+def _is_network(address, plen) -> bool:
+    host_bits = address.max_prefixlen - plen
+    return int(address) & ((1 << host_bits) - 1) == 0
+
+def ipaddrcheck(check: str, value: str) -> bool:
+    """ Emulate 'ipaddrcheck --is-<check> <value>' """
+    family, _, kind = check.partition('-')
+    if family not in ('ipv4', 'ipv6', 'any'):
+        raise ValueError(f'unknown ipaddrcheck option "--is-{check}"')
+    res = _ip(value)
+    if res is None:
+        return False
+    address, plen = res
+    if family != 'any' and address.version != int(family[-1]):
+        return False
+
+    if kind == '':
+        return True
+    if kind == 'single':
+        return plen is None
+    if plen is None and kind in ('cidr', 'host', 'net'):
+        return False
+    if kind == 'cidr':
+        return True
+    if kind == 'net':
+        return _is_network(address, plen)
+    if kind == 'host':
+        return (not _is_network(address, plen) or
+                plen >= address.max_prefixlen - 1)
+    if kind == 'multicast':
+        return address.is_multicast
+    raise ValueError(f'unknown ipaddrcheck option "--is-{check}"')
+
+def _ipaddrcheck_validator(checks: list, message: str):
+    def validator(value, args=[]):
+        if all(ipaddrcheck(check, value) for check in checks):
+            return 0, ''
+        return 1, f'Error: {value} is not {message}\n'
+    return validator
+
+def _exclude(validator):
+    """ Validator of the '!value' form of another validator """
+    def exclude(value, args=[]):
+        if value[:1] != '!':
+            return 1, ''
+        return validator(value[1:], args)
+    return exclude
+
+def _regex_validator(regex: str):
+    def validator(value, args=[]):
+        if match_regex(regex, value):
+            return 0, ''
+        return 1, ''
+    return validator
+
+def interface_address(value, args=[]):
+    if ipaddrcheck('ipv4-host', value) or ipaddrcheck('ipv6-host', value):
+        return 0, ''
+    return 1, ''
+
+def ipv4_range(value, args=[]):
+    error = 1, f'Error: {value} is not a valid IPv4 address range\n'
+    if '-' not in value:
+        return error
+    start, stop = value.split('-')[:2]
+    if not (ipaddrcheck('ipv4-single', start) and
+            ipaddrcheck('ipv4-single', stop)):
+        return error
+    if int(ip_address(start)) >= int(ip_address(stop)):
+        return error
+    return 0, ''
+
+def ipv6_range(value, args=[]):
+    try:
+        range_left = value.split('-')[0]
+        range_right = value.split('-')[1]
+        if not IPv6Address(range_left) < IPv6Address(range_right):
+            raise ValueError(f'left element {range_left} must be less than right element {range_right}')
+    except Exception as err:
+        return 1, f'Error: {value} is not a valid IPv6 range: {err}\n'
+    return 0, ''
+
+def ipv6_link_local(value, args=[]):
+    addr = value.split('%')[0]
+    try:
+        if ip_interface(addr).version == 6 and ip_interface(addr).is_link_local:
+            return 0, ''
+    except ValueError:
+        pass
+    return 1, ''
+
+def ipv6_eui64_prefix(value, args=[]):
+    prefix = value.split('/')
+    if len(prefix) > 1 and prefix[1] == '64':
+        return 0, ''
+    return 1, ''
+
+def ipv6_duid(value, args=[]):
+    if re.match('^([0-9A-Fa-f]{2}:){,127}([0-9A-Fa-f]{2})$', value):
+        return 0, ''
+    return 1, ''
+
+_ip_protocol = re.compile(
+    "!?\\b(all|ip|hopopt|icmp|igmp|ggp|ipencap|st|tcp|egp|igp|pup|udp|"
+    "tcp_udp|hmp|xns-idp|rdp|iso-tp4|dccp|xtp|ddp|idpr-cmtp|ipv6|"
+    "ipv6-route|ipv6-frag|idrp|rsvp|gre|esp|ah|skip|ipv6-icmp|icmpv6|"
+    "ipv6-nonxt|ipv6-opts|rspf|vmtp|eigrp|ospf|ax.25|ipip|etherip|"
+    "encap|99|pim|ipcomp|vrrp|l2tp|isis|sctp|fc|mobility-header|"
+    "udplite|mpls-in-ip|manet|hip|shim6|wesp|rohc)\\b")
+
+def ip_protocol(value, args=[]):
+    try:
+        if int(value) in range(0, 256):
+            return 0, ''
+    except ValueError:
+        pass
+    if _ip_protocol.match(value):
+        return 0, ''
+    return 1, f'Error: {value} is not a valid IP protocol\n'
+
+def base64_validator(value, args=[]):
+    try:
+        base64.b64decode(value)
+    except (ValueError, binascii.Error):
+        return 1, ''
+    return 0, ''
+
+def _is_ipv4(text):
+    try:
+        return ip_interface(text).version == 4
+    except ValueError:
+        return False
+
+def _positional(value: str) -> bool:
+    # argparse takes arguments starting with '-' for options, unless they
+    # look like negative numbers
+    return not (value.startswith('-') and
+                not re.match(r'^-\d+$|^-\d*\.\d+$', value))
+
+_community_error = 1, 'Invalid community format\n'
+
+def bgp_extended_community(value, args=[]):
+    if not _positional(value):
+        return 2, ''
+    for community in value.split():
+        if community.count(':') != 1:
+            return _community_error
+        try:
+            comm_left = community.split(':')[0]
+            comm_right = int(community.split(':')[1])
+            if _is_ipv4(comm_left) and 0 <= comm_right <= 65535:
+                continue
+            if 0 <= int(comm_left) <= 65535 and 0 <= comm_right <= 4294967295:
+                continue
+            return _community_error
+        except ValueError:
+            return _community_error
+    return 0, ''
+
+def bgp_large_community(value, args=[]):
+    if not _positional(value):
+        return 2, ''
+    if value.count(':') != 2:
+        return _community_error
+    try:
+        if all(0 <= int(part) <= 4294967295 for part in value.split(':')):
+            return 0, ''
+    except ValueError:
+        pass
+    return _community_error
+
+def bgp_large_community_list(value, args=[]):
+    parts = value.split(':')
+    if len(parts) != 3:
+        return 1, ''
+    if not (re.match('(.*):(.*):(.*)', value) and
+            (_is_ipv4(parts[0]) or parts[0].isdigit()) and
+            (parts[1].isdigit() or parts[1] == '*')):
+        return 1, ''
+    return 0, ''
+
+def bgp_regular_community(value, args=[]):
+    if not _positional(value):
+        return 2, ''
+    if value.count(':') != 1:
+        return _community_error
+    try:
+        if all(0 <= int(part) <= 65535 for part in value.split(':')):
+            return 0, ''
+    except ValueError:
+        pass
+    return _community_error
+
+def bgp_rd_rt(value, args=[]):
+    def is_valid(rt):
+        parts = rt.split(':')
+        if len(parts) != 2:
+            return False
+        return (_is_ipv4(parts[0]) or parts[0].isdigit()) and parts[1].isdigit()
+
+    option = args[0] if args else None
+    if option in ('--route-distinguisher', '--route-target'):
+        values = [value]
+    elif option == '--route-target-multi':
+        values = value.split(' ')
+    else:
+        return 1, ''
+    return (0, '') if all(is_valid(v) for v in values) else (1, '')
+
+def vrf_name(value, args=[]):
+    if len(value) not in range(1, 16) or value == 'lo':
+        return 1, ''
+    # as in the validator script, including the escaped line break
+    pattern = r'^(?!(bond|br|dum|eth|lan|eno|ens|enp|enx|gnv|ipoe|l2tp|l2tpeth|\
+       vtun|ppp|pppoe|peth|tun|vti|vxlan|wg|wlan|wwan|\d)\d*(\.\d+)?(v.+)?).*$'
+    if not re.match(pattern, value):
+        return 1, ''
+    return 0, ''
+
+_services = {}
+
+def _get_services(aliases: bool) -> list:
+    """ Service names of /etc/services, with aliases or not, read once per
+    modification of the file """
+    try:
+        mtime = os.stat(services_file).st_mtime_ns
+    except OSError:
+        mtime = None
+    cached = _services.get(aliases)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    names = []
+    try:
+        with open(services_file) as f:
+            data = f.read()
+    except OSError:
+        data = ''
+    for line in data.split('\n'):
+        if not line or line[0] == '#':
+            continue
+        tmp = line.split()
+        if not tmp:
+            continue
+        names.append(tmp[0])
+        if aliases and len(tmp) > 2:
+            names.extend(tmp[2:])
+    names = set(names)
+    _services[aliases] = (mtime, names)
+    return names
+
+def port_range(value, args=[]):
+    error = 1, f'Error: {value} is not a valid port or port range\n'
+    if re.match('^[0-9]{1,5}-[0-9]{1,5}$', value):
+        port_1, port_2 = value.split('-')
+        if int(port_1) not in range(1, 65536) or int(port_2) not in range(1, 65536):
+            return error
+        if int(port_1) > int(port_2):
+            return error
+    elif value.isnumeric() and int(value) not in range(1, 65536):
+        return error
+    elif not value.isnumeric() and value not in _get_services(False):
+        return 1, f'Error: {value} is not a valid service name\n'
+    return 0, ''
+
+def port_multi(value, args=[]):
+    for port in value.split(','):
+        if port and port[0] == '!':
+            port = port[1:]
+        if re.match('^[0-9]{1,5}-[0-9]{1,5}$', port):
+            port_1, port_2 = port.split('-')
+            if int(port_1) not in range(1, 65536) or int(port_2) not in range(1, 65536):
+                return 1, f'Error: {port} is not a valid port range\n'
+            if int(port_1) > int(port_2):
+                return 1, f'Error: {port} is not a valid port range\n'
+        elif port.isnumeric():
+            if int(port) not in range(1, 65536):
+                return 1, f'Error: {port} is not a valid port\n'
+        elif port not in _get_services(True):
+            return 1, f'Error: {port} is not a valid service name\n'
+    return 0, ''
+
+# numeric, from vyos-utils
+
+_integer = re.compile(r'-?[0-9]+\Z')
+_float = re.compile(r'-?[0-9]+(\.[0-9]+)?\Z')
+
+def _number(s: str, allow_float: bool):
+    if (_float if allow_float else _integer).match(s):
+        return float(s) if allow_float else int(s)
+    kind = 'number' if allow_float else 'integer number'
+    raise ValueError(f"'{s}' is not a valid {kind}")
+
+def _range(s: str, allow_float: bool):
+    # the lower bound may be negative: split at the first '-' after it
+    m = re.match(r'(-?[^-]+)-(-?[^-]+)\Z', s)
+    if not m:
+        raise ValueError(f"'{s}' is not a valid range")
+    lower = _number(m.group(1), allow_float)
+    upper = _number(m.group(2), allow_float)
+    if lower > upper:
+        raise ValueError(f"Upper bound is less than lower bound in '{s}'")
+    return lower, upper
+
+def numeric(value, args=[]):
+    """ Emulate the numeric validator of vyos-utils """
+    args = list(args) + [value]
+    positive = non_negative = allow_float = relative = allow_range = False
+    ranges = []
+    not_ranges = []
+    number = None
+    try:
+        i = 0
+        while i < len(args):
+            arg = args[i]
+            if arg == '--':
+                number = ' '.join(args[i + 1:])
+                break
+            elif arg == '--positive':
+                positive = True
+            elif arg == '--non-negative':
+                non_negative = True
+            elif arg == '--float':
+                allow_float = True
+            elif arg == '--relative':
+                relative = True
+            elif arg == '--allow-range':
+                allow_range = True
+            elif arg in ('--range', '--not-range'):
+                i += 1
+                if i >= len(args):
+                    raise ValueError(f'option {arg} needs an argument')
+                (ranges if arg == '--range' else not_ranges).append(args[i])
+            else:
+                number = arg
+            i += 1
+
+        if number is None:
+            raise ValueError('Missing number')
+
+        ranges = [_range(r, allow_float) for r in ranges]
+        not_ranges = [_range(r, allow_float) for r in not_ranges]
+
+        if relative and number[:1] in ('+', '-'):
+            number = number[1:]
+
+        if allow_range and re.match(r'-?[^-]+-', number):
+            numbers = list(_range(number, allow_float))
+        else:
+            numbers = [_number(number, allow_float)]
+
+        for n in numbers:
+            if non_negative and n < 0:
+                raise ValueError('Number should be non-negative.')
+            if positive and n <= 0:
+                raise ValueError('Number should be positive')
+            if ranges and not any(lo <= n <= hi for lo, hi in ranges):
+                raise ValueError(f'Number {number} is not in any of allowed ranges')
+            if any(lo <= n <= hi for lo, hi in not_ranges):
+                raise ValueError(f'Number {number} is in one of excluded ranges')
+    except ValueError as e:
+        return 1, f'{e}\n'
+    return 0, ''
+
+def numeric_exclude(value, args=[]):
+    if value[:1] == '!':
+        value = value[1:]
+    return numeric(value, args)
+
+def as_number_list(value, args=[]):
+    numbers = value.split() or ['']
+    for number in numbers:
+        code, output = numeric(number, ['--range', '1-4294967294'])
+        if code != 0:
+            return 1, output
+    return 0, ''
+
+_ipv4_address = _ipaddrcheck_validator(['ipv4-single'], 'a valid IPv4 address')
+_ipv4_prefix = _ipaddrcheck_validator(['ipv4-net'], 'a valid IPv4 prefix')
+_ipv6 = _ipaddrcheck_validator(['ipv6'], 'IPv6')
+_ipv6_address = _ipaddrcheck_validator(['ipv6-single'], 'a valid IPv6 address')
+_ipv6_prefix = _ipaddrcheck_validator(['ipv6-net'], 'a valid IPv6 prefix')
+
+# validator name -> function(value, args) returning (exit code, output)
+native_validators = {
+    'as-number-list': as_number_list,
+    'base64': base64_validator,
+    'bgp-extended-community': bgp_extended_community,
+    'bgp-large-community': bgp_large_community,
+    'bgp-large-community-list': bgp_large_community_list,
+    'bgp-rd-rt': bgp_rd_rt,
+    'bgp-regular-community': bgp_regular_community,
+    'fqdn': _regex_validator('[A-Za-z0-9][-.A-Za-z0-9]*'),
+    'interface-address': interface_address,
+    'ip-address': _ipaddrcheck_validator(['any-single'], 'a valid IP address'),
+    'ip-cidr': _ipaddrcheck_validator(['any-cidr'], 'a valid IP CIDR'),
+    'ip-host': _ipaddrcheck_validator(['any-host'], 'a valid IP host'),
+    'ip-prefix': _ipaddrcheck_validator(['any-net'], 'a valid IP prefix'),
+    'ip-protocol': ip_protocol,
+    'ipv4': _ipaddrcheck_validator(['ipv4'], 'IPv4'),
+    'ipv4-address': _ipv4_address,
+    'ipv4-address-exclude': _exclude(_ipv4_address),
+    'ipv4-host': _ipaddrcheck_validator(['ipv4-host'], 'a valid IPv4 host'),
+    'ipv4-multicast': _ipaddrcheck_validator(['ipv4-multicast', 'ipv4-single'],
+                                             'a valid IPv4 multicast address'),
+    'ipv4-prefix': _ipv4_prefix,
+    'ipv4-prefix-exclude': _exclude(_ipv4_prefix),
+    'ipv4-range': ipv4_range,
+    'ipv4-range-exclude': _exclude(ipv4_range),
+    'ipv6': _ipv6,
+    'ipv6-address': _ipv6_address,
+    'ipv6-address-exclude': _exclude(_ipv6_address),
+    'ipv6-duid': ipv6_duid,
+    'ipv6-eui64-prefix': ipv6_eui64_prefix,
+    'ipv6-exclude': _exclude(_ipv6),
+    'ipv6-host': _ipaddrcheck_validator(['ipv6-host'], 'a valid IPv6 host'),
+    'ipv6-link-local': ipv6_link_local,
+    'ipv6-multicast': _ipaddrcheck_validator(['ipv6-multicast', 'ipv6-single'],
+                                             'a valid IPv6 multicast address'),
+    'ipv6-prefix': _ipv6_prefix,
+    'ipv6-prefix-exclude': _exclude(_ipv6_prefix),
+    'ipv6-range': ipv6_range,
+    'ipv6-range-exclude': _exclude(ipv6_range),
+    'mac-address': _regex_validator('([0-9A-Fa-f]{2}:){5}([0-9A-Fa-f]{2})'),
+    'mac-address-exclude': _regex_validator('!([0-9A-Fa-f]{2}:){5}([0-9A-Fa-f]{2})'),
+    'numeric': numeric,
+    'numeric-exclude': numeric_exclude,
+    'port-multi': port_multi,
+    'port-range': port_range,
+    'vrf-name': vrf_name,
+}
+
+def run_script(name: str, value: str, argument: str = '') -> tuple:
+    """ Run a validator script, as the CLI does """
+    env = os.environ.copy()
+    env['vyos_validators_dir'] = validators_dir
+    env['vyos_libexec_dir'] = libexec_dir
+    cmd = [os.path.join(validators_dir, name)] + shlex.split(argument) + [value]
+    try:
+        p = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                           env=env)
+    except OSError as e:
+        return 1, f'{e}\n'
+    return p.returncode, p.stdout.decode(errors='replace')
+
+def run_validator(name: str, value: str, argument: str = '') -> tuple:
+    """ Return (exit code, output) of validator 'name' for a value, natively
+    if implemented, else by running the validator script """
+    func = native_validators.get(name)
+    if func is None:
+        return run_script(name, value, argument)
+    return func(value, shlex.split(argument) if argument else [])
+
+def check_constraint(value: str, constraint: dict) -> tuple:
+    """ Check a value against a constraint of the XML definitions, as
+    validate-value: the value is valid if it matches one of the regexes or
+    passes one of the validators.
+
+    Returns: (True, '') if valid, else (False, output of the validators)
+    """
+    regexes = constraint.get('regex', [])
+    validators = constraint.get('validator', [])
+    if not regexes and not validators:
+        return True, ''
+    for regex in regexes:
+        if match_regex(regex, value):
+            return True, ''
+    output = ''
+    for name, argument in validators:
+        code, out = run_validator(name, value, argument)
+        if code == 0:
+            return True, ''
+        output += out
+    return False, output
+
+def _constraint_key(constraint: dict):
+    return (tuple(constraint.get('regex', [])),
+            tuple(tuple(v) for v in constraint.get('validator', [])))
+
+def validate_paths(paths: list) -> list:
+    """ Check the tag node values and leaf node values of 'set' paths
+    against the constraints of the XML definitions. The result of a
+    constraint for a value is computed once per call, as bulk changes
+    repeat many of them.
+
+    Returns: list with, for each path, None if valid, else the error
+    message; paths not in the XML definitions are not checked here
+    """
+    from vyos.xml_ref import value_constraints
+
+    results = {}
+    res = []
+    for path in paths:
+        try:
+            checks = value_constraints(path)
+        except ValueError:
+            res.append(None)
+            continue
+
+        error = None
+        for value, constraint in checks:
+            key = (_constraint_key(constraint), value)
+            result = results.get(key)
+            if result is None:
+                result = check_constraint(value, constraint)
+                results[key] = result
+            valid, output = result
+            if not valid:
+                message = constraint.get('error', default_error)
+                error = f'{output}{message}'
+                break
+        res.append(error)
+    return res
+
+def validate_path(path: list):
+    """ Check the values of a 'set' path, see validate_paths() """
+    return validate_paths([path])[0]
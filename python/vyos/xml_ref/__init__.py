@@ -15,6 +15,7 @@
 
 from typing import Optional, Union, TYPE_CHECKING
 from vyos.xml_ref import definition
+from vyos.xml_ref import shard
 
 if TYPE_CHECKING:
     from vyos.config import ConfigDict
@@ -25,6 +26,13 @@ def load_reference(cache=[]):
 
     xml = definition.Xml()
 
+    # sharded cache: top-level nodes are read on first access
+    if shard.has_shards(shard.shard_dir):
+        reference = shard.ShardedReference(shard.shard_dir)
+        xml.define(reference, index=reference.index)
+        cache.append(xml)
+        return xml
+
     try:
         from vyos.xml_ref.cache import reference
     except Exception:
@@ -33,7 +41,13 @@ def load_reference(cache=[]):
     if not reference:
         raise ValueError('empty xml reference cache !!')
 
-    xml.define(reference)
+    try:
+        from vyos.xml_ref.cache import index
+    except ImportError:
+        # cache generated before the index was added; built on first use
+        index = None
+
+    xml.define(reference, index=index)
     cache.append(xml)
 
     return xml
@@ -53,6 +67,9 @@ def is_valueless(path: list) -> bool:
 def is_leaf(path: list) -> bool:
     return load_reference().is_leaf(path)
 
+def value_constraints(path: list) -> list:
+    return load_reference().value_constraints(path)
+
 def cli_defined(path: list, node: str, non_local=False) -> bool:
     return load_reference().cli_defined(path, node, non_local=non_local)
 
@@ -13,6 +13,7 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with this library.  If not, see <http://www.gnu.org/licenses/>.
 
+from copy import deepcopy
 from typing import Optional, Union, Any, TYPE_CHECKING
 
 # https://peps.python.org/pep-0484/#forward-references
@@ -59,12 +60,104 @@ def from_source(d: dict, path: list) -> bool:
             return False
     return d.get('_source', False)
 
+# placeholder for tag node values in index keys
+TAG_VALUE = '*'
+
+def build_index(ref: dict) -> dict:
+    """ Return a flat table of the node data of all nodes of a reference
+    tree, keyed by their space-separated path, with TAG_VALUE in place of
+    tag node values, for example 'interfaces ethernet * address'.
+    """
+    index = {}
+    def visit(d: dict, path: list):
+        for k, v in d.items():
+            if k in ('node_data', 'component_version'):
+                continue
+            if not isinstance(v, dict):
+                continue
+            p = path + [k]
+            node_data = v.get('node_data', {})
+            index[' '.join(p)] = node_data
+            if node_data.get('node_type') == 'tag':
+                p = p + [TAG_VALUE]
+            visit(v, p)
+
+    if 'node_data' in ref:
+        index[''] = ref['node_data']
+    visit(ref, [])
+
+    return index
+
 class Xml:
+    # bound on the number of memoized config paths
+    path_cache_size = 100000
+
     def __init__(self):
         self.ref = {}
+        self.index = None
+        self._path_cache = {}
+        self._defaults_cache = {}
 
-    def define(self, ref: dict):
+    def define(self, ref: dict, index: Optional[dict] = None):
         self.ref = ref
+        self.index = index
+        self._path_cache = {}
+        self._defaults_cache = {}
+
+    def _get_index(self) -> dict:
+        if self.index is None:
+            self.index = build_index(self.ref)
+        return self.index
+
+    def _lookup(self, path: list) -> tuple:
+        """ Return (index key, True if the path ends on a tag node value)
+        for a config path; memoized, as the same paths are queried over
+        and over during a commit.
+
+        Raises ValueError for paths not in the reference tree.
+        """
+        t = tuple(path)
+        res = self._path_cache.get(t)
+        if res is None:
+            res = self._make_key(path)
+            if len(self._path_cache) >= self.path_cache_size:
+                self._path_cache.clear()
+            self._path_cache[t] = res
+        if isinstance(res, ValueError):
+            raise res
+        return res
+
+    def _make_key(self, path: list) -> Union[tuple, ValueError]:
+        index = self._get_index()
+        parts = []
+        tag_value = False
+        i = 0
+        while i < len(path):
+            parts.append(path[i])
+            node_data = index.get(' '.join(parts))
+            if not node_data:
+                return ValueError("non-existent node data")
+            i += 1
+            if node_data.get('node_type') == 'tag' and i < len(path):
+                parts.append(TAG_VALUE)
+                i += 1
+                tag_value = i == len(path)
+
+        if path and parts[-1] == TAG_VALUE:
+            parts.pop()
+        key = ' '.join(parts)
+        if key not in index:
+            return ValueError("non-existent node data")
+
+        return key, tag_value
+
+    def _get_node_data(self, path: list, data: str) -> Union[bool, str]:
+        key, _ = self._lookup(path)
+        res = self.index[key]
+        if data not in res:
+            raise ValueError("non-existent data field")
+
+        return res.get(data)
 
     def _get_ref_node_data(self, node: dict, data: str) -> Union[bool, str]:
         res = node.get('node_data', {})
@@ -90,18 +183,43 @@ class Xml:
         res = self._get_ref_node_data(node, 'node_type')
         return res == 'tag'
 
-    def is_tag(self, path: list) -> bool:
-        ref_path = path.copy()
-        d = self.ref
-        while ref_path and d:
-            d = d.get(ref_path[0], {})
-            ref_path.pop(0)
-            if self._is_tag_node(d) and ref_path:
-                if len(ref_path) == 1:
-                    return False
-                ref_path.pop(0)
+    def value_constraints(self, path: list) -> list:
+        """ Return the (value, constraint) pairs of the tag node values and
+        the leaf node value of a 'set' path, for the nodes having a value
+        constraint.
 
-        return self._is_tag_node(d)
+        Raises ValueError for paths not in the reference tree.
+        """
+        index = self._get_index()
+        res = []
+        parts = []
+        i = 0
+        while i < len(path):
+            parts.append(path[i])
+            node_data = index.get(' '.join(parts))
+            if not node_data:
+                raise ValueError("non-existent node data")
+            i += 1
+            node_type = node_data.get('node_type')
+            if node_type not in ('tag', 'leaf') or i == len(path):
+                continue
+            constraint = node_data.get('constraint')
+            if constraint:
+                res.append((path[i], constraint))
+            i += 1
+            if node_type == 'leaf':
+                if i < len(path):
+                    raise ValueError("path continues after a leaf node value")
+                break
+            parts.append(TAG_VALUE)
+
+        return res
+
+    def is_tag(self, path: list) -> bool:
+        _, tag_value = self._lookup(path)
+        if tag_value:
+            return False
+        return self._get_node_data(path, 'node_type') == 'tag'
 
     def is_tag_value(self, path: list) -> bool:
         if len(path) < 2:
@@ -115,8 +233,9 @@ class Xml:
         return b
 
     def is_multi(self, path: list) -> bool:
-        d = self._get_ref_path(path)
-        return  self._is_multi_node(d)
+        b = self._get_node_data(path, 'multi')
+        assert isinstance(b, bool)
+        return b
 
     def _is_valueless_node(self, node: dict) -> bool:
         b = self._get_ref_node_data(node, 'valueless')
@@ -124,16 +243,16 @@ class Xml:
         return b
 
     def is_valueless(self, path: list) -> bool:
-        d = self._get_ref_path(path)
-        return  self._is_valueless_node(d)
+        b = self._get_node_data(path, 'valueless')
+        assert isinstance(b, bool)
+        return b
 
     def _is_leaf_node(self, node: dict) -> bool:
         res = self._get_ref_node_data(node, 'node_type')
         return res == 'leaf'
 
     def is_leaf(self, path: list) -> bool:
-        d = self._get_ref_path(path)
-        return self._is_leaf_node(d)
+        return self._get_node_data(path, 'node_type') == 'leaf'
 
     @staticmethod
     def _dict_get(d: dict, path: list) -> dict:
@@ -170,9 +289,9 @@ class Xml:
         res: Any = {}
 
         for k in list(conf):
-            d = self._get_ref_path(rpath + [k])
-            if self._is_leaf_node(d):
-                if self._is_multi_node(d) and not isinstance(conf[k], list):
+            path = rpath + [k]
+            if self.is_leaf(path):
+                if self.is_multi(path) and not isinstance(conf[k], list):
                     res[k] = [conf[k]]
                 else:
                     res[k] = conf[k]
@@ -193,11 +312,11 @@ class Xml:
         return default
 
     def default_value(self, path: list) -> Optional[Union[str, list]]:
-        d = self._get_ref_path(path)
-        default = self._get_default_value(d)
+        default = self._get_node_data(path, 'default_value')
         if default is None:
             return None
-        if self._is_multi_node(d) or self._is_tag_node(d):
+        if (self._get_node_data(path, 'multi') or
+            self._get_node_data(path, 'node_type') == 'tag'):
             return default.split()
         return default
 
@@ -213,35 +332,55 @@ class Xml:
         if self.is_tag(path):
             return res
 
-        d = self._get_ref_path(path)
-
-        if self._is_leaf_node(d):
-            default_value = self._get_default(d)
-            if default_value is not None:
-                return {path[-1]: default_value} if path else {}
+        leaf, res = self._get_defaults(path, recursive)
+        if leaf:
+            return {path[-1]: deepcopy(res)} if path else {}
 
-        for k in list(d):
-            if k in ('node_data', 'component_version') :
-                continue
-            if self._is_leaf_node(d[k]):
-                default_value = self._get_default(d[k])
-                if default_value is not None:
-                    res |= {k: default_value}
-            elif self.is_tag(path + [k]):
-                # tag node defaults are used as suggestion, not default value;
-                # should this change, append to path and continue if recursive
-                pass
-            else:
-                if recursive:
-                    pos = self.get_defaults(path + [k], recursive=True)
-                    res |= pos
         if res:
+            res = deepcopy(res)
             if get_first_key or not path:
                 return res
             return {path[-1]: res}
 
         return {}
 
+    def _get_defaults(self, path: list, recursive: bool) -> tuple:
+        # defaults below a node depend only on its schema path, so they are
+        # computed once per index key; callers must copy the result
+        memo = self._lookup(path) + (recursive,)
+        if memo in self._defaults_cache:
+            return self._defaults_cache[memo]
+
+        res: dict = {}
+        leaf = False
+        d = self._get_ref_path(path)
+
+        if self._is_leaf_node(d):
+            default_value = self._get_default(d)
+            if default_value is not None and path:
+                leaf, res = True, default_value
+
+        if not leaf:
+            for k in list(d):
+                if k in ('node_data', 'component_version') :
+                    continue
+                if self._is_leaf_node(d[k]):
+                    default_value = self._get_default(d[k])
+                    if default_value is not None:
+                        res |= {k: default_value}
+                elif self.is_tag(path + [k]):
+                    # tag node defaults are used as suggestion, not default value;
+                    # should this change, append to path and continue if recursive
+                    pass
+                else:
+                    if recursive:
+                        _, pos = self._get_defaults(path + [k], True)
+                        if pos:
+                            res |= {k: pos}
+
+        self._defaults_cache[memo] = (leaf, res)
+        return leaf, res
+
     def _well_defined(self, path: list, conf: dict) -> bool:
         # test disjoint path + conf for sensible config paths
         def step(c):
@@ -22,23 +22,27 @@ from argparse import ArgumentParser
 from argparse import ArgumentTypeError
 from os import getcwd
 from os import makedirs
+from os import walk
 from os.path import join
 from os.path import abspath
 from os.path import dirname
 from os.path import basename
 from xmltodict import parse
+from xml.etree import ElementTree
 
 _here = dirname(__file__)
 
 sys.path.append(join(_here, '..'))
 from configtree import reference_tree_to_json, ConfigTreeError
+from definition import build_index
 
 xml_cache_json = 'xml_cache.json'
 xml_tmp = join('/tmp', xml_cache_json)
 pkg_cache = abspath(join(_here, 'pkg_cache'))
 ref_cache = abspath(join(_here, 'cache.py'))
 
-node_data_fields = ("node_type", "multi", "valueless", "default_value")
+node_data_fields = ("node_type", "multi", "valueless", "default_value",
+                    "constraint")
 
 def trim_node_data(cache: dict):
     for k in list(cache):
@@ -50,6 +54,50 @@ def trim_node_data(cache: dict):
             if isinstance(cache[k], dict):
                 trim_node_data(cache[k])
 
+def _constraint(properties) -> dict:
+    """ Value constraint of a node, for vyos.validators: the regexes and
+    validators of the constraint, and the constraintErrorMessage """
+    res = {}
+    constraint = properties.find('constraint')
+    if constraint is not None:
+        regexes = [e.text.strip() for e in constraint.findall('regex')
+                   if e.text is not None]
+        validators = [[e.get('name'), e.get('argument') or '']
+                      for e in constraint.findall('validator')]
+        if regexes:
+            res['regex'] = regexes
+        if validators:
+            res['validator'] = validators
+    if res:
+        error = properties.find('constraintErrorMessage')
+        if error is not None and error.text:
+            res['error'] = error.text.strip()
+    return res
+
+def add_constraints(cache: dict, xml_dir: str):
+    """ Add the value constraints of the XML definitions to the node data
+    of the reference tree, which reference_tree_to_json does not keep """
+    def visit(elements, d):
+        for element in elements:
+            if element.tag not in ('node', 'tagNode', 'leafNode'):
+                continue
+            node = d.get(element.get('name'))
+            if not isinstance(node, dict):
+                continue
+            properties = element.find('properties')
+            if properties is not None:
+                constraint = _constraint(properties)
+                if constraint:
+                    node.setdefault('node_data', {})['constraint'] = constraint
+            children = element.find('children')
+            if children is not None:
+                visit(children, node)
+
+    for root, _, files in walk(xml_dir):
+        for name in sorted(files):
+            if name.endswith('.xml'):
+                visit(ElementTree.parse(join(root, name)).getroot(), cache)
+
 def non_trivial(s):
     if not s:
         raise ArgumentTypeError("Argument must be non empty string")
@@ -81,6 +129,7 @@ def main():
         d = json.loads(f.read())
 
     trim_node_data(d)
+    add_constraints(d, xml_dir)
 
     syntax_version = join(xml_dir, 'xml-component-version.xml')
     try:
@@ -109,10 +158,13 @@ def main():
 
     version = {"component_version": version}
 
+    index = build_index(d)
+
     d |= version
 
     with open(xml_cache, 'w') as f:
-        f.write(f'reference = {str(d)}')
+        f.write(f'reference = {str(d)}\n')
+        f.write(f'index = {str(index)}\n')
 
     print(cache_name)
 
@@ -0,0 +1,120 @@
+# Copyright 2023 VyOS maintainers and contributors <maintainers@vyos.io>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+# The xml reference cache, sharded by top-level node: one JSON file per
+# top-level node holds its reference subtree and index entries, and is
+# only read when a path below that node is first queried.
+
+import os
+import json
+from collections.abc import Mapping
+
+shard_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'cache_shards')
+manifest_file = 'manifest.json'
+
+def _shard_file(name: str) -> str:
+    return f'{name}.json'
+
+def write_shards(ref: dict, index: dict, dirname: str):
+    """ Write reference tree and index to a directory of shards """
+    os.makedirs(dirname, exist_ok=True)
+    for f in os.listdir(dirname):
+        if f.endswith('.json'):
+            os.unlink(os.path.join(dirname, f))
+
+    nodes = [k for k in ref if k not in ('node_data', 'component_version')]
+    manifest = {'nodes': nodes,
+                'component_version': ref.get('component_version', {})}
+    if 'node_data' in ref:
+        manifest['node_data'] = ref['node_data']
+
+    for name in nodes:
+        shard_index = {k: v for k, v in index.items()
+                       if k.split(' ', 1)[0] == name}
+        with open(os.path.join(dirname, _shard_file(name)), 'w') as f:
+            json.dump({'reference': ref[name], 'index': shard_index}, f,
+                      separators=(',', ':'))
+
+    # written last: a directory without manifest is not used
+    with open(os.path.join(dirname, manifest_file), 'w') as f:
+        json.dump(manifest, f, separators=(',', ':'))
+
+def has_shards(dirname: str) -> bool:
+    return os.path.isfile(os.path.join(dirname, manifest_file))
+
+class _Shards:
+    def __init__(self, dirname: str):
+        self.dirname = dirname
+        with open(os.path.join(dirname, manifest_file)) as f:
+            self.manifest = json.load(f)
+        self.nodes = self.manifest['nodes']
+        self._loaded = {}
+
+    def get(self, name: str) -> dict:
+        res = self._loaded.get(name)
+        if res is None:
+            if name not in self.nodes:
+                raise KeyError(name)
+            with open(os.path.join(self.dirname, _shard_file(name))) as f:
+                res = json.load(f)
+            self._loaded[name] = res
+        return res
+
+class ShardedReference(Mapping):
+    """ Read-only reference tree, as used by vyos.xml_ref.definition.Xml,
+    loading the subtree of each top-level node on first access
+    """
+    def __init__(self, dirname: str):
+        self._shards = _Shards(dirname)
+        self.index = ShardedIndex(self._shards)
+
+    def _keys(self) -> list:
+        keys = list(self._shards.nodes) + ['component_version']
+        if 'node_data' in self._shards.manifest:
+            keys.append('node_data')
+        return keys
+
+    def __getitem__(self, key):
+        if key in ('node_data', 'component_version'):
+            return self._shards.manifest[key]
+        return self._shards.get(key)['reference']
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+class ShardedIndex(Mapping):
+    """ Read-only index, as returned by vyos.xml_ref.definition.build_index,
+    loading the entries below each top-level node on first access
+    """
+    def __init__(self, shards: _Shards):
+        self._shards = shards
+
+    def __getitem__(self, key):
+        if key == '':
+            return self._shards.manifest['node_data']
+        return self._shards.get(key.split(' ', 1)[0])['index'][key]
+
+    def __iter__(self):
+        if 'node_data' in self._shards.manifest:
+            yield ''
+        for name in self._shards.nodes:
+            yield from self._shards.get(name)['index']
+
+    def __len__(self):
+        return sum(1 for _ in self)
@@ -19,6 +19,9 @@ import os
 from copy import deepcopy
 from generate_cache import pkg_cache
 from generate_cache import ref_cache
+from definition import build_index
+from shard import write_shards
+from shard import shard_dir
 
 def dict_merge(source, destination):
     dest = deepcopy(destination)
@@ -33,19 +36,30 @@ def dict_merge(source, destination):
 
 def main():
     res = {}
+    index = {}
     cache_dir = os.path.basename(pkg_cache)
     for mod in os.listdir(pkg_cache):
         mod = os.path.splitext(mod)[0]
         if not mod.endswith('_cache'):
             continue
-        d = getattr(__import__(f'{cache_dir}.{mod}', fromlist=[mod]), 'reference')
+        m = __import__(f'{cache_dir}.{mod}', fromlist=[mod])
+        d = getattr(m, 'reference')
+        # caches of packages built before the index was added lack it
+        i = getattr(m, 'index', None)
+        if i is None:
+            i = build_index(d)
         if mod == 'vyos_1x_cache':
             res = dict_merge(res, d)
+            index = index | i
         else:
             res = dict_merge(d, res)
+            index = i | index
 
     with open(ref_cache, 'w') as f:
-        f.write(f'reference = {str(res)}')
+        f.write(f'reference = {str(res)}\n')
+        f.write(f'index = {str(index)}\n')
+
+    write_shards(res, index, shard_dir)
 
 if __name__ == '__main__':
     main()
@@ -21,6 +21,7 @@ from sys import exit
 
 from vyos import ConfigError
 from vyos.config import Config
+from vyos.frr import clear_configuration_cache
 from vyos.utils.process import process_named_running
 from vyos.utils.process import call
 from vyos.template import render
@@ -124,8 +125,10 @@ def apply(igmp):
         if os.path.exists(config_file):
             call(f'vtysh -d pimd -f {config_file}')
             os.remove(config_file)
+            clear_configuration_cache()
     elif pim_pid:
         os.kill(int(pim_pid), SIGTERM)
+        clear_configuration_cache()
 
     return None
 
@@ -20,6 +20,7 @@ from ipaddress import IPv4Address
 from sys import exit
 
 from vyos.config import Config
+from vyos.frr import clear_configuration_cache
 from vyos import ConfigError
 from vyos.utils.process import process_named_running
 from vyos.utils.process import call
@@ -151,8 +152,10 @@ def apply(pim):
         if os.path.exists(config_file):
             call("vtysh -d pimd -f " + config_file)
             os.remove(config_file)
+            clear_configuration_cache()
     elif pim_pid:
         os.kill(int(pim_pid), SIGTERM)
+        clear_configuration_cache()
 
     return None
 
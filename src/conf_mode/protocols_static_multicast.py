@@ -21,6 +21,7 @@ from sys import exit
 
 from vyos import ConfigError
 from vyos.config import Config
+from vyos.frr import clear_configuration_cache
 from vyos.utils.process import call
 from vyos.template import render
 
@@ -106,6 +107,7 @@ def apply(mroute):
     if os.path.exists(config_file):
         call(f'vtysh -d staticd -f {config_file}')
         os.remove(config_file)
+        clear_configuration_cache()
 
     return None
 
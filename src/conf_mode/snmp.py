@@ -22,6 +22,7 @@ from vyos.base import Warning
 from vyos.config import Config
 from vyos.configdict import dict_merge
 from vyos.configverify import verify_vrf
+from vyos.frr import clear_configuration_cache
 from vyos.snmpv3_hashgen import plaintext_to_md5
 from vyos.snmpv3_hashgen import plaintext_to_sha1
 from vyos.snmpv3_hashgen import random
@@ -259,6 +260,7 @@ def apply(snmp):
         call(
             f'vtysh -c "configure terminal" -d {frr_daemon} -c "agentx" >/dev/null'
         )
+    clear_configuration_cache()
 
     return None
 
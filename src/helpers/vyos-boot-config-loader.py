@@ -25,6 +25,7 @@ from datetime import datetime
 
 from vyos.defaults import directories, config_status
 from vyos.configsession import ConfigSession, ConfigSessionError
+from vyos.configsnapshot import write_snapshot
 from vyos.configtree import ConfigTree
 from vyos.utils.process import cmd
 
@@ -60,6 +61,14 @@ def write_config_status(status):
     except Exception as e:
         print('{0}'.format(e))
 
+def write_running_snapshot():
+    # the post-commit hook does not write the JSON snapshot of the running
+    # config during the boot commit, write it once the status is known
+    try:
+        write_snapshot()
+    except Exception as e:
+        print('{0}'.format(e))
+
 def trace_to_file(trace_file_name):
     try:
         with open(trace_file_name, 'w') as trace_file:
@@ -143,10 +152,12 @@ if __name__ == '__main__':
         commit_out = session.commit()
         time_end_commit = datetime.now()
         write_config_status(0)
+        write_running_snapshot()
     except ConfigSessionError:
         # If here, there is no use doing session.discard, as we have no
         # recoverable config environment, and will only throw an error
         write_config_status(1)
+        write_running_snapshot()
         if trace_config:
             failsafe(default_file_name)
             trace_to_file(TRACE_FILE)
@@ -14,14 +14,16 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
 import json
 import os
 import time
 
 from vyos.configdict import dict_merge
 from vyos.configquery import ConfigTreeQuery
+from vyos.firewall import DomainCache
 from vyos.firewall import fqdn_config_parse
-from vyos.firewall import fqdn_resolve
+from vyos.firewall import fqdn_resolve_many
 from vyos.utils.commit import commit_in_progress
 from vyos.utils.dict import dict_search_args
 from vyos.utils.process import cmd
@@ -32,8 +34,6 @@ base = ['firewall']
 timeout = 300
 cache = False
 
-domain_state = {}
-
 ipv4_tables = {
     'ip vyos_mangle',
     'ip vyos_filter',
@@ -67,53 +67,57 @@ def get_config(conf):
 
     return firewall
 
-def resolve(domains, ipv6=False):
-    global domain_state
-
-    ip_list = set()
-
-    for domain in domains:
-        resolved = fqdn_resolve(domain, ipv6=ipv6)
-
-        if resolved and cache:
-            domain_state[domain] = resolved
-        elif not resolved:
-            if domain not in domain_state:
-                continue
-            resolved = domain_state[domain]
-
-        ip_list = ip_list | resolved
-    return ip_list
-
-def nft_output(table, set_name, ip_list):
-    output = [f'flush set {table} {set_name}']
-    if ip_list:
-        ip_str = ','.join(ip_list)
+def nft_output(table, set_name, ip_list, old_list=None):
+    """ nft commands to bring a set from old_list to ip_list, by flushing
+    and refilling it if its contents are unknown """
+    if old_list is None:
+        output = [f'flush set {table} {set_name}']
+        if ip_list:
+            ip_str = ','.join(sorted(ip_list))
+            output.append(f'add element {table} {set_name} {{ {ip_str} }}')
+        return output
+
+    output = []
+    removed = old_list - ip_list
+    added = ip_list - old_list
+    if removed:
+        ip_str = ','.join(sorted(removed))
+        output.append(f'delete element {table} {set_name} {{ {ip_str} }}')
+    if added:
+        ip_str = ','.join(sorted(added))
         output.append(f'add element {table} {set_name} {{ {ip_str} }}')
     return output
 
 def nft_valid_sets():
+    """ Return {(table, nft set name): (table handle, set handle)} of the
+    existing sets; table handles are never reused, so a set re-created with
+    its table (e.g. by "delete table" in a NAT or policy commit) gets a new
+    pair of handles """
     try:
-        valid_sets = []
-        sets_json = cmd('nft -j list sets')
-        sets_obj = json.loads(sets_json)
-
+        valid_sets = {}
+        tables_obj = json.loads(cmd('nft -j list tables'))
+        table_handles = {}
+        for obj in tables_obj['nftables']:
+            if 'table' in obj:
+                table = obj['table']
+                table_handles[(table['family'], table['name'])] = table['handle']
+
+        sets_obj = json.loads(cmd('nft -j list sets'))
         for obj in sets_obj['nftables']:
             if 'set' in obj:
                 family = obj['set']['family']
                 table = obj['set']['table']
                 name = obj['set']['name']
-                valid_sets.append((f'{family} {table}', name))
+                handle = (table_handles.get((family, table)), obj['set']['handle'])
+                valid_sets[(f'{family} {table}', name)] = handle
 
         return valid_sets
     except:
-        return []
-
-def update(firewall):
-    conf_lines = []
-    count = 0
+        return {}
 
-    valid_sets = nft_valid_sets()
+def get_sets(firewall):
+    """ Return {(table, nft set name): [(fqdn, ipv6), ...]} """
+    sets = {}
 
     domain_groups = dict_search_args(firewall, 'group', 'domain_group')
     if domain_groups:
@@ -124,40 +128,75 @@ def update(firewall):
             nft_set_name = f'D_{set_name}'
             domains = domain_config['address']
 
-            ip_list = resolve(domains, ipv6=False)
             for table in ipv4_tables:
-                if (table, nft_set_name) in valid_sets:
-                    conf_lines += nft_output(table, nft_set_name, ip_list)
-
-            ip6_list = resolve(domains, ipv6=True)
+                sets[(table, nft_set_name)] = [(domain, False) for domain in domains]
             for table in ipv6_tables:
-                if (table, nft_set_name) in valid_sets:
-                    conf_lines += nft_output(table, nft_set_name, ip6_list)
-            count += 1
+                sets[(table, nft_set_name)] = [(domain, True) for domain in domains]
 
     for set_name, domain in firewall['ip_fqdn'].items():
-        table = 'ip vyos_filter'
-        nft_set_name = f'FQDN_{set_name}'
-
-        ip_list = resolve([domain], ipv6=False)
-
-        if (table, nft_set_name) in valid_sets:
-            conf_lines += nft_output(table, nft_set_name, ip_list)
-        count += 1
+        sets[('ip vyos_filter', f'FQDN_{set_name}')] = [(domain, False)]
 
     for set_name, domain in firewall['ip6_fqdn'].items():
-        table = 'ip6 vyos_filter'
-        nft_set_name = f'FQDN_{set_name}'
-
-        ip_list = resolve([domain], ipv6=True)
-        if (table, nft_set_name) in valid_sets:
-            conf_lines += nft_output(table, nft_set_name, ip_list)
-        count += 1
-
-    nft_conf_str = "\n".join(conf_lines) + "\n"
-    code = run(f'nft -f -', input=nft_conf_str)
-
-    print(f'Updated {count} sets - result: {code}')
+        sets[('ip6 vyos_filter', f'FQDN_{set_name}')] = [(domain, True)]
+
+    return sets
+
+class Resolver:
+    """ Keeps the nftables sets of domain groups and FQDN rules up to date;
+    names are queried concurrently and only when their records expire, and
+    only the sets whose contents changed are updated, in one transaction.
+    Sets are listed on every cycle: one created or re-created since the
+    last cycle, with other handles, is flushed and filled again """
+    def __init__(self, firewall):
+        self.sets = get_sets(firewall)
+        self.keys = sorted(set(key for keys in self.sets.values() for key in keys))
+        self.cache = DomainCache(keep_stale=cache)
+        # contents and handles of the sets as last applied
+        self.applied = {}
+        self.handles = {}
+
+    def update(self):
+        start = time.monotonic()
+
+        results = asyncio.run(fqdn_resolve_many(self.keys, self.cache, timeout))
+
+        valid_sets = nft_valid_sets()
+
+        conf_lines = []
+        contents = {}
+        for nft_set, keys in self.sets.items():
+            handle = valid_sets.get(nft_set)
+            if handle is None:
+                continue
+            ip_list = frozenset().union(*(self.cache.get(key) for key in keys))
+            old_list = self.applied.get(nft_set)
+            if self.handles.get(nft_set) != handle:
+                old_list = None
+            if ip_list != old_list:
+                conf_lines += nft_output(*nft_set, ip_list, old_list)
+                contents[nft_set] = ip_list
+
+        code = 0
+        if conf_lines:
+            nft_conf_str = "\n".join(conf_lines) + "\n"
+            code = run(f'nft -f -', input=nft_conf_str)
+            if code == 0:
+                self.applied.update(contents)
+                for nft_set in contents:
+                    self.handles[nft_set] = valid_sets[nft_set]
+            else:
+                # sets were changed or replaced behind our back, refill all
+                # of them on the next cycle
+                self.applied = {}
+                self.handles = {}
+
+        latency = [res[2] for res in results]
+        failed = sum(1 for res in results if res[1] is None)
+        mean = sum(latency) / len(latency) if latency else 0
+        print(f'Resolved {len(results)} of {len(self.keys)} names ({failed} failed, '
+              f'mean {mean * 1000:.0f}ms, max {max(latency, default=0) * 1000:.0f}ms) - '
+              f'updated {len(contents)} of {len(self.sets)} sets - result: {code} - '
+              f'took {time.monotonic() - start:.2f}s')
 
 if __name__ == '__main__':
     print(f'VyOS domain resolver')
@@ -174,6 +213,7 @@ if __name__ == '__main__':
 
     print(f'interval: {timeout}s - cache: {cache}')
 
+    resolver = Resolver(firewall)
     while True:
-        update(firewall)
+        resolver.update()
         time.sleep(timeout)
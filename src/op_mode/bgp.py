@@ -81,32 +81,32 @@ ArgFamily = typing.Literal['inet', 'inet6', 'l2vpn']
 ArgFamilyModifier = typing.Literal['unicast', 'labeled_unicast', 'multicast', 'vpn', 'flowspec']
 
 def show_summary(raw: bool):
-    from vyos.utils.process import cmd
+    from vyos.frr import show as frr_show
 
     if raw:
         from json import loads
 
-        output = cmd(f"vtysh -c 'show bgp summary json'").strip()
+        output = frr_show('show bgp summary json', 'bgpd')
 
         # FRR 8.5 correctly returns an empty object when BGP is not running,
         # we don't need to do anything special here
         return loads(output)
     else:
-        output = cmd(f"vtysh -c 'show bgp summary'")
+        output = frr_show('show bgp summary', 'bgpd')
         return output
 
 def show_neighbors(raw: bool):
-    from vyos.utils.process import cmd
+    from vyos.frr import show as frr_show
     from vyos.utils.dict import dict_to_list
 
     if raw:
         from json import loads
 
-        output = cmd(f"vtysh -c 'show bgp neighbors json'").strip()
+        output = frr_show('show bgp neighbors json', 'bgpd')
         d = loads(output)
         return dict_to_list(d, save_key_to="neighbor")
     else:
-        output = cmd(f"vtysh -c 'show bgp neighbors'")
+        output = frr_show('show bgp neighbors', 'bgpd')
         return output
 
 def show(raw: bool,
@@ -129,8 +129,8 @@ def show(raw: bool,
         frr_command = frr_command_template.render(kwargs)
         frr_command = re.sub(r'\s+', ' ', frr_command)
 
-        from vyos.utils.process import cmd
-        output = cmd(f"vtysh -c '{frr_command}'")
+        from vyos.frr import show as frr_show
+        output = frr_show(frr_command.strip(), 'bgpd')
 
         if raw:
             from json import loads
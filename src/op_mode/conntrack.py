@@ -16,41 +16,36 @@
 
 import sys
 import typing
-import xmltodict
 
 from tabulate import tabulate
+from vyos.conntrack import dump_flows
+from vyos.conntrack import summarize
 from vyos.utils.process import cmd
 from vyos.utils.process import run
 
 import vyos.opmode
 
 ArgFamily = typing.Literal['inet', 'inet6']
+ArgNat = typing.Literal['source', 'destination']
 
-def _get_xml_data(family):
+def _get_flows(family, zone=None, source_address=None,
+               destination_address=None, protocol=None, nat=None,
+               limit=None):
     """
-    Get conntrack XML output
+    Stream conntrack entries, filtered by conntrack
+    Return: generator of flow dictionaries
     """
-    return cmd(f'sudo conntrack --dump --family {family} --output xml')
+    return dump_flows(family=family, zone=zone, source=source_address,
+                      destination=destination_address, protocol=protocol,
+                      nat=nat, limit=limit, sudo=True)
 
 
-def _xml_to_dict(xml):
+def _get_raw_data(flows):
     """
-    Convert XML to dictionary
     Return: dictionary
     """
-    parse = xmltodict.parse(xml, attr_prefix='')
-    # If only one conntrack entry we must change dict
-    if 'meta' in parse['conntrack']['flow']:
-        return dict(conntrack={'flow': [parse['conntrack']['flow']]})
-    return parse
-
-
-def _get_raw_data(family):
-    """
-    Return: dictionary
-    """
-    xml = _get_xml_data(family)
-    if len(xml) == 0:
+    flows = list(flows)
+    if not flows:
         output = {'conntrack':
             {
                 'error': True,
@@ -58,7 +53,7 @@ def _get_raw_data(family):
             }
         }
         return output
-    return _xml_to_dict(xml)
+    return {'conntrack': {'flow': flows}}
 
 
 def _get_raw_statistics():
@@ -76,15 +71,13 @@ def get_formatted_statistics(entries):
     return output
 
 
-def get_formatted_output(dict_data):
+def get_formatted_output(flows):
     """
-    :param xml:
+    :param flows: iterable of flow dictionaries
     :return: formatted output
     """
     data_entries = []
-    if 'error' in dict_data['conntrack']:
-        return 'Entries not found'
-    for entry in dict_data['conntrack']['flow']:
+    for entry in flows:
         orig_src, orig_dst, orig_sport, orig_dport = {}, {}, {}, {}
         reply_src, reply_dst, reply_sport, reply_dport = {}, {}, {}, {}
         proto = {}
@@ -122,19 +115,55 @@ def get_formatted_output(dict_data):
                 zone = meta['zone'] if 'zone' in meta else ''
                 data_entries.append(
                     [conn_id, orig_src, orig_dst, reply_src, reply_dst, proto, state, timeout, mark, zone])
+    if not data_entries:
+        return 'Entries not found'
     headers = ["Id", "Original src", "Original dst", "Reply src", "Reply dst", "Protocol", "State", "Timeout", "Mark",
                "Zone"]
     output = tabulate(data_entries, headers, numalign="left")
     return output
 
 
-def show(raw: bool, family: ArgFamily):
+def get_formatted_summary(summary):
+    output = f"Total entries: {summary['total']}"
+    for key, header in [('state', 'State'), ('protocol', 'Protocol')]:
+        entries = list(summary[key].items())
+        output += '\n\n' + tabulate(entries, [header, 'Entries'], numalign="left")
+    entries = [[t['address'], t['flows']] for t in summary['top_talkers']]
+    output += '\n\n' + tabulate(entries, ['Top source', 'Entries'], numalign="left")
+    return output
+
+
+def show(raw: bool, family: ArgFamily,
+         zone: typing.Optional[int],
+         source_address: typing.Optional[str],
+         destination_address: typing.Optional[str],
+         protocol: typing.Optional[str],
+         nat: typing.Optional[ArgNat],
+         limit: typing.Optional[int]):
+    family = 'ipv6' if family == 'inet6' else 'ipv4'
+    flows = _get_flows(family, zone, source_address, destination_address,
+                       protocol, nat, limit)
+    if raw:
+        return _get_raw_data(flows)
+    else:
+        return get_formatted_output(flows)
+
+
+def show_summary(raw: bool, family: ArgFamily,
+                 zone: typing.Optional[int],
+                 source_address: typing.Optional[str],
+                 destination_address: typing.Optional[str],
+                 protocol: typing.Optional[str],
+                 nat: typing.Optional[ArgNat],
+                 top: typing.Optional[int]):
     family = 'ipv6' if family == 'inet6' else 'ipv4'
-    conntrack_data = _get_raw_data(family)
+    flows = _get_flows(family, zone, source_address, destination_address,
+                       protocol, nat)
+    summary = summarize(flows, top=top or 10)
     if raw:
-        return conntrack_data
+        return summary
     else:
-        return get_formatted_output(conntrack_data)
+        return get_formatted_summary(summary)
 
 
 def show_statistics(raw: bool):
@@ -21,13 +21,13 @@ import typing
 from datetime import datetime
 from glob import glob
 from ipaddress import ip_address
-from isc_dhcp_leases import IscDhcpLeases
 from tabulate import tabulate
 
 import vyos.opmode
 
 from vyos.base import Warning
 from vyos.configquery import ConfigTreeQuery
+from vyos.dhcp_leases import LeaseStore
 
 from vyos.utils.dict import dict_search
 from vyos.utils.file import read_file
@@ -36,7 +36,6 @@ from vyos.utils.process import is_systemd_service_running
 
 time_string = "%a %b %d %H:%M:%S %Z %Y"
 
-config = ConfigTreeQuery()
 lease_valid_states = ['all', 'active', 'free', 'expired', 'released', 'abandoned', 'reset', 'backup']
 sort_valid_inet = ['end', 'mac', 'hostname', 'ip', 'pool', 'remaining', 'start', 'state']
 sort_valid_inet6 = ['end', 'iaid_duid', 'ip', 'last_communication', 'pool', 'remaining', 'state', 'type']
@@ -44,6 +43,9 @@ sort_valid_inet6 = ['end', 'iaid_duid', 'ip', 'last_communication', 'pool', 'rem
 ArgFamily = typing.Literal['inet', 'inet6']
 ArgState = typing.Literal['all', 'active', 'free', 'expired', 'released', 'abandoned', 'reset', 'backup']
 
+# LeaseStore per address family
+_lease_stores = {}
+
 def _utc_to_local(utc_dt):
     return datetime.fromtimestamp((datetime.fromtimestamp(utc_dt) - datetime(1970, 1, 1)).total_seconds())
 
@@ -59,16 +61,18 @@ def _format_hex_string(in_str):
     return out_str
 
 
-def _find_list_of_dict_index(lst, key='ip', value='') -> int:
+def _get_lease_store(family='inet') -> LeaseStore:
     """
-    Find the index entry of list of dict matching the dict value
-    Exampe:
-        % lst = [{'ip': '192.0.2.1'}, {'ip': '192.0.2.2'}]
-        % _find_list_of_dict_index(lst, key='ip', value='192.0.2.2')
-        % 1
+    Get the current DHCP server leases; only lease changes appended to the
+    leases file since the last call, or since the lease cache of the user
+    was written, are parsed
     """
-    idx = next((index for (index, d) in enumerate(lst) if d[key] == value), None)
-    return idx
+    if family not in _lease_stores:
+        v = 'v6' if family == 'inet6' else ''
+        lease_file = f'/config/dhcpd{v}.leases'
+        cache_file = f'/tmp/vyos-dhcpd{v}-leases-{os.getuid()}.cache'
+        _lease_stores[family] = LeaseStore(lease_file, cache_file)
+    return _lease_stores[family].update()
 
 
 def _get_raw_server_leases(family='inet', pool=None, sorted=None, state=[]) -> list:
@@ -76,57 +80,50 @@ def _get_raw_server_leases(family='inet', pool=None, sorted=None, state=[]) -> l
     Get DHCP server leases
     :return list
     """
-    lease_file = '/config/dhcpdv6.leases' if family == 'inet6' else '/config/dhcpd.leases'
     data = []
-    leases = IscDhcpLeases(lease_file).get()
+    store = _get_lease_store(family)
 
     if pool is None:
         pool = _get_dhcp_pools(family=family)
     else:
         pool = [pool]
 
-    for lease in leases:
+    now = datetime.utcnow()
+    for lease in store.leases(pools=pool):
+        # Do not add old leases
+        if lease['state'] == 'free':
+            continue
+        if state and lease['state'] not in state:
+            continue
+
         data_lease = {}
-        data_lease['ip'] = lease.ip
-        data_lease['state'] = lease.binding_state
-        data_lease['pool'] = lease.sets.get('shared-networkname', '')
-        data_lease['end'] = lease.end.timestamp() if lease.end else None
+        data_lease['ip'] = lease['ip']
+        data_lease['state'] = lease['state']
+        data_lease['pool'] = lease['pool']
+        data_lease['end'] = lease['end']
 
         if family == 'inet':
-            data_lease['mac'] = lease.ethernet
-            data_lease['start'] = lease.start.timestamp()
-            data_lease['hostname'] = lease.hostname
+            data_lease['mac'] = lease['mac']
+            data_lease['start'] = lease['start']
+            data_lease['hostname'] = lease['hostname']
 
         if family == 'inet6':
-            data_lease['last_communication'] = lease.last_communication.timestamp()
-            data_lease['iaid_duid'] = _format_hex_string(lease.host_identifier_string)
+            data_lease['last_communication'] = lease['last_communication']
+            data_lease['iaid_duid'] = _format_hex_string(lease['host_identifier'])
             lease_types_long = {'na': 'non-temporary', 'ta': 'temporary', 'pd': 'prefix delegation'}
-            data_lease['type'] = lease_types_long[lease.type]
+            data_lease['type'] = lease_types_long[lease['type']]
 
         data_lease['remaining'] = '-'
 
-        if lease.end:
-            data_lease['remaining'] = lease.end - datetime.utcnow()
+        if lease['end']:
+            remaining = datetime.utcfromtimestamp(lease['end']) - now
 
-            if data_lease['remaining'].days >= 0:
+            if remaining.days >= 0:
                 # substraction gives us a timedelta object which can't be formatted with strftime
                 # so we use str(), split gets rid of the microseconds
-                data_lease['remaining'] = str(data_lease["remaining"]).split('.')[0]
+                data_lease['remaining'] = str(remaining).split('.')[0]
 
-        # Do not add old leases
-        if data_lease['remaining'] != '' and data_lease['pool'] in pool and data_lease['state'] != 'free':
-            if not state or data_lease['state'] in state:
-                data.append(data_lease)
-
-        # deduplicate
-        checked = []
-        for entry in data:
-            addr = entry.get('ip')
-            if addr not in checked:
-                checked.append(addr)
-            else:
-                idx = _find_list_of_dict_index(data, key='ip', value=addr)
-                data.pop(idx)
+        data.append(data_lease)
 
     if sorted:
         if sorted == 'ip':
@@ -176,13 +173,15 @@ def _get_formatted_server_leases(raw_data, family='inet'):
     return output
 
 
-def _get_dhcp_pools(family='inet') -> list:
+def _get_dhcp_pools(family='inet', config=None) -> list:
+    if config is None:
+        config = ConfigTreeQuery()
     v = 'v6' if family == 'inet6' else ''
     pools = config.list_nodes(f'service dhcp{v}-server shared-network-name')
     return pools
 
 
-def _get_pool_size(pool, family='inet'):
+def _get_pool_size(config, pool, family='inet'):
     v = 'v6' if family == 'inet6' else ''
     base = f'service dhcp{v}-server shared-network-name {pool}'
     size = 0
@@ -205,17 +204,19 @@ def _get_pool_size(pool, family='inet'):
 
 
 def _get_raw_pool_statistics(family='inet', pool=None):
+    config = ConfigTreeQuery()
     if pool is None:
-        pool = _get_dhcp_pools(family=family)
+        pool = _get_dhcp_pools(family=family, config=config)
     else:
         pool = [pool]
 
     v = 'v6' if family == 'inet6' else ''
     stats = []
+    store = _get_lease_store(family)
     for p in pool:
         subnet = config.list_nodes(f'service dhcp{v}-server shared-network-name {p} subnet')
-        size = _get_pool_size(family=family, pool=p)
-        leases = len(_get_raw_server_leases(family=family, pool=p))
+        size = _get_pool_size(config, family=family, pool=p)
+        leases = store.count(p, exclude_states=['free'])
         use_percentage = round(leases / size * 100) if size != 0 else 0
         pool_stats = {'pool': p, 'size': size, 'leases': leases,
                       'available': (size - leases), 'use_percentage': use_percentage, 'subnet': subnet}
@@ -20,6 +20,7 @@ import re
 import sys
 import glob
 import json
+import time
 import typing
 from datetime import datetime
 from tabulate import tabulate
@@ -27,7 +28,12 @@ from tabulate import tabulate
 import vyos.opmode
 from vyos.ifconfig import Section
 from vyos.ifconfig import Interface
+from vyos.ifconfig import Operational
 from vyos.ifconfig import VRRP
+from vyos.ifconfig.operational import load_counters_index
+from vyos.ifconfig.operational import save_counters_index
+from vyos.ifconfig.sampler import CounterSampler
+from vyos.netlink import rtnl
 from vyos.utils.process import cmd
 from vyos.utils.process import rc_cmd
 from vyos.utils.process import call
@@ -41,6 +47,38 @@ def catch_broken_pipe(func):
             os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
     return wrapped
 
+def filtered_ifnames(ifnames: typing.Union[str, list],
+                     iftypes: typing.Union[str, list],
+                     vif: bool, vrrp: bool, names: list=None) -> list:
+    """
+    get the names of all interfaces from the OS, or of the given names,
+    and filter them as filtered_interfaces() does
+    """
+    if isinstance(ifnames, str):
+        ifnames = [ifnames] if ifnames else []
+    if isinstance(iftypes, list):
+        res = []
+        for iftype in iftypes:
+            res.extend(filtered_ifnames(ifnames, iftype, vif, vrrp, names))
+        return res
+
+    vrrp_interfaces = VRRP.active_interfaces() if vrrp else []
+    res = []
+    for ifname in Section.interfaces(iftypes, names=names):
+        # Bail out early if interface name not part of our search list
+        if ifnames and ifname not in ifnames:
+            continue
+
+        # VLAN interfaces have a '.' in their name by convention
+        if vif and not '.' in ifname:
+            continue
+
+        if vrrp and ifname not in vrrp_interfaces:
+            continue
+
+        res.append(ifname)
+    return res
+
 # The original implementation of filtered_interfaces has signature:
 # (ifnames: list, iftypes: typing.Union[str, list], vif: bool, vrrp: bool) -> intf: Interface:
 # Arg types allowed in CLI (ifnames: str, iftypes: str) were manually
@@ -58,31 +96,23 @@ def filtered_interfaces(ifnames: typing.Union[str, list],
 
     return an instance of the Interface class
     """
-    if isinstance(ifnames, str):
-        ifnames = [ifnames] if ifnames else []
-    if isinstance(iftypes, list):
-        for iftype in iftypes:
-            yield from filtered_interfaces(ifnames, iftype, vif, vrrp)
-
-    for ifname in Section.interfaces(iftypes):
-        # Bail out early if interface name not part of our search list
-        if ifnames and ifname not in ifnames:
-            continue
-
+    for ifname in filtered_ifnames(ifnames, iftypes, vif, vrrp):
         # As we are only "reading" from the interface - we must use the
         # generic base class which exposes all the data via a common API
-        interface = Interface(ifname, create=False, debug=False)
-
-        # VLAN interfaces have a '.' in their name by convention
-        if vif and not '.' in ifname:
-            continue
-
-        if vrrp:
-            vrrp_interfaces = VRRP.active_interfaces()
-            if ifname not in vrrp_interfaces:
-                continue
+        yield Interface(ifname, create=False, debug=False)
 
-        yield interface
+def filtered_links(ifnames: typing.Union[str, list],
+                   iftypes: typing.Union[str, list],
+                   vif: bool, vrrp: bool, addresses: bool=True) -> list:
+    """
+    get the links of the filtered interfaces, as returned by
+    vyos.netlink.RtNetlink.dump_links() with their counters, from a single
+    dump of all links instead of querying each interface
+    """
+    links = {link['ifname']: link for link in
+             rtnl().dump_links(addresses=addresses, stats=True)}
+    return [links[ifname] for ifname in
+            filtered_ifnames(ifnames, iftypes, vif, vrrp, list(links))]
 
 def _split_text(text, used=0):
     """
@@ -186,34 +216,30 @@ def _get_raw_data(ifname: typing.Optional[str],
     if iftype is None:
         iftype = ''
     ret =[]
-    for interface in filtered_interfaces(ifname, iftype, vif, vrrp):
-        res_intf = {}
-        cache = interface.operational.load_counters()
-
-        out = cmd(f'ip -json addr show {interface.ifname}')
-        res_intf_l = json.loads(out)
-        res_intf = res_intf_l[0]
+    index = load_counters_index()
+    tunnel = None
+    for link in filtered_links(ifname, iftype, vif, vrrp):
+        res_intf = dict(link)
+        stats = res_intf.pop('stats')
+        cache = Operational.cached_counters(index, link['ifname'])
 
         if res_intf['link_type'] == 'tunnel6':
             # Note that 'ip -6 tun show {interface.ifname}' is not json
             # aware, so find in list
-            out = cmd('ip -json -6 tun show')
-            tunnel = json.loads(out)
-            res_intf['tunnel6'] = _find_intf_by_ifname(tunnel,
-                                                       interface.ifname)
+            if tunnel is None:
+                tunnel = json.loads(cmd('ip -json -6 tun show'))
+            res_intf['tunnel6'] = dict(_find_intf_by_ifname(tunnel,
+                                                            link['ifname']))
             if 'ip6_tnl_f_use_orig_tclass' in res_intf['tunnel6']:
                 res_intf['tunnel6']['tclass'] = 'inherit'
                 del res_intf['tunnel6']['ip6_tnl_f_use_orig_tclass']
 
         res_intf['counters_last_clear'] = int(cache.get('timestamp', 0))
 
-        res_intf['description'] = interface.get_alias()
+        res_intf['description'] = link.get('ifalias') or ''
 
-        stats = interface.operational.get_stats()
-        for k in list(stats):
-            stats[k] = _get_counter_val(cache[k], stats[k])
-
-        res_intf['stats'] = stats
+        res_intf['stats'] = {k: _get_counter_val(cache[k], stats[k])
+                             for k in Operational._stats_all}
 
         ret.append(res_intf)
 
@@ -235,14 +261,18 @@ def _get_summary_data(ifname: typing.Optional[str],
     if iftype is None:
         iftype = ''
     ret = []
-    for interface in filtered_interfaces(ifname, iftype, vif, vrrp):
+    for link in filtered_links(ifname, iftype, vif, vrrp):
         res_intf = {}
 
-        res_intf['ifname'] = interface.ifname
-        res_intf['oper_state'] = interface.operational.get_state()
-        res_intf['admin_state'] = interface.get_admin_state()
-        res_intf['addr'] = [_ for _ in interface.get_addr() if not _.startswith('fe80::')]
-        res_intf['description'] = interface.get_alias()
+        # IPv4 addresses first, as Interface.get_addr()
+        addr_info = sorted(link['addr_info'], key=lambda a: a['family'] != 'inet')
+
+        res_intf['ifname'] = link['ifname']
+        res_intf['oper_state'] = link['operstate'].lower()
+        res_intf['admin_state'] = 'up' if 'UP' in link['flags'] else 'down'
+        res_intf['addr'] = [f"{a['local']}/{a['prefixlen']}" for a in addr_info
+                            if not a['local'].startswith('fe80::')]
+        res_intf['description'] = link.get('ifalias') or ''
 
         ret.append(res_intf)
 
@@ -264,40 +294,105 @@ def _get_counter_data(ifname: typing.Optional[str],
     if iftype is None:
         iftype = ''
     ret = []
-    for interface in filtered_interfaces(ifname, iftype, vif, vrrp):
+    index = load_counters_index()
+    for link in filtered_links(ifname, iftype, vif, vrrp, addresses=False):
         res_intf = {}
 
-        oper = interface.operational.get_state()
+        oper = link['operstate'].lower()
 
         if oper not in ('up','unknown'):
             continue
 
-        stats = interface.operational.get_stats()
-        cache = interface.operational.load_counters()
-        res_intf['ifname'] = interface.ifname
-        res_intf['rx_packets'] = _get_counter_val(cache['rx_packets'], stats['rx_packets'])
-        res_intf['rx_bytes'] = _get_counter_val(cache['rx_bytes'], stats['rx_bytes'])
-        res_intf['tx_packets'] = _get_counter_val(cache['tx_packets'], stats['tx_packets'])
-        res_intf['tx_bytes'] = _get_counter_val(cache['tx_bytes'], stats['tx_bytes'])
-        res_intf['rx_dropped'] = _get_counter_val(cache['rx_dropped'], stats['rx_dropped'])
-        res_intf['tx_dropped'] = _get_counter_val(cache['tx_dropped'], stats['tx_dropped'])
-        res_intf['rx_over_errors'] = _get_counter_val(cache['rx_over_errors'], stats['rx_over_errors'])
-        res_intf['tx_carrier_errors'] = _get_counter_val(cache['tx_carrier_errors'], stats['tx_carrier_errors'])
+        stats = link['stats']
+        cache = Operational.cached_counters(index, link['ifname'])
+        res_intf['ifname'] = link['ifname']
+        for counter in ('rx_packets', 'rx_bytes', 'tx_packets', 'tx_bytes',
+                        'rx_dropped', 'tx_dropped', 'rx_over_errors',
+                        'tx_carrier_errors'):
+            res_intf[counter] = _get_counter_val(cache[counter], stats[counter])
+
+        ret.append(res_intf)
+
+    return ret
 
+def _get_rate_data(ifname: typing.Optional[str],
+                   iftype: typing.Optional[str],
+                   vif: bool, vrrp: bool,
+                   interval: int, count: int) -> list:
+    if ifname is None:
+        ifname = ''
+    if iftype is None:
+        iftype = ''
+    if interval < 1 or count < 1:
+        raise ValueError('Interval and count must be positive')
+
+    ifnames = filtered_ifnames(ifname, iftype, vif, vrrp)
+    sampler = CounterSampler(interval=interval, size=count + 1)
+    for n in range(count + 1):
+        if n:
+            time.sleep(interval)
+        sampler.sample()
+
+    rates = sampler.rates(ifnames, window=count)
+    percentiles = {}
+    if count > 1:
+        percentiles = sampler.percentiles(ifnames, counters=('rx_bytes', 'tx_bytes'))
+    ret = []
+    for name in ifnames:
+        if name not in rates:
+            continue
+        rate = rates[name]
+        res_intf = {
+            'ifname': name,
+            'rx_bps': int(rate['rx_bytes'] * 8),
+            'tx_bps': int(rate['tx_bytes'] * 8),
+            'rx_pps': int(rate['rx_packets']),
+            'tx_pps': int(rate['tx_packets']),
+            'rx_dropped': int(rate['rx_dropped']),
+            'tx_dropped': int(rate['tx_dropped']),
+            'rx_errors': int(rate['rx_errors']),
+            'tx_errors': int(rate['tx_errors']),
+        }
+        if name in percentiles:
+            # rates of the single intervals, in bits per second
+            for direction in ('rx', 'tx'):
+                for p, value in percentiles[name][f'{direction}_bytes'].items():
+                    res_intf[f'{direction}_bps_p{p}'] = int(value * 8)
         ret.append(res_intf)
 
     return ret
 
+def _ip_addr_show(ifnames: list) -> dict:
+    """
+    return the output of 'ip addr show' for each interface, from a single
+    run of ip for all of them
+    """
+    if len(ifnames) == 1:
+        rc, out = rc_cmd(f'ip addr show {ifnames[0]}')
+    else:
+        rc, out = rc_cmd('ip addr show')
+    if rc != 0:
+        return {}
+
+    res = {}
+    for block in re.split(r'^(?=\d+:\s)', out, flags=re.M):
+        name = re.match(r'\d+:\s+([^:@\s]+)', block)
+        if name:
+            res[name.group(1)] = block.strip()
+    return res
+
 @catch_broken_pipe
 def _format_show_data(data: list):
     unhandled = []
+    # instead of reformatting data, use non-json output:
+    ip_output = _ip_addr_show([intf['ifname'] for intf in data
+                               if 'unhandled' not in intf])
     for intf in data:
         if 'unhandled' in intf:
             unhandled.append(intf)
             continue
-        # instead of reformatting data, call non-json output:
-        rc, out = rc_cmd(f"ip addr show {intf['ifname']}")
-        if rc != 0:
+        out = ip_output.get(intf['ifname'])
+        if out is None:
             continue
         out = re.sub('^\d+:\s+','',out)
         # add additional data already collected
@@ -392,6 +487,20 @@ def _format_show_counters(data: list):
     print (output)
     return output
 
+@catch_broken_pipe
+def _format_show_rates(data: list):
+    data_entries = []
+    for entry in data:
+        data_entries.append([entry['ifname'], entry['rx_bps'], entry['tx_bps'],
+                             entry['rx_pps'], entry['tx_pps'],
+                             entry['rx_dropped'], entry['tx_dropped'],
+                             entry['rx_errors'], entry['tx_errors']])
+
+    headers = ['Interface', 'Rx bps', 'Tx bps', 'Rx pps', 'Tx pps', 'Rx Dropped/s', 'Tx Dropped/s', 'Rx Errors/s', 'Tx Errors/s']
+    output = tabulate(data_entries, headers, numalign="left")
+    print (output)
+    return output
+
 def show(raw: bool, intf_name: typing.Optional[str],
                     intf_type: typing.Optional[str],
                     vif: bool, vrrp: bool):
@@ -416,17 +525,35 @@ def show_counters(raw: bool, intf_name: typing.Optional[str],
         return data
     return _format_show_counters(data)
 
+def show_rates(raw: bool, intf_name: typing.Optional[str],
+                          intf_type: typing.Optional[str],
+                          vif: bool, vrrp: bool,
+                          interval: typing.Optional[int],
+                          count: typing.Optional[int]):
+    """ Show the per second rates of the interface counters, sampled every
+    interval seconds for count intervals; with more than one interval, the
+    percentiles of the receive and transmit rates are included """
+    data = _get_rate_data(intf_name, intf_type, vif, vrrp,
+                          interval or 1, count or 1)
+    if raw:
+        return data
+    return _format_show_rates(data)
+
 def clear_counters(intf_name: typing.Optional[str],
                    intf_type: typing.Optional[str],
                    vif: bool, vrrp: bool):
-    for interface in filtered_interfaces(intf_name, intf_type, vif, vrrp):
-        interface.operational.clear_counters()
+    index = load_counters_index()
+    for link in filtered_links(intf_name, intf_type, vif, vrrp, addresses=False):
+        index[link['ifname']] = Operational.counters_entry(link['stats'])
+    save_counters_index(index)
 
 def reset_counters(intf_name: typing.Optional[str],
                    intf_type: typing.Optional[str],
                    vif: bool, vrrp: bool):
-    for interface in filtered_interfaces(intf_name, intf_type, vif, vrrp):
-        interface.operational.reset_counters()
+    index = load_counters_index()
+    for ifname in filtered_ifnames(intf_name, intf_type, vif, vrrp):
+        index.pop(ifname, None)
+    save_counters_index(index)
 
 if __name__ == '__main__':
     try:
@@ -17,7 +17,6 @@
 import jmespath
 import json
 import sys
-import xmltodict
 import typing
 
 from tabulate import tabulate
@@ -25,6 +24,7 @@ from tabulate import tabulate
 import vyos.opmode
 
 from vyos.configquery import ConfigTreeQuery
+from vyos.conntrack import dump_flows
 from vyos.utils.process import cmd
 from vyos.utils.dict import dict_search
 
@@ -34,30 +34,12 @@ unconf_message = 'NAT is not configured'
 ArgDirection = typing.Literal['source', 'destination']
 ArgFamily = typing.Literal['inet', 'inet6']
 
-def _get_xml_translation(direction, family, address=None):
+def _get_translation_flows(direction, family, address=None, limit=None):
     """
-    Get conntrack XML output --src-nat|--dst-nat
+    Stream conntrack entries translated by source or destination NAT
     """
-    if direction == 'source':
-        opt = '--src-nat'
-    if direction == 'destination':
-        opt = '--dst-nat'
-    tmp = f'conntrack --dump --family {family} {opt} --output xml'
-    if address:
-        tmp += f' --src {address}'
-    return cmd(tmp)
-
-
-def _xml_to_dict(xml):
-    """
-    Convert XML to dictionary
-    Return: dictionary
-    """
-    parse = xmltodict.parse(xml, attr_prefix='')
-    # If only one conntrack entry we must change dict
-    if 'meta' in parse['conntrack']['flow']:
-        return dict(conntrack={'flow': [parse['conntrack']['flow']]})
-    return parse
+    return dump_flows(family=family, nat=direction, source=address,
+                      limit=limit)
 
 
 def _get_json_data(direction, family):
@@ -85,12 +67,12 @@ def _get_raw_data_rules(direction, family):
     return rules
 
 
-def _get_raw_translation(direction, family, address=None):
+def _get_raw_translation(flows):
     """
     Return: dictionary
     """
-    xml = _get_xml_translation(direction, family, address)
-    if len(xml) == 0:
+    flows = list(flows)
+    if not flows:
         output = {'conntrack':
             {
                 'error': True,
@@ -98,7 +80,7 @@ def _get_raw_translation(direction, family, address=None):
             }
         }
         return output
-    return _xml_to_dict(xml)
+    return {'conntrack': {'flow': flows}}
 
 
 def _get_formatted_output_rules(data, direction, family):
@@ -234,11 +216,9 @@ def _get_formatted_output_statistics(data, direction):
     return output
 
 
-def _get_formatted_translation(dict_data, nat_direction, family, verbose):
+def _get_formatted_translation(flows, nat_direction, family, verbose):
     data_entries = []
-    if 'error' in dict_data['conntrack']:
-        return 'Entries not found'
-    for entry in dict_data['conntrack']['flow']:
+    for entry in flows:
         orig_src, orig_dst, orig_sport, orig_dport = {}, {}, {}, {}
         reply_src, reply_dst, reply_sport, reply_dport = {}, {}, {}, {}
         proto = {}
@@ -281,6 +261,8 @@ def _get_formatted_translation(dict_data, nat_direction, family, verbose):
                     tmp = [orig_dst, reply_src, proto, timeout, mark, zone]
                     data_entries.append(tmp)
 
+    if not data_entries:
+        return 'Entries not found'
     headers = ["Pre-NAT", "Post-NAT", "Proto", "Timeout", "Mark", "Zone"]
     output = tabulate(data_entries, headers, numalign="left")
     return output
@@ -321,17 +303,16 @@ def show_statistics(raw: bool, direction: ArgDirection, family: ArgFamily):
 def show_translations(raw: bool, direction: ArgDirection,
                       family: ArgFamily,
                       address: typing.Optional[str],
-                      verbose: typing.Optional[bool]):
+                      verbose: typing.Optional[bool],
+                      limit: typing.Optional[int]):
     family = 'ipv6' if family == 'inet6' else 'ipv4'
-    nat_translation = _get_raw_translation(direction,
-                                           family=family,
-                                           address=address)
+    flows = _get_translation_flows(direction, family=family, address=address,
+                                   limit=limit)
 
     if raw:
-        return nat_translation
+        return _get_raw_translation(flows)
     else:
-        return _get_formatted_translation(nat_translation, direction, family,
-                                          verbose)
+        return _get_formatted_translation(flows, direction, family, verbose)
 
 
 if __name__ == '__main__':
@@ -21,9 +21,9 @@
 
 import sys
 import argparse
-import netifaces
 
 from vyos.config import Config
+from vyos.netlink import rtnl
 from vyos.utils.process import popen
 
 parser = argparse.ArgumentParser(description='Retrieve SNMP interfaces information')
@@ -31,14 +31,19 @@ parser.add_argument('--ifindex', action='store', nargs='?', const='all', help='S
 parser.add_argument('--ifalias', action='store', nargs='?', const='all', help='Show interface aliase')
 parser.add_argument('--ifdescr', action='store', nargs='?', const='all', help='Show interface description')
 
+# index and alias of all interfaces, from a single netlink dump
+_links = {}
+
+def _link(intf):
+    if not _links:
+        _links.update((l['ifname'], l) for l in rtnl().dump_links(addresses=False))
+    return _links.get(intf, {})
+
 def show_ifindex(intf):
-    out, err = popen(f'/bin/ip link show {intf}', decode='utf-8')
-    index = 'ifIndex = ' + out.split(':')[0]
-    return index.replace('\n', '')
+    return 'ifIndex = ' + str(_link(intf).get('ifindex', ''))
 
 def show_ifalias(intf):
-    out, err = popen(f'/bin/ip link show {intf}', decode='utf-8')
-    alias = out.split('alias')[1].lstrip() if 'alias' in out else intf
+    alias = _link(intf).get('ifalias') or intf
     return 'ifAlias = ' + alias.replace('\n', '')
 
 def show_ifdescr(i):
@@ -78,6 +83,10 @@ def show_ifdescr(i):
     ret = 'ifDescr = {0} {1}'.format(vendor, device)
     return ret.replace('\n', '')
 
+def _interfaces():
+    _link('')
+    return list(_links)
+
 if __name__ == '__main__':
     args = parser.parse_args()
 
@@ -89,21 +98,21 @@ if __name__ == '__main__':
 
     if args.ifindex:
         if args.ifindex == 'all':
-            for i in netifaces.interfaces():
+            for i in _interfaces():
                 print('{0}: {1}'.format(i, show_ifindex(i)))
         else:
             print('{0}: {1}'.format(args.ifindex, show_ifindex(args.ifindex)))
 
     elif args.ifalias:
         if args.ifalias == 'all':
-            for i in netifaces.interfaces():
+            for i in _interfaces():
                 print('{0}: {1}'.format(i, show_ifalias(i)))
         else:
             print('{0}: {1}'.format(args.ifalias, show_ifalias(args.ifalias)))
 
     elif args.ifdescr:
         if args.ifdescr == 'all':
-            for i in netifaces.interfaces():
+            for i in _interfaces():
                 print('{0}: {1}'.format(i, show_ifdescr(i)))
         else:
                 print('{0}: {1}'.format(args.ifdescr, show_ifdescr(args.ifdescr)))
@@ -113,7 +122,7 @@ if __name__ == '__main__':
         #      ifAlias = NET-MYBLL-MUCI-BACKBONE
         #      ifDescr = VMware VMXNET3 Ethernet Controller
         #lo: ifIndex = 1
-        for i in netifaces.interfaces():
+        for i in _interfaces():
             print('{0}:\t{1}'.format(i, show_ifindex(i)))
             print('\t{0}'.format(show_ifalias(i)))
             print('\t{0}'.format(show_ifdescr(i)))
@@ -27,11 +27,11 @@ from vyos.configquery import ConfigTreeQuery
 import vyos.opmode
 import vyos.version
 
-config = ConfigTreeQuery()
 base = ['system', 'update-check']
 
 
 def _compare_version_raw():
+    config = ConfigTreeQuery()
     url = config.value(base + ['url'])
     local_data = vyos.version.get_full_version_data()
     remote_data = vyos.version.get_remote_version(url)
@@ -67,6 +67,7 @@ def _formatted_compare_version(data):
 
 
 def _verify():
+    config = ConfigTreeQuery()
     if not config.exists(base):
         return False
     return True
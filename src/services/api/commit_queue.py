@@ -0,0 +1,273 @@
+# Copyright 2023 VyOS maintainers and contributors <maintainers@vyos.io>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Commit queue and config cache of the HTTP API server.
+
+Configuration changes are not applied by the request handlers: each request
+is turned into a job and queued, and a single worker thread applies the jobs
+to the shared config session. Consecutive queued jobs that touch disjoint
+config paths are merged into a single commit; should the merged commit fail,
+its jobs are retried one by one, so that every job gets its own result.
+
+Reads not answered from the snapshot of the running config (see
+vyos.configsnapshot) use a cached Config object, which is rebuilt after a
+commit through the queue, or once older than max_age to pick up commits
+made outside of the API server.
+"""
+
+import time
+import uuid
+import logging
+import threading
+import traceback
+
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import vyos.config
+from vyos.configsession import ConfigSessionError
+from vyos.configsession import raise_batch_errors
+
+logger = logging.getLogger(__name__)
+
+internal_error = "An internal error occured. Check the logs for details."
+
+class Job:
+    """ A queued configuration change
+
+    ops is a list of ('set', path), ('delete', path) or ('comment', path,
+    value) tuples, with the value of set and delete included in the path
+    """
+    def __init__(self, ops, key_id=None):
+        self.id = str(uuid.uuid4())
+        self.ops = ops
+        self.key_id = key_id
+        self.status = 'queued'
+        self.code = None
+        self.error = None
+        self.merged = 0
+        self.created = time.time()
+        self.finished = None
+        self._done = threading.Event()
+
+    def paths(self):
+        return [tuple(op[1]) for op in self.ops]
+
+    def mergeable(self):
+        # comments are applied in order, between set and delete operations
+        return all(op[0] != 'comment' for op in self.ops)
+
+    def finish(self, code=200, error=None):
+        self.status = 'done' if code == 200 else 'failed'
+        self.code = code
+        self.error = error
+        self.finished = time.time()
+        self._done.set()
+
+    def wait(self, timeout=None) -> bool:
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> dict:
+        return {'id': self.id, 'status': self.status, 'error': self.error,
+                'merged_with': self.merged, 'created': self.created,
+                'finished': self.finished}
+
+def _overlaps(paths, prefixes, touched):
+    """ True if any path is a prefix of, or has a prefix in, the touched
+    paths """
+    for path in paths:
+        if path in prefixes:
+            return True
+        for n in range(1, len(path)):
+            if path[:n] in touched:
+                return True
+    return False
+
+class CommitQueue:
+    """ Applies queued jobs to a config session from a worker thread
+
+    Args:
+        session (ConfigSession): the config session to commit with
+        lock (threading.Lock): lock serializing the use of the session
+        strict (bool): fail deleting paths that do not exist
+        on_commit (callable): called after every commit attempt
+        max_merge (int): maximum number of jobs merged into one commit
+        keep (int): number of finished jobs kept for polling
+    """
+    def __init__(self, session, lock, strict=False, on_commit=None,
+                 max_merge=100, keep=1000):
+        self._session = session
+        self._lock = lock
+        self._strict = strict
+        self._on_commit = on_commit
+        self._max_merge = max_merge
+        self._keep = keep
+        self._queue = []
+        self._jobs = OrderedDict()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._worker, daemon=True,
+                                        name='commit-queue')
+        self._thread.start()
+
+    def submit(self, ops, key_id=None) -> Job:
+        job = Job(ops, key_id)
+        with self._cond:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self._keep:
+                oldest = next(iter(self._jobs.values()))
+                if oldest.finished is None:
+                    break
+                self._jobs.popitem(last=False)
+            self._queue.append(job)
+            self._cond.notify()
+        return job
+
+    def get(self, job_id):
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def _take_batch(self) -> list:
+        """ Remove the next jobs to commit from the queue: the first job,
+        and the following jobs that can be merged with it; merging stops at
+        the first job that cannot be, to keep the order of changes """
+        batch = [self._queue.pop(0)]
+        if not batch[0].mergeable():
+            return batch
+        touched = set(batch[0].paths())
+        prefixes = {p[:n] for p in touched for n in range(1, len(p) + 1)}
+        while self._queue and len(batch) < self._max_merge:
+            job = self._queue[0]
+            paths = job.paths()
+            if not job.mergeable() or _overlaps(paths, prefixes, touched):
+                break
+            batch.append(self._queue.pop(0))
+            touched.update(paths)
+            prefixes.update(p[:n] for p in paths for n in range(1, len(p) + 1))
+        return batch
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                batch = self._take_batch()
+            for job in batch:
+                job.status = 'running'
+                job.merged = len(batch) - 1
+            try:
+                self._commit(batch)
+            except Exception:
+                logger.critical(traceback.format_exc())
+                for job in batch:
+                    if job.finished is None:
+                        job.finish(500, internal_error)
+
+    def _apply(self, ops, config):
+        """ Apply the operations of one or more jobs to the session """
+        session = self._session
+        batch = []
+        for op in ops:
+            if op[0] == 'set':
+                batch.append(op)
+            elif op[0] == 'delete':
+                cfg_path = ' '.join(op[1])
+                if self._strict and not config.exists(cfg_path):
+                    raise ConfigSessionError(f"Cannot delete [{cfg_path}]: path/value does not exist")
+                batch.append(op)
+            else:
+                # set and delete operations are applied in one batch;
+                # comments are applied in order, after the queued ones
+                raise_batch_errors(session.apply_batch(batch))
+                batch = []
+                session.comment(op[1], value=op[2])
+        raise_batch_errors(session.apply_batch(batch))
+
+    def _commit(self, batch):
+        session = self._session
+        with self._lock:
+            config = None
+            if self._strict:
+                config = vyos.config.Config(session_env=session.get_session_env())
+            try:
+                self._apply([op for job in batch for op in job.ops], config)
+                session.commit()
+            except ConfigSessionError as e:
+                session.discard()
+                if len(batch) == 1:
+                    batch[0].finish(400, str(e))
+                    return
+            except Exception:
+                session.discard()
+                if len(batch) == 1:
+                    logger.critical(traceback.format_exc())
+                    batch[0].finish(500, internal_error)
+                    return
+            else:
+                for job in batch:
+                    logger.info(f"Configuration modified via HTTP API using key '{job.key_id}'")
+                    job.finish()
+                return
+            finally:
+                if self._on_commit is not None:
+                    self._on_commit()
+
+        # the merged commit failed, find out which of the jobs did
+        for job in batch:
+            job.merged = 0
+            self._commit([job])
+
+class ConfigCache:
+    """ Cached Config object of a config session, for answering reads
+    without spawning cli-shell-api for each of them
+
+    Args:
+        session (ConfigSession): the config session to read
+        lock (threading.Lock): lock serializing the use of the session
+        max_age (float): seconds after which the cached config is rebuilt
+    """
+    def __init__(self, session, lock, max_age=5.0):
+        self._session = session
+        self._lock = lock
+        self._max_age = max_age
+        self._config = None
+        self._stamp = 0.0
+        # libvyosconfig is not meant to be used from several threads at once
+        self._read_lock = threading.Lock()
+
+    def invalidate(self):
+        self._config = None
+
+    @contextmanager
+    def config(self):
+        """ Context manager returning the cached Config object """
+        config = self._config
+        if config is None or time.monotonic() - self._stamp > self._max_age:
+            # wait for a commit in progress, not to read a half-applied
+            # session
+            with self._lock:
+                env = self._session.get_session_env()
+                config = vyos.config.Config(session_env=env)
+            self._config = config
+            self._stamp = time.monotonic()
+        with self._read_lock:
+            yield config
@@ -13,7 +13,6 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with this library.  If not, see <http://www.gnu.org/licenses/>.
 
-from importlib import import_module
 from typing import Any, Dict, Optional
 from ariadne import ObjectType, convert_camel_case_to_snake
 from graphql import GraphQLResolveInfo
@@ -21,7 +20,8 @@ from makefun import with_signature
 
 from .. import state
 from .. libs import key_auth
-from api.graphql.session.session import Session
+from .. libs import metrics
+from api.graphql.session.session import get_session_class
 from api.graphql.session.errors.op_mode_errors import op_mode_err_msg, op_mode_err_code
 from vyos.opmode import Error as OpModeError
 
@@ -46,6 +46,7 @@ def make_mutation_resolver(mutation_name, class_name, session_func):
 
     @mutation.field(mutation_name)
     @with_signature(func_sig, func_name=resolver_name)
+    @metrics.timed(f'Mutation.{mutation_name}')
     async def func_impl(*args, **kwargs):
         try:
             auth_type = state.settings['app'].state.vyos_auth_type
@@ -90,14 +91,7 @@ def make_mutation_resolver(mutation_name, class_name, session_func):
 
             session = state.settings['app'].state.vyos_session
 
-            # one may override the session functions with a local subclass
-            try:
-                mod = import_module(f'api.graphql.session.override.{func_base_name}')
-                klass = getattr(mod, class_name)
-            except ImportError:
-                # otherwise, dynamically generate subclass to invoke subclass
-                # name based functions
-                klass = type(class_name, (Session,), {})
+            klass = get_session_class(class_name)
             k = klass(session, data)
             method = getattr(k, session_func)
             result = method()
@@ -0,0 +1,83 @@
+# Copyright 2023 VyOS maintainers and contributors <maintainers@vyos.io>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Latency metrics of the GraphQL resolvers, kept in memory for the lifetime
+of the API server and returned by its '/metrics' endpoint.
+"""
+
+import time
+from functools import wraps
+
+# upper bounds, in seconds, of the latency histogram buckets
+buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_metrics = {}
+
+def observe(resolver: str, elapsed: float, success: bool = True):
+    """Record a call of a resolver taking 'elapsed' seconds"""
+    m = _metrics.get(resolver)
+    if m is None:
+        m = {'count': 0, 'errors': 0, 'total': 0.0, 'max': 0.0,
+             'buckets': [0] * (len(buckets) + 1)}
+        _metrics[resolver] = m
+    m['count'] += 1
+    if not success:
+        m['errors'] += 1
+    m['total'] += elapsed
+    m['max'] = max(m['max'], elapsed)
+    for i, bound in enumerate(buckets):
+        if elapsed <= bound:
+            break
+    else:
+        i = len(buckets)
+    m['buckets'][i] += 1
+
+def timed(resolver: str):
+    """Decorator recording the latency of an async resolver; resolvers
+    report failures in the 'success' field of their result"""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            success = False
+            try:
+                res = await func(*args, **kwargs)
+                success = isinstance(res, dict) and res.get('success', False)
+                return res
+            finally:
+                observe(resolver, time.perf_counter() - start, success)
+        return wrapper
+    return decorator
+
+def get_metrics() -> dict:
+    """Return the metrics per resolver; histogram buckets are cumulative
+    and keyed by their upper bound, as in the Prometheus exposition format"""
+    res = {}
+    for resolver, m in sorted(_metrics.items()):
+        histogram = {}
+        cumulative = 0
+        for bound, count in zip(buckets + ('+Inf',), m['buckets']):
+            cumulative += count
+            histogram[str(bound)] = cumulative
+        res[resolver] = {'count': m['count'], 'errors': m['errors'],
+                         'total_seconds': round(m['total'], 6),
+                         'mean_seconds': round(m['total'] / m['count'], 6),
+                         'max_seconds': round(m['max'], 6),
+                         'buckets': histogram}
+    return res
+
+def reset_metrics():
+    _metrics.clear()
@@ -15,6 +15,7 @@
 
 import os
 import re
+import json
 import typing
 from typing import Union, Tuple, Optional
 from humps import decamelize
@@ -24,10 +25,40 @@ from vyos.utils.system import load_as_module
 from vyos.opmode import _normalize_field_names
 from vyos.opmode import _is_literal_type, _get_literal_values
 
+op_mode_include_file = os.path.join(directories['data'], 'op-mode-standardized.json')
+
+# Op-mode scripts are loaded once and kept for the lifetime of the server;
+# a script, or the list of standardized scripts, is reloaded once the file
+# changed, as on an upgrade of the package shipping it.
+_op_mode_modules = {}
+_op_mode_list = {'key': None, 'files': None, 'names': {}}
+
+def _file_key(path: str) -> tuple:
+    st = os.stat(path)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
 def load_op_mode_as_module(name: str):
     path = os.path.join(directories['op_mode'], name)
-    name = os.path.splitext(name)[0].replace('-', '_')
-    return load_as_module(name, path)
+    key = _file_key(path)
+    cached = _op_mode_modules.get(name)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    mod = load_as_module(os.path.splitext(name)[0].replace('-', '_'), path)
+    _op_mode_modules[name] = (key, mod)
+    return mod
+
+def get_op_mode_list() -> Optional[list]:
+    """Return the file names of the standardized op-mode scripts, or None
+    if the list is not available"""
+    try:
+        key = _file_key(op_mode_include_file)
+        if key != _op_mode_list['key']:
+            with open(op_mode_include_file) as f:
+                files = json.loads(f.read())
+            _op_mode_list.update(key=key, files=files, names={})
+    except Exception:
+        _op_mode_list.update(key=None, files=None, names={})
+    return _op_mode_list['files']
 
 def is_show_function_name(name):
     if re.match(r"^show", name):
@@ -69,6 +100,17 @@ def split_compound_op_mode_name(name: str, files: list):
             return pair
     return (name, '')
 
+def resolve_op_mode_name(name: str) -> Tuple[str, str]:
+    """Split a query/mutation name into function name and op-mode script,
+    memoized for the current list of standardized op-mode scripts"""
+    files = get_op_mode_list()
+    if files is None:
+        raise FileNotFoundError(f"No op-mode file list at '{op_mode_include_file}'")
+    names = _op_mode_list['names']
+    if name not in names:
+        names[name] = split_compound_op_mode_name(name, files)
+    return names[name]
+
 def snake_to_pascal_case(name: str) -> str:
     res = ''.join(map(str.title, name.split('_')))
     return res
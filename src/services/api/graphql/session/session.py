@@ -13,21 +13,21 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with this library.  If not, see <http://www.gnu.org/licenses/>.
 
-import os
 import json
 
+from importlib import import_module
 from ariadne import convert_camel_case_to_snake
 
 from vyos.config import Config
 from vyos.configtree import ConfigTree
-from vyos.defaults import directories
+from vyos.configsnapshot import ConfigSnapshot
 from vyos.template import render
 from vyos.opmode import Error as OpModeError
 
-from api.graphql.libs.op_mode import load_op_mode_as_module, split_compound_op_mode_name
+from api.graphql.libs.op_mode import load_op_mode_as_module, resolve_op_mode_name
 from api.graphql.libs.op_mode import normalize_output
 
-op_mode_include_file = os.path.join(directories['data'], 'op-mode-standardized.json')
+config_snapshot = ConfigSnapshot()
 
 def get_config_dict(path=[], effective=False, key_mangling=None,
                      get_first_key=False, no_multi_convert=False,
@@ -62,18 +62,18 @@ class Session:
         self._data = data
         self._name = convert_camel_case_to_snake(type(self).__name__)
 
-        try:
-            with open(op_mode_include_file) as f:
-                self._op_mode_list = json.loads(f.read())
-        except Exception:
-            self._op_mode_list = None
-
     def show_config(self):
         session = self._session
         data = self._data
         out = ''
 
         try:
+            # answer JSON from the snapshot of the running config, if any
+            if (data.get('config_format', '') == 'json' and
+                    config_snapshot.refresh()):
+                out = config_snapshot.get_subtree_dict(data['path'])
+                if out is not None:
+                    return out
             out = session.show_config(data['path'])
             if data.get('config_format', '') == 'json':
                 config_tree = ConfigTree(out)
@@ -169,12 +169,9 @@ class Session:
         session = self._session
         data = self._data
         name = self._name
-        op_mode_list = self._op_mode_list
 
         # handle the case that the op-mode file contains underscores:
-        if op_mode_list is None:
-            raise FileNotFoundError(f"No op-mode file list at '{op_mode_include_file}'")
-        (func_name, scriptname) = split_compound_op_mode_name(name, op_mode_list)
+        (func_name, scriptname) = resolve_op_mode_name(name)
         if scriptname == '':
             raise FileNotFoundError(f"No op-mode file named in string '{name}'")
 
@@ -193,12 +190,9 @@ class Session:
         session = self._session
         data = self._data
         name = self._name
-        op_mode_list = self._op_mode_list
 
         # handle the case that the op-mode file name contains underscores:
-        if op_mode_list is None:
-            raise FileNotFoundError(f"No op-mode file list at '{op_mode_include_file}'")
-        (func_name, scriptname) = split_compound_op_mode_name(name, op_mode_list)
+        (func_name, scriptname) = resolve_op_mode_name(name)
         if scriptname == '':
             raise FileNotFoundError(f"No op-mode file named in string '{name}'")
 
@@ -210,3 +204,22 @@ class Session:
             raise e
 
         return res
+
+_session_classes = {}
+
+def get_session_class(class_name: str) -> type:
+    """Return the class handling the query or mutation 'class_name'"""
+    klass = _session_classes.get(class_name)
+    if klass is not None:
+        return klass
+    func_base_name = convert_camel_case_to_snake(class_name)
+    # one may override the session functions with a local subclass
+    try:
+        mod = import_module(f'api.graphql.session.override.{func_base_name}')
+        klass = getattr(mod, class_name)
+    except ImportError:
+        # otherwise, dynamically generate subclass to invoke subclass
+        # name based functions
+        klass = type(class_name, (Session,), {})
+    _session_classes[class_name] = klass
+    return klass
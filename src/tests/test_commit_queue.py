@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import threading
+
+from unittest import TestCase
+
+try:
+    from src.services.api.commit_queue import CommitQueue
+except ModuleNotFoundError:  # for unittest.main()
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+    from src.services.api.commit_queue import CommitQueue
+
+class FakeSession:
+    """ Records commits; set operations of paths containing 'invalid' fail """
+    def __init__(self):
+        self.pending = []
+        self.commits = []
+
+    def get_session_env(self):
+        return {}
+
+    def apply_batch(self, ops):
+        self.pending += ops
+        return [(path, 'invalid value') for _, path in ops if 'invalid' in path]
+
+    def comment(self, path, value=None):
+        self.pending.append(('comment', path))
+
+    def commit(self):
+        self.commits.append(self.pending)
+        self.pending = []
+
+    def discard(self):
+        self.pending = []
+
+class TestCommitQueue(TestCase):
+    def setUp(self):
+        self.session = FakeSession()
+        self.lock = threading.Lock()
+        self.queue = CommitQueue(self.session, self.lock)
+
+    def run_queue(self, jobs):
+        # hold the session lock until all jobs are queued
+        with self.lock:
+            self.queue.start()
+            jobs = [self.queue.submit(ops) for ops in jobs]
+        for job in jobs:
+            self.assertTrue(job.wait(10))
+        return jobs
+
+    def test_take_batch(self):
+        for ops in [[('set', ['system', 'host-name', 'r1'])],
+                    [('set', ['interfaces', 'dummy', 'dum0'])],
+                    [('delete', ['interfaces'])],
+                    [('set', ['service', 'ssh'])],
+                    [('comment', ['service'], 'remote access')]]:
+            self.queue.submit(ops)
+        # the delete overlaps with an earlier job, merging stops there
+        self.assertEqual(len(self.queue._take_batch()), 2)
+        self.assertEqual(len(self.queue._take_batch()), 2)
+        self.assertEqual(len(self.queue._take_batch()), 1)
+        self.assertEqual(self.queue.pending(), 0)
+
+    def test_failed_merge(self):
+        jobs = self.run_queue([[('set', ['system', 'host-name', 'r1'])],
+                               [('set', ['system', 'domain-name', 'invalid'])],
+                               [('set', ['service', 'ssh'])]])
+        self.assertEqual([job.status for job in jobs], ['done', 'failed', 'done'])
+        self.assertEqual(jobs[1].code, 400)
+        self.assertIn('invalid value', jobs[1].error)
+        self.assertEqual(self.session.commits,
+                         [[('set', ['system', 'host-name', 'r1'])],
+                          [('set', ['service', 'ssh'])]])
+        self.assertEqual(self.queue.get(jobs[0].id).to_dict()['status'], 'done')
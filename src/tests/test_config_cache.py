@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from vyos.configcache import split_top_level
+
+from unittest import TestCase
+
+class TestConfigCache(TestCase):
+    def setUp(self):
+        with open('tests/data/config.valid', 'r') as f:
+            self.config_string = f.read()
+
+    def test_split_top_level(self):
+        blocks = split_top_level(self.config_string)
+        names = [name for (name, _) in blocks]
+        self.assertEqual(names, ['top-level-leaf-node',
+                                 'top-level-valueless-node',
+                                 'top-level-tag-node',
+                                 'top-level-tag-node',
+                                 'normal-node',
+                                 'trailing-leaf-node-option',
+                                 'empty-node',
+                                 'trailing-leaf-node-without-value'])
+        # comments are kept with the following node
+        self.assertTrue(blocks[0][1].startswith('/* top level leaf node */'))
+        # trailing comments are dropped
+        self.assertNotIn('//', ''.join(text for (_, text) in blocks))
+        # nested blocks are not split
+        self.assertIn('tag-node bar {', blocks[4][1])
+        self.assertTrue(blocks[4][1].rstrip().endswith('}'))
@@ -54,3 +54,24 @@ class TestConfigParser(TestCase):
     def test_rename_duplicate(self):
         with self.assertRaises(vyos.configtree.ConfigTreeError):
             self.config.rename(["top-level-tag-node", "foo"], "bar")
+
+    def test_query(self):
+        q = self.config.query()
+        paths = [["top-level-leaf-node"],
+                 ["top-level-tag-node", "foo", "top-level-tag-node-child"],
+                 ["normal-node", "normal-node-child", "multi-node"]]
+        for p in paths:
+            self.assertEqual(q.exists(p), self.config.exists(p))
+            self.assertEqual(q.return_values(p), self.config.return_values(p))
+        self.assertEqual(q.list_nodes(["top-level-tag-node"]),
+                         self.config.list_nodes(["top-level-tag-node"]))
+        self.assertEqual(q.query([('exists', ["non-existent"]),
+                                  ('return_value', ["top-level-leaf-node"]),
+                                  ('list_nodes', ["non-existent"])]),
+                         [False, "foo", None])
+
+    def test_query_subtree(self):
+        q = self.config.query(["normal-node"])
+        self.assertEqual(q.return_value(["option-with-quoted-value"]), "some-value")
+        leaves = [p for (p, _) in q]
+        self.assertIn(["normal-node-child", "tag-node", "bar", "some-option"], leaves)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from unittest import TestCase
+
+from vyos.config import Config
+from vyos.configdict import get_interface_index
+from vyos.configdict import has_address_configured
+from vyos.configdict import has_qos_policy
+from vyos.configdict import has_vlan_subinterface_configured
+from vyos.configdict import has_vrf_configured
+from vyos.configdict import is_member
+from vyos.configdict import is_source_interface
+from vyos.configsource import ConfigSource
+from vyos.configtree import TreeQuery
+
+class DictConfigSource(ConfigSource):
+    """ Session config from a root dict, without libvyosconfig """
+    def __init__(self, root):
+        super().__init__()
+        self._root = root
+        self._session_config = TreeQuery(root)
+
+    def get_root_dict(self, effective=False):
+        return None if effective else self._root
+
+root = {
+    'interfaces': {
+        'bonding': {
+            'bond0': {'member': {'interface': {'eth2': {}, 'eth3': {}}},
+                      'vif': {'20': {'vrf': 'red'}}},
+        },
+        'bridge': {
+            'br0': {'member': {'interface': {'eth1': {'priority': '4'},
+                                             'eth0.10': {}}}},
+        },
+        'ethernet': {
+            'eth0': {'vif': {'10': {}},
+                     'vif-s': {'100': {'vif-c': {'200': {'address': ['dhcp']}}}}},
+            'eth1': {'ipv6': {'address': {'autoconf': {}}}},
+        },
+        'pseudo-ethernet': {
+            'peth0': {'source-interface': 'eth1'},
+        },
+        'vxlan': {
+            'vxlan0': {'source-interface': 'eth1'},
+        },
+    },
+    'qos': {'interface': {'eth1': {'egress': 'shaper'}}},
+}
+
+class TestConfigDict(TestCase):
+    def setUp(self):
+        self.config = Config(config_source=DictConfigSource(root))
+
+    def test_interface_index_cached(self):
+        index = get_interface_index(self.config)
+        self.assertIs(get_interface_index(self.config), index)
+        self.assertEqual(index.masters['eth2'], {'bonding': ['bond0']})
+
+    def test_is_member(self):
+        self.assertEqual(is_member(self.config, 'eth1'),
+                         {'br0': {'priority': '4'}})
+        self.assertEqual(is_member(self.config, 'eth0.10', 'bridge'), {'br0': {}})
+        self.assertEqual(is_member(self.config, 'eth3', 'bridge'), {})
+        self.assertIn('bond0', is_member(self.config, 'eth3', 'bonding'))
+        self.assertRaises(ValueError, is_member, self.config, 'eth1', 'tunnel')
+
+    def test_is_source_interface(self):
+        # a later type in the list takes precedence, as when walking the config
+        self.assertEqual(is_source_interface(self.config, 'eth1'), 'vxlan0')
+        self.assertEqual(is_source_interface(self.config, 'eth1', 'pseudo-ethernet'), 'peth0')
+        self.assertIsNone(is_source_interface(self.config, 'eth1', ['macsec']))
+        self.assertIsNone(is_source_interface(self.config, 'eth2'))
+
+    def test_interface_nodes(self):
+        self.assertTrue(has_address_configured(self.config, 'eth1'))
+        self.assertTrue(has_address_configured(self.config, 'eth0.100.200'))
+        self.assertFalse(has_address_configured(self.config, 'eth0.10'))
+        self.assertTrue(has_vrf_configured(self.config, 'bond0.20'))
+        self.assertFalse(has_vrf_configured(self.config, 'bond0'))
+        self.assertTrue(has_vlan_subinterface_configured(self.config, 'eth0'))
+        self.assertFalse(has_vlan_subinterface_configured(self.config, 'eth0.100'))
+        self.assertTrue(has_qos_policy(self.config, 'eth1'))
+        self.assertFalse(has_qos_policy(self.config, 'eth0'))
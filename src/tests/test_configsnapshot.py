@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import json
+import tempfile
+
+from unittest import TestCase
+
+from vyos.configsnapshot import ConfigSnapshot
+
+config = {'interfaces': {'ethernet': {'eth0': {'address': ['192.0.2.1/24', 'dhcp'],
+                                               'description': 'WAN'}}},
+          'service': {'ssh': {}}}
+
+class TestConfigSnapshot(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.json_file = os.path.join(self.tmp.name, 'config.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, d):
+        tmp = self.json_file + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(d, f)
+        os.replace(tmp, self.json_file)
+
+    def test_queries(self):
+        snapshot = ConfigSnapshot(self.json_file)
+        self.assertFalse(snapshot.refresh())
+
+        self.write(config)
+        self.assertTrue(snapshot.refresh())
+        self.assertTrue(snapshot.exists('service ssh'))
+        self.assertTrue(snapshot.exists('interfaces ethernet eth0 address dhcp'))
+        self.assertFalse(snapshot.exists('interfaces ethernet eth1'))
+        self.assertEqual(snapshot.return_value('interfaces ethernet eth0 description'), 'WAN')
+        self.assertEqual(snapshot.return_value('system host-name', default='vyos'), 'vyos')
+        self.assertEqual(snapshot.return_values(['interfaces', 'ethernet', 'eth0', 'address']),
+                         ['192.0.2.1/24', 'dhcp'])
+        self.assertEqual(snapshot.get_subtree_dict(['service']), {'ssh': {}})
+        self.assertIsNone(snapshot.get_subtree_dict(['interfaces', 'ethernet', 'eth0', 'description']))
+
+    def test_refresh(self):
+        snapshot = ConfigSnapshot(self.json_file)
+        self.write(config)
+        snapshot.refresh()
+        etag = snapshot.etag
+
+        self.write({'service': {}})
+        self.assertTrue(snapshot.refresh())
+        self.assertNotEqual(snapshot.etag, etag)
+        self.assertFalse(snapshot.exists('service ssh'))
+
+        # a partially written file keeps the previous snapshot
+        with open(self.json_file, 'w') as f:
+            f.write('{"service": ')
+        self.assertTrue(snapshot.refresh())
+        self.assertEqual(snapshot.get_subtree_dict([]), {'service': {}})
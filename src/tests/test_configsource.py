@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import json
+import tempfile
+
+import vyos.configsource
+import vyos.configtree
+
+from unittest import TestCase
+from unittest.mock import patch
+
+class TestConfigSource(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.json_file = os.path.join(self.tmp.name, 'config.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_read_snapshot(self):
+        read_snapshot = vyos.configsource.ConfigSourceSession._read_snapshot
+        with patch('vyos.configsource.snapshot_json', self.json_file):
+            # missing
+            self.assertIsNone(read_snapshot())
+            # partially written
+            with open(self.json_file, 'w') as f:
+                f.write('{"system": {"host-name": ')
+            self.assertIsNone(read_snapshot())
+
+            root = {'system': {'host-name': 'vyos'}}
+            with open(self.json_file, 'w') as f:
+                json.dump(root, f)
+            self.assertEqual(read_snapshot(), root)
+
+    def test_tree_from_dict(self):
+        with open('tests/data/config.left', 'r') as f:
+            tree = vyos.configtree.ConfigTree(f.read())
+
+        root = json.loads(tree.to_json())
+        tag_nodes = [['node1', 'tag_node'], ['node2', 'sub_node', 'tag_node']]
+        res = vyos.configtree.tree_from_dict(root, lambda p: p in tag_nodes)
+
+        self.assertEqual(json.loads(res.to_json()), root)
+        self.assertTrue(res.is_tag(['node1', 'tag_node']))
+        self.assertFalse(res.is_tag(['node2', 'sub_node']))
+        self.assertEqual(res.to_string(), tree.to_string())
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from io import BytesIO
+from unittest import TestCase
+
+from vyos.conntrack import parse_flows
+from vyos.conntrack import summarize
+
+xml = b'''<?xml version="1.0" encoding="utf-8"?>
+<conntrack>
+<flow><meta direction="original"><layer3 protonum="2" protoname="ipv4"><src>192.0.2.1</src><dst>198.51.100.1</dst></layer3><layer4 protonum="6" protoname="tcp"><sport>40000</sport><dport>22</dport></layer4></meta><meta direction="reply"><layer3 protonum="2" protoname="ipv4"><src>198.51.100.1</src><dst>203.0.113.1</dst></layer3><layer4 protonum="6" protoname="tcp"><sport>22</sport><dport>40000</dport></layer4></meta><meta direction="independent"><state>ESTABLISHED</state><timeout>431999</timeout><mark>0</mark><id>1234</id><assured/></meta></flow>
+<flow><meta direction="original"><layer3 protonum="2" protoname="ipv4"><src>192.0.2.1</src><dst>198.51.100.2</dst></layer3><layer4 protonum="1" protoname="icmp"></layer4></meta><meta direction="reply"><layer3 protonum="2" protoname="ipv4"><src>198.51.100.2</src><dst>192.0.2.1</dst></layer3><layer4 protonum="1" protoname="icmp"></layer4></meta><meta direction="independent"><timeout>29</timeout><mark>0</mark><zone>1</zone><id>99</id><unreplied/></meta></flow>
+</conntrack>
+'''
+
+class TestConntrack(TestCase):
+    def test_parse_flows(self):
+        flows = list(parse_flows(BytesIO(xml)))
+        self.assertEqual(len(flows), 2)
+        # same layout as xmltodict.parse(xml, attr_prefix='')
+        self.assertEqual(flows[0]['meta'][0],
+                         {'direction': 'original',
+                          'layer3': {'protonum': '2', 'protoname': 'ipv4',
+                                     'src': '192.0.2.1', 'dst': '198.51.100.1'},
+                          'layer4': {'protonum': '6', 'protoname': 'tcp',
+                                     'sport': '40000', 'dport': '22'}})
+        self.assertEqual(flows[0]['meta'][2],
+                         {'direction': 'independent', 'state': 'ESTABLISHED',
+                          'timeout': '431999', 'mark': '0', 'id': '1234',
+                          'assured': None})
+
+        self.assertEqual(len(list(parse_flows(BytesIO(xml), limit=1))), 1)
+        self.assertEqual(list(parse_flows(BytesIO(b''))), [])
+
+    def test_summarize(self):
+        summary = summarize(parse_flows(BytesIO(xml)))
+        self.assertEqual(summary['total'], 2)
+        self.assertEqual(summary['state'], {'ESTABLISHED': 1, 'none': 1})
+        self.assertEqual(summary['protocol'], {'tcp': 1, 'icmp': 1})
+        self.assertEqual(summary['top_talkers'],
+                         [{'address': '192.0.2.1', 'flows': 2}])
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from array import array
+from unittest import TestCase
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from vyos.ifconfig.sampler import CounterSampler
+
+class TestCounterSampler(TestCase):
+    def setUp(self):
+        self.rtnl = MagicMock()
+        self.time = [0.0]
+        patches = [
+            patch('vyos.ifconfig.sampler.rtnl', return_value=self.rtnl),
+            patch('vyos.ifconfig.sampler.monotonic', side_effect=lambda: self.time[0]),
+            patch('vyos.ifconfig.sampler.socket.if_nameindex',
+                  return_value=[(1, 'lo'), (2, 'eth0'), (3, 'eth1')]),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def sample(self, sampler, when, rows):
+        """ rows: {ifindex: (rx_packets, tx_packets, rx_bytes, tx_bytes)} """
+        self.time[0] = when
+        values = array('Q')
+        for row in rows.values():
+            values.extend(list(row) + [0] * (len(CounterSampler.counters) - len(row)))
+        self.rtnl.dump_stats.return_value = (array('I', rows), values)
+        sampler.sample()
+
+    def test_rates(self):
+        sampler = CounterSampler(size=3)
+        self.sample(sampler, 10.0, {1: (0, 0, 0, 0), 2: (100, 50, 1000, 500)})
+        self.assertEqual(sampler.rates(), {})
+
+        self.sample(sampler, 12.0, {1: (0, 0, 0, 0), 2: (300, 90, 5000, 900)})
+        rates = sampler.rates(['eth0'])
+        self.assertEqual(list(rates), ['eth0'])
+        self.assertEqual(rates['eth0']['rx_packets'], 100.0)
+        self.assertEqual(rates['eth0']['rx_bytes'], 2000.0)
+        self.assertEqual(sampler.deltas(['eth0'])['eth0']['tx_bytes'], 400)
+
+    def test_interfaces_change(self):
+        sampler = CounterSampler(size=4)
+        self.sample(sampler, 0.0, {1: (0, 0, 0, 0), 2: (100, 0, 0, 0)})
+        # eth1 appears, eth0 was re-created and its counters restarted
+        self.sample(sampler, 1.0, {1: (5, 5, 0, 0), 3: (7, 0, 0, 0), 2: (20, 0, 0, 0)})
+        deltas = sampler.deltas()
+        self.assertEqual(deltas['lo']['rx_packets'], 5)
+        self.assertEqual(deltas['eth0']['rx_packets'], 20)
+        self.assertNotIn('eth1', deltas)
+
+    def test_ring_and_percentiles(self):
+        sampler = CounterSampler(size=3)
+        for n, rx in enumerate([0, 10, 30, 60, 100]):
+            self.sample(sampler, float(n), {2: (rx, 0, 0, 0)})
+        # only the last three samples are kept
+        self.assertEqual(sampler.samples(), 3)
+        self.assertEqual(sampler.deltas(window=5)['eth0']['rx_packets'], 70)
+        self.assertEqual(sampler.rates(window=2)['eth0']['rx_packets'], 35.0)
+        res = sampler.percentiles(['eth0'], percentiles=(50, 100))
+        self.assertEqual(res['eth0']['rx_packets'], {50: 30.0, 100: 40.0})
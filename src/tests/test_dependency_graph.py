@@ -29,3 +29,20 @@ class TestDependencyGraph(TestCase):
     def test_acyclic(self):
         res = check_dependency_graph(dependency_dir=ddir)
         self.assertTrue(res)
+
+    def test_batch_order(self):
+        from vyos.configdep import read_dependency_dict
+        from vyos.configdep import dependents_closure
+        from vyos.configdep import graph_from_batch
+
+        closure = dependents_closure(read_dependency_dict(dependency_dir=ddir))
+        # firewall -> nat -> conntrack
+        self.assertIn('conntrack', closure['firewall'])
+
+        names = {0: 'pki', 1: 'interfaces_ethernet', 2: 'interfaces_ethernet',
+                 3: 'system_syslog'}
+        g = graph_from_batch(names, closure)
+        self.assertEqual(g[0], set())
+        self.assertEqual(g[1], {0})
+        self.assertEqual(g[2], {0})
+        self.assertEqual(g[3], set())
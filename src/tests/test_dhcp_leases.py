@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+
+from unittest import TestCase
+
+from vyos.dhcp_leases import LeaseStore
+
+def lease(ip, mac, state, pool):
+    return (f'lease {ip} {{\n'
+            f'  starts 4 2023/08/03 10:00:00;\n'
+            f'  ends epoch 1691100000; # Thu Aug 03 22:00:00 2023\n'
+            f'  binding state {state};\n'
+            f'  next binding state free;\n'
+            f'  hardware ethernet {mac};\n'
+            f'  set shared-networkname = "{pool}";\n'
+            f'  client-hostname "host";\n'
+            f'}}\n')
+
+leases6 = '''server-duid "\\000\\001\\000\\001,\\271\\335\\207\\014\\227\\246\\264\\000\\000";
+
+ia-na "\\023\\324\\001\\000\\000\\001\\000\\001" {
+  cltt 3 2023/09/27 07:26:34;
+  iaaddr 2001:db8::101 {
+    binding state active;
+    preferred-life 27000;
+    max-life 43200;
+    ends 3 2023/09/27 19:26:34;
+    set shared-networkname = "LAN6";
+  }
+}
+'''
+
+class TestLeaseStore(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.lease_file = os.path.join(self.tmp.name, 'dhcpd.leases')
+        self.cache_file = os.path.join(self.tmp.name, 'dhcpd.leases.cache')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, data, mode='a'):
+        with open(self.lease_file, mode) as f:
+            f.write(data)
+
+    def test_leases(self):
+        self.write('authoring-byte-order little-endian;\n\n'
+                   + lease('192.0.2.1', '00:53:00:00:00:01', 'active', 'LAN')
+                   + lease('192.0.2.2', '00:53:00:00:00:02', 'active', 'LAN')
+                   + lease('192.0.2.3', '00:53:00:00:00:03', 'active', 'DMZ')
+                   + lease('192.0.2.1', '00:53:00:00:00:01', 'free', 'LAN'))
+
+        store = LeaseStore(self.lease_file).update()
+        self.assertEqual(store.get('192.0.2.1')['state'], 'free')
+        self.assertEqual(store.get('192.0.2.1')['end'], 1691100000.0)
+        self.assertEqual(store.get('192.0.2.2')['start'], 1691056800.0)
+        self.assertEqual(store.get('192.0.2.2')['hostname'], 'host')
+        self.assertEqual([l['ip'] for l in store.leases()],
+                         ['192.0.2.2', '192.0.2.3', '192.0.2.1'])
+        self.assertEqual([l['ip'] for l in store.leases(pools=['LAN'], states=['active'])],
+                         ['192.0.2.2'])
+        self.assertEqual(store.count('LAN', exclude_states=['free']), 1)
+        self.assertEqual(store.by_mac('00:53:00:00:00:03')[0]['ip'], '192.0.2.3')
+
+    def test_update(self):
+        self.write(lease('192.0.2.1', '00:53:00:00:00:01', 'active', 'LAN'))
+        store = LeaseStore(self.lease_file, self.cache_file).update()
+        self.assertEqual(len(store.leases()), 1)
+
+        # incomplete blocks are parsed once complete
+        tmp = lease('192.0.2.2', '00:53:00:00:00:02', 'active', 'LAN')
+        self.write(tmp[:40])
+        self.assertEqual(len(store.update().leases()), 1)
+        self.write(tmp[40:])
+        self.assertEqual(len(store.update().leases()), 2)
+
+        # a new store continues from the cache
+        store = LeaseStore(self.lease_file, self.cache_file).update()
+        self.assertEqual(len(store.leases()), 2)
+
+        # the leases file is rewritten by dhcpd
+        self.write(lease('192.0.2.3', '00:53:00:00:00:03', 'active', 'LAN'), mode='w')
+        store = LeaseStore(self.lease_file, self.cache_file).update()
+        self.assertEqual([l['ip'] for l in store.leases()], ['192.0.2.3'])
+
+    def test_leases6(self):
+        self.write(leases6)
+        store = LeaseStore(self.lease_file).update()
+        tmp = store.get('2001:db8::101')
+        self.assertEqual(tmp['type'], 'na')
+        self.assertEqual(tmp['pool'], 'LAN6')
+        self.assertEqual(tmp['host_identifier'], '13d4010000010001')
+        self.assertEqual(tmp['last_communication'], 1695799594.0)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import os
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from vyos.firewall import DomainCache
+from vyos.firewall import fqdn_resolve_many
+
+from helper import prepare_module
+
+prepare_module(os.path.join(os.path.dirname(__file__),
+                            '../helpers/vyos-domain-resolver.py'),
+               'domain_resolver')
+import domain_resolver
+
+records = {('a.example', False): ({'192.0.2.1'}, 3600),
+           ('b.example', False): ({'192.0.2.2', '192.0.2.3'}, 10),
+           ('b.example', True): (set(), None),
+           ('c.example', False): (None, None)}
+
+class TestDomainResolver(TestCase):
+    def setUp(self):
+        self.queried = []
+
+    async def query(self, fqdn, ipv6=False):
+        self.queried.append((fqdn, ipv6))
+        await asyncio.sleep(0)
+        return records[(fqdn, ipv6)]
+
+    def resolve(self, cache, interval=60):
+        self.queried = []
+        return asyncio.run(fqdn_resolve_many(list(records), cache, interval,
+                                             concurrency=2, query=self.query))
+
+    def test_resolve(self):
+        cache = DomainCache()
+        results = self.resolve(cache)
+        self.assertEqual(len(results), 4)
+        self.assertEqual(cache.get(('b.example', False)), {'192.0.2.2', '192.0.2.3'})
+        self.assertEqual(cache.get(('c.example', False)), frozenset())
+
+        # only names expiring before the next cycle are queried again
+        self.resolve(cache)
+        self.assertEqual(sorted(self.queried),
+                         [('b.example', False), ('b.example', True), ('c.example', False)])
+
+    def test_keep_stale(self):
+        cache = DomainCache(keep_stale=True)
+        cache.update(('c.example', False), {'192.0.2.4'}, 0, 0)
+        self.resolve(cache)
+        self.assertEqual(cache.get(('c.example', False)), {'192.0.2.4'})
+
+        cache.retain([('a.example', False)])
+        self.assertEqual(cache.get(('c.example', False)), frozenset())
+
+    def test_recreated_sets(self):
+        firewall = {'group': {'domain_group': {'G': {'address': ['a.example']}}},
+                    'ip_fqdn': {}, 'ip6_fqdn': {}}
+        resolver = domain_resolver.Resolver(firewall)
+        resolver.cache.update(('a.example', False), {'192.0.2.1'}, 3600, 0)
+
+        async def resolve_many(*args):
+            return []
+
+        handles = {('ip vyos_filter', 'D_G'): (1, 5)}
+        with patch.object(domain_resolver, 'fqdn_resolve_many', resolve_many), \
+             patch.object(domain_resolver, 'nft_valid_sets', lambda: dict(handles)), \
+             patch.object(domain_resolver, 'run', return_value=0) as run:
+            resolver.update()
+            self.assertEqual(run.call_args[1]['input'],
+                             'flush set ip vyos_filter D_G\n'
+                             'add element ip vyos_filter D_G { 192.0.2.1 }\n')
+
+            # unchanged contents are not written again
+            run.reset_mock()
+            resolver.update()
+            run.assert_not_called()
+
+            # a table re-created by another commit, with an empty set, and
+            # a set created after the resolver started, are filled again
+            handles[('ip vyos_filter', 'D_G')] = (9, 5)
+            handles[('ip vyos_mangle', 'D_G')] = (3, 2)
+            resolver.update()
+            self.assertEqual(run.call_args[1]['input'].count('flush set'), 2)
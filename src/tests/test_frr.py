@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from unittest import TestCase
+
+from vyos.frr import FRRConfig
+from vyos.frr import config_delta
+
+running = '''frr version 9.0
+!
+ip prefix-list P1 seq 5 permit 10.0.0.0/8
+ip prefix-list P1 seq 10 permit 11.0.0.0/8
+!
+interface eth0
+ ip ospf cost 10
+exit
+!
+router bgp 65000
+ neighbor 192.0.2.1 remote-as 65001
+ neighbor 192.0.2.2 remote-as 65002
+ !
+ address-family ipv4 unicast
+  network 10.0.0.0/8
+  neighbor 192.0.2.2 route-map RM in
+ exit-address-family
+exit
+!
+line vty
+!
+end'''
+
+bgpd = '''router bgp 65000
+ neighbor 192.0.2.1 remote-as 65001
+ !
+ address-family ipv4 unicast
+  network 10.0.0.0/8
+ exit-address-family
+ !
+ address-family ipv6 unicast
+  network 2001:db8::/32
+ exit-address-family
+exit'''
+
+class TestFRRConfig(TestCase):
+    def test_modify_section(self):
+        frr_cfg = FRRConfig(running)
+        self.assertEqual(frr_cfg.modify_section(r'^router bgp \d+', stop_pattern='^exit',
+                                                remove_stop_mark=True), 1)
+        self.assertEqual(frr_cfg.modify_section(r'^ip prefix-list .*'), 2)
+        self.assertNotIn('router bgp 65000', frr_cfg.config)
+        self.assertEqual(frr_cfg.config[:4], ['frr version 9.0', '!', '!', '!'])
+        self.assertTrue(frr_cfg.add_before(r'(line vty)', bgpd))
+        self.assertIn(' address-family ipv6 unicast', frr_cfg.config)
+
+    def test_modify_section_alternation(self):
+        frr_cfg = FRRConfig(running)
+        # every alternative is tried, not only lines starting with the first
+        self.assertEqual(frr_cfg.modify_section(r'interface eth1|router bgp \d+',
+                                                stop_pattern='^exit',
+                                                remove_stop_mark=True), 1)
+        self.assertNotIn('router bgp 65000', frr_cfg.config)
+        self.assertEqual(frr_cfg.modify_section(r'^(interface|line) \S+',
+                                                stop_pattern='^(exit|!)'), 2)
+        self.assertNotIn('interface eth0', frr_cfg.config)
+        self.assertNotIn('line vty', frr_cfg.config)
+
+    def test_config_delta(self):
+        frr_cfg = FRRConfig(running)
+        frr_cfg.modify_section(r'^interface eth0', stop_pattern='^exit', remove_stop_mark=True)
+        frr_cfg.modify_section(r'^router bgp \d+', stop_pattern='^exit', remove_stop_mark=True)
+        frr_cfg.modify_section(r'^ip prefix-list .*', count=1, replacement=[])
+        frr_cfg.add_before(r'(line vty)', bgpd)
+
+        commands, changed = config_delta(frr_cfg.original_config, frr_cfg.config)
+        self.assertEqual(commands, [
+            # removed sections in reverse order, an interface line by line
+            'interface eth0', 'no ip ospf cost 10', 'exit',
+            'no ip prefix-list P1 seq 5 permit 10.0.0.0/8',
+            # removed lines, in reverse order
+            'router bgp 65000', 'address-family ipv4 unicast',
+            'no neighbor 192.0.2.2 route-map RM in', 'exit', 'exit',
+            'router bgp 65000', 'no neighbor 192.0.2.2 remote-as 65002', 'exit',
+            # added lines
+            'router bgp 65000', 'address-family ipv6 unicast',
+            'network 2001:db8::/32', 'exit', 'exit'])
+        self.assertEqual(set(changed), {'interface eth0', 'router bgp 65000',
+                                        'ip prefix-list P1 seq 5 permit 10.0.0.0/8'})
+
+        # unchanged configuration
+        self.assertEqual(config_delta(frr_cfg.config, frr_cfg.config), ([], []))
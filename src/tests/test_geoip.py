@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import gzip
+import os
+import tempfile
+
+from ipaddress import ip_address
+from unittest import TestCase
+
+from vyos.geoip import GeoIPIndex
+from vyos.geoip import build_index
+from vyos.geoip import format_range
+from vyos.geoip import merge_ranges
+from vyos.geoip import parse_nft_elements
+
+database = '''1.0.0.0,1.0.0.255,AU
+1.0.1.0,1.0.3.255,CN
+1.0.4.0,1.0.7.255,AU
+1.0.8.0,1.0.15.255,AU
+2001:200::,2001:200:ffff:ffff:ffff:ffff:ffff:ffff,JP
+2001:208::,2001:208:ffff:ffff:ffff:ffff:ffff:ffff,SG
+'''
+
+def r(start, end):
+    return (int(ip_address(start)), int(ip_address(end)))
+
+class TestGeoIP(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.database = os.path.join(self.tmp.name, 'dbip.csv.gz')
+        self.index_file = os.path.join(self.tmp.name, 'dbip.idx')
+        with gzip.open(self.database, 'wt') as f:
+            f.write(database)
+        build_index(self.database, self.index_file)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_index(self):
+        with GeoIPIndex(self.index_file) as index:
+            self.assertEqual(index.countries(), ['au', 'cn', 'jp', 'sg'])
+            # adjacent ranges of a country are merged
+            self.assertEqual(index.ranges('AU', 4),
+                             [r('1.0.0.0', '1.0.0.255'), r('1.0.4.0', '1.0.15.255')])
+            self.assertEqual(index.ranges('jp', 6),
+                             [r('2001:200::', '2001:200:ffff:ffff:ffff:ffff:ffff:ffff')])
+            self.assertEqual(index.ranges('jp', 4), [])
+            self.assertEqual(index.ranges('us', 4), [])
+
+    def test_format(self):
+        ranges = merge_ranges([r('1.0.4.0', '1.0.15.255'), r('1.0.0.0', '1.0.0.255'),
+                               r('1.0.1.0', '1.0.3.255')])
+        self.assertEqual([format_range(*x, 4) for x in ranges], ['1.0.0.0/20'])
+        self.assertEqual(format_range(*r('1.0.0.0', '1.0.4.255'), 4), '1.0.0.0-1.0.4.255')
+        self.assertEqual(format_range(*r('1.0.0.0', '1.0.3.255'), 4), '1.0.0.0/22')
+        self.assertEqual(format_range(*r('1.0.0.1', '1.0.0.1'), 4), '1.0.0.1')
+        self.assertEqual(format_range(*r('2001:200::', '2001:200:ffff:ffff:ffff:ffff:ffff:ffff'), 6),
+                         '2001:200::/32')
+
+    def test_parse_nft_elements(self):
+        elements = ['192.0.2.1',
+                    {'prefix': {'addr': '198.51.100.0', 'len': 24}},
+                    {'range': ['203.0.113.10', '203.0.113.20']}]
+        self.assertEqual(parse_nft_elements(elements, 4),
+                         [r('192.0.2.1', '192.0.2.1'), r('198.51.100.0', '198.51.100.255'),
+                          r('203.0.113.10', '203.0.113.20')])
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import sys
+
+from unittest import TestCase
+
+from vyos.migrator import load_migration_function
+
+migrate_dir = os.path.join(os.path.dirname(__file__), '..', 'migration-scripts')
+
+class TestMigrator(TestCase):
+    def test_load_migration_function(self):
+        argv = sys.argv
+        # a converted script must not run its command line part on import
+        sys.argv = ['migrate']
+        try:
+            migrate = load_migration_function(os.path.join(migrate_dir, 'bgp', '0-to-1'))
+        finally:
+            sys.argv = argv
+        self.assertTrue(callable(migrate))
+
+        # scripts not providing migrate() are run as a subprocess
+        migrate = load_migration_function(os.path.join(migrate_dir, 'ssh', '0-to-1'))
+        self.assertIsNone(migrate)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import socket
+import struct
+
+from unittest import TestCase
+
+import vyos.netlink
+
+from vyos.netlink import _attr
+from vyos.netlink import _attr_str
+from vyos.netlink import _attr_u32
+from vyos.netlink import _ifinfomsg
+from vyos.netlink import _link_stats
+from vyos.netlink import _parse_link
+
+class TestNetlink(TestCase):
+    def test_parse_link(self):
+        stats = struct.pack(f'{len(_link_stats)}Q', *range(len(_link_stats)))
+        data = _ifinfomsg.pack(socket.AF_UNSPEC, 1, 7, 0x11043, 0)
+        data += _attr_str(vyos.netlink.IFLA_IFNAME, 'eth0')
+        data += _attr_u32(vyos.netlink.IFLA_MTU, 1500)
+        data += _attr_str(vyos.netlink.IFLA_QDISC, 'mq')
+        data += _attr(vyos.netlink.IFLA_OPERSTATE, bytes([6]))
+        data += _attr_u32(vyos.netlink.IFLA_GROUP, 0)
+        data += _attr_u32(vyos.netlink.IFLA_TXQLEN, 1000)
+        data += _attr(vyos.netlink.IFLA_ADDRESS, bytes.fromhex('001122334455'))
+        data += _attr(vyos.netlink.IFLA_BROADCAST, b'\xff' * 6)
+        data += _attr_str(vyos.netlink.IFLA_IFALIAS, 'uplink')
+        data += _attr(vyos.netlink.IFLA_STATS64, stats)
+
+        link = _parse_link(data, detail=False)
+        self.assertEqual(link['ifindex'], 7)
+        self.assertEqual(link['ifname'], 'eth0')
+        self.assertEqual(link['flags'], ['BROADCAST', 'MULTICAST', 'UP', 'LOWER_UP'])
+        self.assertEqual(link['operstate'], 'UP')
+        self.assertEqual(link['group'], 'default')
+        self.assertEqual(link['link_type'], 'ether')
+        self.assertEqual(link['address'], '00:11:22:33:44:55')
+        self.assertEqual(link['broadcast'], 'ff:ff:ff:ff:ff:ff')
+        self.assertEqual(link['ifalias'], 'uplink')
+        self.assertEqual(link['stats']['rx_packets'], 0)
+        self.assertEqual(link['stats']['rx_bytes'], 2)
+        self.assertEqual(link['stats']['rx_over_errors'], 11)
+        self.assertNotIn('linkinfo', link)
+
+    def test_dump_links(self):
+        try:
+            links = vyos.netlink.rtnl().dump_links(stats=True)
+        except OSError:
+            self.skipTest('no rtnetlink socket')
+        lo = [link for link in links if link['ifname'] == 'lo']
+        self.assertEqual(len(lo), 1)
+        self.assertEqual(lo[0]['link_type'], 'loopback')
+        self.assertIn('addr_info', lo[0])
+        self.assertIn('rx_bytes', lo[0]['stats'])
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import vyos.validators
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from vyos.validators import check_constraint
+from vyos.validators import ipaddrcheck
+from vyos.validators import run_validator
+from vyos.validators import translate_regex
+from vyos.validators import validate_paths
+
+class TestValidators(TestCase):
+    def valid(self, name, value, argument=''):
+        return run_validator(name, value, argument)[0] == 0
+
+    def test_ipaddrcheck(self):
+        self.assertTrue(ipaddrcheck('ipv4-single', '192.0.2.1'))
+        self.assertFalse(ipaddrcheck('ipv4-single', '192.0.2.1/24'))
+        self.assertTrue(ipaddrcheck('ipv4-host', '192.0.2.1/24'))
+        self.assertFalse(ipaddrcheck('ipv4-host', '192.0.2.0/24'))
+        self.assertTrue(ipaddrcheck('ipv4-host', '192.0.2.0/31'))
+        self.assertTrue(ipaddrcheck('ipv4-net', '192.0.2.0/24'))
+        self.assertFalse(ipaddrcheck('ipv4-net', '192.0.2.1/24'))
+        self.assertFalse(ipaddrcheck('ipv4-net', '192.0.2.0/33'))
+        self.assertTrue(ipaddrcheck('ipv6-host', '2001:db8::1/64'))
+        self.assertFalse(ipaddrcheck('ipv6-single', 'fe80::1%eth0'))
+        self.assertFalse(ipaddrcheck('ipv4', '2001:db8::1'))
+        self.assertTrue(ipaddrcheck('ipv6-multicast', 'ff02::1'))
+
+    def test_ip_validators(self):
+        self.assertEqual(run_validator('ipv4-address', '192.0.2.300'),
+                         (1, 'Error: 192.0.2.300 is not a valid IPv4 address\n'))
+        self.assertTrue(self.valid('ipv4-address-exclude', '!192.0.2.1'))
+        self.assertFalse(self.valid('ipv4-address-exclude', '192.0.2.1'))
+        self.assertTrue(self.valid('interface-address', '2001:db8::1/64'))
+        self.assertFalse(self.valid('interface-address', '192.0.2.1'))
+        self.assertTrue(self.valid('ipv4-range', '192.0.2.1-192.0.2.10'))
+        self.assertFalse(self.valid('ipv4-range', '192.0.2.10-192.0.2.1'))
+        self.assertTrue(self.valid('ipv6-range', '2001:db8::1-2001:db8::5'))
+        self.assertTrue(self.valid('ipv4-multicast', '239.1.1.1'))
+        self.assertFalse(self.valid('ipv4-multicast', '192.0.2.1'))
+
+    def test_numeric(self):
+        self.assertTrue(self.valid('numeric', '1500', '--range 68-16000'))
+        self.assertFalse(self.valid('numeric', '20', '--range 68-16000'))
+        self.assertFalse(self.valid('numeric', 'abc', '--range 68-16000'))
+        self.assertTrue(self.valid('numeric', '5', '--range 1-3 --range 5-7'))
+        self.assertFalse(self.valid('numeric', '0', '--positive'))
+        self.assertTrue(self.valid('numeric', '1.5', '--float --range 1-2'))
+        self.assertTrue(self.valid('numeric', '10-20', '--allow-range --range 1-30'))
+        self.assertFalse(self.valid('numeric', '20-10', '--allow-range'))
+        self.assertTrue(self.valid('numeric-exclude', '!5', '--range 1-10'))
+        self.assertTrue(self.valid('as-number-list', '65000 4200000000'))
+        self.assertFalse(self.valid('as-number-list', '65000 0'))
+
+    def test_misc_validators(self):
+        self.assertTrue(self.valid('mac-address', '00:50:56:aa:bb:cc'))
+        self.assertFalse(self.valid('mac-address', '00:50:56:aa:bb'))
+        self.assertTrue(self.valid('ip-protocol', 'tcp'))
+        self.assertTrue(self.valid('ip-protocol', '!udp'))
+        self.assertFalse(self.valid('ip-protocol', '256'))
+        self.assertTrue(self.valid('vrf-name', 'red'))
+        self.assertFalse(self.valid('vrf-name', 'eth0'))
+        self.assertFalse(self.valid('vrf-name', 'lo'))
+        self.assertTrue(self.valid('bgp-regular-community', '65000:100'))
+        self.assertFalse(self.valid('bgp-regular-community', '65000:100000'))
+        self.assertTrue(self.valid('bgp-rd-rt', '192.0.2.1:10', '--route-distinguisher'))
+
+    def test_check_constraint(self):
+        constraint = {'regex': ['auto'],
+                      'validator': [['numeric', '--range 68-16000']]}
+        self.assertEqual(check_constraint('auto', constraint), (True, ''))
+        self.assertEqual(check_constraint('1500', constraint), (True, ''))
+        self.assertFalse(check_constraint('autox', constraint)[0])
+        self.assertEqual(check_constraint('anything', {}), (True, ''))
+
+    def test_posix_classes(self):
+        # include/generic-description.xml.i
+        description = {'regex': ['[[:ascii:]]{0,256}']}
+        self.assertTrue(check_constraint('my description', description)[0])
+        self.assertTrue(check_constraint('', description)[0])
+        self.assertFalse(check_constraint('café', description)[0])
+        self.assertFalse(check_constraint('x' * 257, description)[0])
+
+        # qos.xml.in policy names
+        name = {'regex': ['[[:alnum:]][-_[:alnum:]]*']}
+        self.assertTrue(check_constraint('vyos-user_1', name)[0])
+        self.assertFalse(check_constraint('-vyos', name)[0])
+        self.assertFalse(check_constraint('vyos user', name)[0])
+
+        # snmp.xml.in community
+        password = {'regex': ['[[:alnum:]-_!@*#]{1,100}']}
+        self.assertTrue(check_constraint('Pa-ss_!@*#9', password)[0])
+        self.assertFalse(check_constraint('pa$s', password)[0])
+        # the hyphen after [:alnum:] is a literal, not a range up to '_'
+        self.assertFalse(check_constraint('a.b', password)[0])
+
+        self.assertEqual(translate_regex('[^[:digit:]]+'), '[^0-9]+')
+        self.assertRaises(ValueError, translate_regex, '[[:foo:]]')
+        # a regex which cannot be ported is checked by validate-value
+        with patch('vyos.validators.subprocess.run') as run:
+            run.return_value.returncode = 0
+            self.assertTrue(check_constraint('x', {'regex': ['[[:foo:]]']})[0])
+        self.assertIn('validate-value', run.call_args[0][0][0])
+
+    def test_validate_paths(self):
+        constraints = {
+            'mtu': [('{}', {'validator': [['numeric', '--range 68-16000']],
+                            'error': 'MTU out of range'})],
+        }
+        def value_constraints(path):
+            if path[-2] not in constraints:
+                raise ValueError('non-existent node data')
+            return [(path[-1] if v == '{}' else v, c)
+                    for v, c in constraints[path[-2]]]
+
+        paths = [['interfaces', 'dummy', 'dum0', 'mtu', '1500'],
+                 ['interfaces', 'dummy', 'dum1', 'mtu', '10'],
+                 ['foo', 'bar']]
+        with patch('vyos.xml_ref.value_constraints', value_constraints), \
+             patch.object(vyos.validators, 'run_validator',
+                          wraps=vyos.validators.run_validator) as run:
+            res = validate_paths(paths + paths)
+        self.assertIsNone(res[0])
+        self.assertTrue(res[1].endswith('MTU out of range'))
+        self.assertIsNone(res[2])
+        self.assertEqual(res[3:], res[:3])
+        # a value is checked once per call
+        self.assertEqual(run.call_count, 2)
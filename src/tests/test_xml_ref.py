@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import tempfile
+
+from vyos.xml_ref.definition import Xml
+from vyos.xml_ref.definition import build_index
+from vyos.xml_ref.shard import write_shards
+from vyos.xml_ref.shard import ShardedReference
+
+from unittest import TestCase
+
+def leaf(default=None, multi=False, valueless=False):
+    return {'node_data': {'node_type': 'leaf', 'multi': multi,
+                          'valueless': valueless, 'default_value': default}}
+
+def node(node_type='node', **children):
+    return {'node_data': {'node_type': node_type, 'multi': False,
+                          'valueless': False, 'default_value': None}} | children
+
+reference = {
+    'interfaces': node(ethernet=node('tag', address=leaf(multi=True),
+                                     mtu=leaf('1500'),
+                                     vif=node('tag', mtu=leaf('1500')),
+                                     ip=node(arp_cache_timeout=leaf('30')))),
+    'system': node(host_name=leaf('vyos'),
+                   name_server=leaf('192.0.2.1 192.0.2.2', multi=True)),
+    'component_version': {'system': '26'},
+}
+
+class TestXmlRef(TestCase):
+    def setUp(self):
+        self.xml = Xml()
+        self.xml.define(reference, index=build_index(reference))
+
+    def test_index(self):
+        index = build_index(reference)
+        self.assertIn('interfaces ethernet * vif * mtu', index)
+        self.assertNotIn('interfaces ethernet mtu', index)
+        self.assertNotIn('component_version', index)
+
+    def test_node_type(self):
+        self.assertTrue(self.xml.is_tag(['interfaces', 'ethernet']))
+        self.assertFalse(self.xml.is_tag(['interfaces', 'ethernet', 'eth0']))
+        self.assertTrue(self.xml.is_tag_value(['interfaces', 'ethernet', 'eth0']))
+        self.assertTrue(self.xml.is_tag(['interfaces', 'ethernet', 'eth0', 'vif']))
+        self.assertTrue(self.xml.is_multi(['interfaces', 'ethernet', 'eth1', 'address']))
+        self.assertTrue(self.xml.is_leaf(['interfaces', 'ethernet', 'eth0', 'vif', '10', 'mtu']))
+        with self.assertRaises(ValueError):
+            self.xml.is_leaf(['interfaces', 'ethernet', 'eth0', 'non-existent'])
+
+    def test_defaults(self):
+        self.assertEqual(self.xml.default_value(['system', 'name_server']),
+                         ['192.0.2.1', '192.0.2.2'])
+        path = ['interfaces', 'ethernet', 'eth0']
+        expected = {'eth0': {'mtu': '1500', 'ip': {'arp_cache_timeout': '30'}}}
+        defaults = self.xml.get_defaults(path, recursive=True)
+        self.assertEqual(defaults, expected)
+        # cached defaults are not affected by changes to returned dicts
+        defaults['eth0']['ip']['arp_cache_timeout'] = '60'
+        self.assertEqual(self.xml.get_defaults(path, recursive=True), expected)
+        self.assertEqual(self.xml.get_defaults(['interfaces', 'ethernet', 'eth1'],
+                                               get_first_key=True),
+                         {'mtu': '1500'})
+
+    def test_shards(self):
+        index = build_index(reference)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            write_shards(reference, index, tmpdir)
+            ref = ShardedReference(tmpdir)
+            self.assertEqual(dict(ref.index), index)
+            self.assertEqual(ref['component_version'], {'system': '26'})
+
+            ref = ShardedReference(tmpdir)
+            xml = Xml()
+            xml.define(ref, index=ref.index)
+            self.assertTrue(xml.is_tag(['interfaces', 'ethernet']))
+            # only the shard of the queried top-level node is read
+            self.assertEqual(list(ref._shards._loaded), ['interfaces'])
+            self.assertEqual(xml.get_defaults(['system']),
+                             {'system': {'host_name': 'vyos',
+                                         'name_server': ['192.0.2.1', '192.0.2.2']}})
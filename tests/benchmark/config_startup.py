@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Startup latency of Config(), with the running config rendered by
+# cli-shell-api or read from the JSON snapshot written after each commit,
+# and of the schema queries answered by cli-shell-api or the XML reference;
+# to be run on a VyOS system, in op mode or in a configuration session
+
+import argparse
+import timeit
+
+from vyos.config import Config
+from vyos.configsnapshot import write_snapshot
+from vyos.configsource import ConfigSourceSession
+from vyos.configsource import VyOSError
+
+def cli_shell_api_is_tag(source, path):
+    try:
+        source._run(source._make_command('isTag', path))
+        return True
+    except VyOSError:
+        return False
+
+def report(name: str, number: int, seconds: float):
+    print(f'{name:<32} {seconds / number * 1e3:>10.2f} ms/op')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=20,
+                        help='Number of operations timed per test')
+    args = parser.parse_args()
+
+    # a snapshot of the current running config, as after a commit
+    write_snapshot()
+    source = ConfigSourceSession()
+
+    tests = {
+        'Config() (cli-shell-api)': lambda: Config(config_source=ConfigSourceSession(use_snapshot=False)),
+        'Config() (snapshot)': lambda: Config(config_source=ConfigSourceSession()),
+        'is_tag (cli-shell-api)': lambda: cli_shell_api_is_tag(source, 'interfaces ethernet'),
+        'is_tag (xml_ref)': lambda: source.is_tag('interfaces ethernet'),
+    }
+
+    for name, func in tests.items():
+        report(name, args.number, timeit.timeit(func, number=args.number))
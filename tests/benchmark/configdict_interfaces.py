@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Bridge membership lookups of all VLAN interfaces of a synthetic config,
+# walking the config per lookup as is_member() used to, compared to the
+# reverse interface index; requires libvyosconfig and the XML reference
+# cache
+
+import argparse
+import time
+
+from vyos.config import Config
+from vyos.configdict import get_interface_dict
+from vyos.configdict import is_member
+from vyos.configsource import ConfigSourceString
+
+def synthetic_config(vlans: int, bridges: int) -> str:
+    vifs = ''.join(f'        vif {i} {{\n            mtu 1500\n        }}\n'
+                   for i in range(1, vlans + 1))
+    per_bridge = vlans // bridges
+    bridge = ''
+    for b in range(bridges):
+        members = ''.join(f'            interface eth0.{i} {{\n            }}\n'
+                          for i in range(b * per_bridge + 1, (b + 1) * per_bridge + 1))
+        bridge += f'    bridge br{b} {{\n        member {{\n{members}        }}\n    }}\n'
+    return f'interfaces {{\n{bridge}    ethernet eth0 {{\n{vifs}    }}\n}}\n'
+
+def walk_is_member(conf, interface, intftype):
+    # is_member() before the reverse index: one walk of all bridges per call
+    ret_val = {}
+    base = ['interfaces', intftype]
+    for intf in conf.list_nodes(base):
+        member = base + [intf, 'member', 'interface', interface]
+        if conf.exists(member):
+            tmp = conf.get_config_dict(member, key_mangling=('-', '_'),
+                                       get_first_key=True,
+                                       no_tag_node_value_mangle=True)
+            ret_val.update({intf : tmp})
+    return ret_val
+
+def report(name: str, seconds: float, lookups: int):
+    print(f'{name:<28} {seconds * 1e3:>10.1f} ms  {seconds / lookups * 1e6:>10.1f} us/lookup')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--vlans', type=int, default=2000,
+                        help='Number of VLAN interfaces in the synthetic config')
+    parser.add_argument('--bridges', type=int, default=50,
+                        help='Number of bridges the VLAN interfaces are members of')
+    args = parser.parse_args()
+
+    source = ConfigSourceString(session_config_text=synthetic_config(args.vlans, args.bridges))
+    vifs = [f'eth0.{i}' for i in range(1, args.vlans + 1)]
+
+    # a new Config object per test, as for each commit; the time to build
+    # the root dict and the index is included
+    conf = Config(config_source=source)
+    start = time.perf_counter()
+    walk = [walk_is_member(conf, vif, 'bridge') for vif in vifs]
+    report('is_member (config walk)', time.perf_counter() - start, len(vifs))
+
+    conf = Config(config_source=source)
+    start = time.perf_counter()
+    index = [is_member(conf, vif, 'bridge') for vif in vifs]
+    report('is_member (index)', time.perf_counter() - start, len(vifs))
+
+    assert walk == index
+
+    conf = Config(config_source=source)
+    start = time.perf_counter()
+    get_interface_dict(conf, ['interfaces', 'ethernet'], 'eth0')
+    report('get_interface_dict eth0', time.perf_counter() - start, len(vifs))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Throughput of ConfigTree construction, subtree creation and DiffTree,
+# on a synthetic config; requires libvyosconfig
+
+import argparse
+import timeit
+
+from vyos.configtree import ConfigTree
+from vyos.configtree import DiffTree
+
+def synthetic_config(count: int) -> str:
+    vifs = ''.join(f'        vif {i} {{\n            address 10.{i // 250}.{i % 250}.1/24\n        }}\n'
+                   for i in range(1, count + 1))
+    return f'interfaces {{\n    ethernet eth0 {{\n{vifs}    }}\n}}\n' \
+           f'system {{\n    host-name vyos\n}}\n'
+
+def report(name: str, number: int, seconds: float):
+    print(f'{name:<24} {number / seconds:>12.1f} ops/s  {seconds / number * 1e6:>10.1f} us/op')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=100,
+                        help='Number of VLAN interfaces in the synthetic config')
+    parser.add_argument('--number', type=int, default=1000,
+                        help='Number of operations timed per test')
+    args = parser.parse_args()
+
+    small = 'system {\n    host-name vyos\n}\n'
+    config_string = synthetic_config(args.count)
+    tree = ConfigTree(config_string)
+    other = ConfigTree(synthetic_config(args.count + 1))
+
+    tests = {
+        'construct (small)': lambda: ConfigTree(small),
+        f'construct ({args.count} vif)': lambda: ConfigTree(config_string),
+        'get_subtree': lambda: tree.get_subtree(['system']),
+        'DiffTree': lambda: DiffTree(tree, other),
+    }
+
+    for name, func in tests.items():
+        number = args.number if 'DiffTree' not in name else max(args.number // 10, 1)
+        report(name, number, timeit.timeit(func, number=number))
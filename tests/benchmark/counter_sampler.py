@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Cost of one sample of the counters of all interfaces, read from sysfs per
+# interface and counter, and with the RTM_GETSTATS dump of CounterSampler,
+# and of computing the rates of all interfaces; run as root, with --vlans,
+# on a scratch system, to add dummy VLAN interfaces first
+
+import argparse
+import os
+import time
+
+from vyos.ifconfig.sampler import CounterSampler
+from vyos.utils.process import call
+
+def sysfs_sample():
+    res = {}
+    for ifname in os.listdir('/sys/class/net'):
+        res[ifname] = []
+        for counter in CounterSampler.counters:
+            try:
+                with open(f'/sys/class/net/{ifname}/statistics/{counter}') as f:
+                    res[ifname].append(int(f.read()))
+            except OSError:
+                pass
+    return res
+
+def report(name: str, number: int, seconds: float):
+    print(f'{name:<24} {seconds / number * 1e3:>10.2f} ms')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=20,
+                        help='Number of samples timed per test')
+    parser.add_argument('--vlans', type=int, default=0,
+                        help='Number of VLAN interfaces to create on dum0')
+    args = parser.parse_args()
+
+    if args.vlans:
+        call('ip link add dum0 type dummy')
+        for vlan in range(1, args.vlans + 1):
+            call(f'ip link add link dum0 name dum0.{vlan} type vlan id {vlan}')
+
+    try:
+        print(f'{len(os.listdir("/sys/class/net"))} interfaces')
+
+        start = time.perf_counter()
+        for _ in range(args.number):
+            sysfs_sample()
+        report('sysfs sample', args.number, time.perf_counter() - start)
+
+        sampler = CounterSampler(size=args.number)
+        start = time.perf_counter()
+        for _ in range(args.number):
+            sampler.sample()
+        report('netlink sample', args.number, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        sampler.rates()
+        report('rates', 1, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        sampler.percentiles()
+        report('percentiles', 1, time.perf_counter() - start)
+    finally:
+        if args.vlans:
+            call('ip link del dum0')
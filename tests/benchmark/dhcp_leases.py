@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Cost of reading the DHCP server leases used by "show dhcp server leases"
+# and "show dhcp server statistics" from a synthetic dhcpd.leases file:
+# a complete parse, a warm start from the lease cache, an update after
+# dhcpd appended to the file, and the per-pool counts. The previous
+# implementation (isc_dhcp_leases and the list based deduplication) is
+# timed on a smaller file if isc_dhcp_leases is installed.
+
+import os
+import time
+import random
+import argparse
+import tempfile
+
+from vyos.dhcp_leases import LeaseStore
+
+def lease_block(i: int, state: str, pools: int) -> str:
+    ip = f'10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}'
+    mac = ':'.join(f'{b:02x}' for b in (0x52, 0x54, i >> 24 & 255,
+                                        i >> 16 & 255, i >> 8 & 255, i & 255))
+    return (f'lease {ip} {{\n'
+            f'  starts 4 2023/08/03 10:00:00;\n'
+            f'  ends 4 2033/08/03 22:00:00;\n'
+            f'  cltt 4 2023/08/03 10:00:00;\n'
+            f'  binding state {state};\n'
+            f'  next binding state free;\n'
+            f'  rewind binding state free;\n'
+            f'  hardware ethernet {mac};\n'
+            f'  uid "\\001RT\\000\\000\\000\\001";\n'
+            f'  set shared-networkname = "POOL{i % pools}";\n'
+            f'  client-hostname "host-{i}";\n'
+            f'}}\n')
+
+def synthetic_leases(count: int, pools: int, updates: int) -> str:
+    header = '# The format of this file is documented in the dhcpd.leases(5) manual page.\n' \
+             '# This lease file was written by isc-dhcp-4.4.3-P1\n\n' \
+             '# authoring-byte-order entry is generated, DO NOT DELETE\n' \
+             'authoring-byte-order little-endian;\n\n'
+    blocks = [lease_block(i, 'active', pools) for i in range(count)]
+    rnd = random.Random(1)
+    # renewed and released leases are appended by dhcpd
+    for _ in range(updates):
+        blocks.append(lease_block(rnd.randrange(count),
+                                  rnd.choice(['active', 'free']), pools))
+    return header + ''.join(blocks)
+
+def legacy(lease_file: str, pools: list) -> list:
+    from isc_dhcp_leases import IscDhcpLeases
+
+    data = []
+    for lease in IscDhcpLeases(lease_file).get():
+        data_lease = {'ip': lease.ip, 'state': lease.binding_state,
+                      'pool': lease.sets.get('shared-networkname', '')}
+        if data_lease['pool'] in pools and data_lease['state'] != 'free':
+            data.append(data_lease)
+        checked = []
+        for entry in data:
+            addr = entry.get('ip')
+            if addr not in checked:
+                checked.append(addr)
+            else:
+                idx = next((index for (index, d) in enumerate(data) if d['ip'] == addr), None)
+                data.pop(idx)
+    return data
+
+def timed(name: str, func):
+    start = time.perf_counter()
+    res = func()
+    print(f'{name:<32} {(time.perf_counter() - start) * 1e3:>10.1f} ms')
+    return res
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--leases', type=int, default=100000,
+                        help='number of leases')
+    parser.add_argument('--pools', type=int, default=16,
+                        help='number of pools')
+    parser.add_argument('--append', type=int, default=1000,
+                        help='number of lease changes appended between updates')
+    parser.add_argument('--legacy-leases', type=int, default=2000,
+                        help='number of leases to time the previous implementation with, 0 to skip')
+    args = parser.parse_args()
+
+    pools = [f'POOL{i}' for i in range(args.pools)]
+    with tempfile.TemporaryDirectory() as tmp:
+        lease_file = os.path.join(tmp, 'dhcpd.leases')
+        cache_file = os.path.join(tmp, 'dhcpd.leases.cache')
+        with open(lease_file, 'w') as f:
+            f.write(synthetic_leases(args.leases, args.pools, args.leases // 10))
+        print(f'{args.leases} leases, {os.path.getsize(lease_file) >> 20} MiB')
+
+        timed('parse', lambda: LeaseStore(lease_file).update())
+        timed('parse, write cache', lambda: LeaseStore(lease_file, cache_file).update())
+        store = timed('load cache', lambda: LeaseStore(lease_file, cache_file).update())
+        with open(lease_file, 'a') as f:
+            f.write(''.join(lease_block(i, 'active', args.pools) for i in range(args.append)))
+        timed(f'load cache, parse {args.append} new', lambda: LeaseStore(lease_file, cache_file).update())
+        timed(f'update by {args.append} in process', lambda: store.update())
+        timed('leases of all pools', lambda: store.leases(pools=pools))
+        timed('counts per pool', lambda: [store.count(p, exclude_states=['free']) for p in pools])
+
+        if args.legacy_leases:
+            try:
+                import isc_dhcp_leases
+            except ImportError:
+                print('isc_dhcp_leases not installed, previous implementation not timed')
+                return
+            with open(lease_file, 'w') as f:
+                f.write(synthetic_leases(args.legacy_leases, args.pools, args.legacy_leases // 10))
+            print(f'{args.legacy_leases} leases')
+            timed('previous implementation', lambda: legacy(lease_file, pools))
+            timed('parse', lambda: LeaseStore(lease_file).update().leases(pools=pools))
+
+if __name__ == '__main__':
+    main()
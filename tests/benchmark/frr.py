@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Cost of the FRRConfig section edits done by protocols_bgp.py and
+# policy.py, and of computing the vtysh delta, on a synthetic running
+# config of a BGP router with many neighbors, prefix-lists and route-maps;
+# does not require FRR
+
+import argparse
+import time
+
+from vyos.frr import FRRConfig
+from vyos.frr import config_delta
+
+def synthetic_config(lines: int) -> list:
+    # neighbors take 4 lines, prefix-list entries 1 and route-maps 4
+    count = lines // 9
+    bgp = ['router bgp 65000']
+    bgp += [f' neighbor 10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256} remote-as {64512 + i % 1000}'
+            for i in range(count)]
+    bgp += [' !', ' address-family ipv4 unicast']
+    bgp += [f'  neighbor 10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256} route-map RM{i} in'
+            for i in range(count)]
+    bgp += [f'  neighbor 10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256} soft-reconfiguration inbound'
+            for i in range(count)]
+    bgp += [f'  network 172.{i // 256 % 256}.{i % 256}.0/24' for i in range(count)]
+    bgp += [' exit-address-family', 'exit', '!']
+    prefix_lists = [f'ip prefix-list PL{i // 100} seq {i % 100 + 1} permit 192.0.{i % 256}.0/24'
+                    for i in range(count)] + ['!']
+    route_maps = []
+    for i in range(count):
+        route_maps += [f'route-map RM{i} permit 10', f' match ip address prefix-list PL{i // 100}',
+                       f' set local-preference {100 + i % 50}', 'exit', '!']
+    return ['frr version 9.0', 'frr defaults traditional', '!'] + \
+           prefix_lists + bgp + route_maps + ['line vty', '!', 'end']
+
+def timed(name: str, func, number: int):
+    best = None
+    for _ in range(number):
+        start = time.perf_counter()
+        res = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f'{name:<32} {best * 1e3:>10.1f} ms')
+    return res
+
+def rerender(config: list) -> tuple:
+    # what a commit of "protocols bgp" and "policy" does: remove the
+    # sections and add them again, with one neighbor changed
+    frr_cfg = FRRConfig(config)
+    frr_cfg.modify_section(r'^router bgp \d+', stop_pattern='^exit', remove_stop_mark=True)
+    frr_cfg.modify_section(r'^ip prefix-list .*')
+    frr_cfg.modify_section(r'^route-map .*', stop_pattern='^exit', remove_stop_mark=True)
+    new = [line.replace('remote-as 64512', 'remote-as 65534') for line in config]
+    frr_cfg.add_before(r'(line vty)', new[3:-3])
+    return frr_cfg
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lines', type=int, default=100000,
+                        help='Approximate number of lines of the running config')
+    parser.add_argument('--number', type=int, default=3,
+                        help='Number of runs per test, the best is reported')
+    args = parser.parse_args()
+
+    config = synthetic_config(args.lines)
+    print(f'running config: {len(config)} lines')
+
+    frr_cfg = timed('modify_section + add_before', lambda: rerender(config), args.number)
+    commands, changed = timed('config_delta', lambda: config_delta(config, frr_cfg.config),
+                              args.number)
+    print(f'delta: {len(commands)} commands in {len(changed)} sections')
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Time to collect the data of "show interfaces" for all interfaces, with
+# one "ip -json addr show" run and sysfs counter reads per interface, and
+# with the link, address and counter dumps of vyos.netlink; run as root,
+# with --vlans, on a scratch system, to add dummy VLAN interfaces first
+
+import argparse
+import json
+import time
+
+from vyos.netlink import rtnl
+from vyos.utils.process import cmd
+from vyos.utils.process import call
+
+_counters = ['rx_bytes', 'rx_packets', 'rx_errors', 'rx_dropped',
+             'rx_over_errors', 'multicast', 'tx_bytes', 'tx_packets',
+             'tx_errors', 'tx_dropped', 'tx_carrier_errors', 'collisions']
+
+def per_interface():
+    res = []
+    for ifname in [link['ifname'] for link in rtnl().dump_links(addresses=False)]:
+        intf = json.loads(cmd(f'ip -json addr show {ifname}'))[0]
+        intf['stats'] = {}
+        for counter in _counters:
+            with open(f'/sys/class/net/{ifname}/statistics/{counter}') as f:
+                intf['stats'][counter] = int(f.read())
+        res.append(intf)
+    return res
+
+def dump():
+    return rtnl().dump_links(stats=True)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--vlans', type=int, default=0,
+                        help='Number of VLAN interfaces to create on dum0')
+    args = parser.parse_args()
+
+    if args.vlans:
+        call('ip link add dum0 type dummy')
+        for vlan in range(1, args.vlans + 1):
+            call(f'ip link add link dum0 name dum0.{vlan} type vlan id {vlan}')
+
+    try:
+        for name, func in [('ip per interface', per_interface),
+                           ('netlink dump', dump)]:
+            start = time.perf_counter()
+            count = len(func())
+            print(f'{name:<24} {count:>6} interfaces {time.perf_counter() - start:>8.3f} s')
+    finally:
+        if args.vlans:
+            call('ip link del dum0')
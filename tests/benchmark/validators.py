@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Throughput of value validation, with one validator process per value as
+# done by the CLI, and in process with vyos.validators; to be run on a VyOS
+# system, or from the source tree with --validators-dir src/validators for
+# the Python validators
+
+import argparse
+import time
+
+from vyos.validators import run_script
+from vyos.validators import run_validator
+import vyos.validators
+
+def values(count: int) -> list:
+    res = []
+    for n in range(count):
+        res.append(('ipv6-range', f'2001:db8::{n + 1:x}-2001:db8::{n + 2:x}', ''))
+        res.append(('port-range', f'{n % 60000 + 1}-{n % 60000 + 2}', ''))
+        res.append(('ip-protocol', str(n % 256), ''))
+        res.append(('vrf-name', f'vrf{n}', ''))
+    return res
+
+def report(name: str, count: int, seconds: float):
+    print(f'{name:<24} {count / seconds:>12.0f} values/s')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=50,
+                        help='Number of values per validator')
+    parser.add_argument('--validators-dir', default=vyos.validators.validators_dir,
+                        help='Directory of the validator scripts')
+    args = parser.parse_args()
+
+    vyos.validators.validators_dir = args.validators_dir
+    checks = values(args.count)
+
+    start = time.perf_counter()
+    for name, value, argument in checks:
+        run_script(name, value, argument)
+    report('process per value', len(checks), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for name, value, argument in checks:
+        run_validator(name, value, argument)
+    report('in process', len(checks), time.perf_counter() - start)
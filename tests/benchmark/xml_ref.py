@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+#
+# Copyright (C) 2023 VyOS maintainers and contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 or later as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Cold start cost of the xml reference cache: time for a fresh interpreter
+# to import a module and answer the first reference query, with the
+# sharded cache and with the cache.py dict literal; requires a generated
+# cache (python/vyos/xml_ref/update_cache.py)
+
+import os
+import sys
+import argparse
+import subprocess
+import time
+
+first_query = '''
+import sys
+from vyos.xml_ref import shard
+if sys.argv[1] == 'literal':
+    shard.has_shards = lambda _: False
+import {module}
+from vyos.xml_ref import is_tag
+is_tag(['interfaces', 'ethernet'])
+'''
+
+def run(code: str, mode: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code, mode], check=True)
+    return time.perf_counter() - start
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--module', default='vyos.config',
+                        help='Module imported before the first query')
+    parser.add_argument('--number', type=int, default=10,
+                        help='Number of interpreter starts timed per test')
+    args = parser.parse_args()
+
+    from vyos.xml_ref import shard
+    modes = ['literal']
+    if shard.has_shards(shard.shard_dir):
+        modes.append('sharded')
+    else:
+        print(f'no shards in {shard.shard_dir}; timing cache.py only',
+              file=sys.stderr)
+
+    baseline = min(run('pass', '') for _ in range(args.number))
+    print(f'{"interpreter start":<24} {baseline * 1e3:>10.1f} ms')
+    code = first_query.format(module=args.module)
+    for mode in modes:
+        best = min(run(code, mode) for _ in range(args.number))
+        print(f'{mode + " first query":<24} {best * 1e3:>10.1f} ms')